@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Complexity Benchmark
+
+Fuzzes the analyzer and optimizer with adversarial inputs (giant
+single-line blobs, thousands of headers or near-miss headers, long list
+runs, blank-line floods, seeded random text) and measures how the
+runtime and peak memory of each code path grow with input size. Each
+path runs on inputs of doubling size; the growth exponent is the slope
+of a least-squares fit of log(cost) against log(size), so 1.0 is linear
+and 2.0 quadratic. The exit status is non-zero if any exponent exceeds
+its bound.
+"""
+
+import argparse
+import math
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+from prompt_analyzer import PromptAnalyzer
+from prompt_optimizer import PromptOptimizer
+
+
+# Growth exponent bounds; small inputs carry fixed costs, so truly linear
+# paths measure somewhat below 1.0 and noise can push them a bit above
+TIME_EXPONENT_BOUND = 1.3
+MEMORY_EXPONENT_BOUND = 1.15
+
+MIN_SIZE = 2000
+MAX_SIZE = 64000
+
+WORDS = ('write', 'the', 'report', 'and', 'it', 'please', 'also', 'include',
+         'example', 'format', 'json', 'creative', 'only', 'exactly', '42')
+
+
+def _repeat(unit: str) -> Callable[[int, random.Random], str]:
+    """Family that repeats one unit up to the requested size"""
+    return lambda size, rng: unit * max(1, size // len(unit))
+
+
+def _random_text(size: int, rng: random.Random) -> str:
+    """Seeded random mix of words, markers and separators"""
+    tokens = WORDS + ('\n', '\n\n', '. ', '? ', ': ', ':\n', '- ', '1. ', 'Section ', '  ')
+    parts = []
+    length = 0
+    while length < size:
+        token = rng.choice(tokens)
+        parts.append(token if token.isspace() or token[-1] == ' ' else token + ' ')
+        length += len(parts[-1])
+    return ''.join(parts)
+
+
+# Input families by name: each builds a text of about ``size`` characters
+FAMILIES: Dict[str, Callable[[int, random.Random], str]] = {
+    'blob': _repeat("word "),
+    'long_sentence': _repeat("write this and that "),
+    'sentences': _repeat("Please write it. Also include an example. "),
+    'headers': _repeat("Section title:\n"),
+    'title_lines': _repeat("Section title\n"),
+    'list_items': _repeat("- list item\n"),
+    'numbered_items': _repeat("12. list item\n"),
+    'blank_lines': _repeat(" \n"),
+    'random': _random_text
+}
+
+# Code paths by name: each takes the engine and a text
+PATHS: Dict[str, Callable[[PromptAnalyzer, PromptOptimizer, str], Any]] = {
+    'extract_features': lambda analyzer, optimizer, text: analyzer.extract_features(text),
+    'score_bounds': lambda analyzer, optimizer, text: analyzer.score_bounds(text),
+    'optimize_clarity': lambda analyzer, optimizer, text: optimizer._optimize_clarity(text, 0.0),
+    'optimize_structure': lambda analyzer, optimizer, text: optimizer._optimize_structure(text, 0.0),
+    'analyze_and_optimize': lambda analyzer, optimizer, text: optimizer.optimize(text, analyzer.analyze(text))
+}
+
+
+def growth_exponent(sizes: Sequence[int], costs: Sequence[float]) -> float:
+    """Least-squares slope of log(cost) against log(size)"""
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(max(cost, 1e-9)) for cost in costs]
+    mean_x = statistics.fmean(xs)
+    mean_y = statistics.fmean(ys)
+    spread = sum((x - mean_x) ** 2 for x in xs)
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / spread
+
+
+def doubling_sizes(min_size: int, max_size: int) -> List[int]:
+    """Sizes from min_size doubling up to max_size"""
+    sizes = []
+    size = min_size
+    while size <= max_size:
+        sizes.append(size)
+        size *= 2
+    return sizes
+
+
+def measure(run: Callable[[str], Any], texts: Sequence[str], runs: int) -> Tuple[List[float], List[int]]:
+    """
+    Median runtime in seconds and peak traced memory in bytes per text
+
+    Memory is measured on a separate call, since tracing slows the code
+    down unevenly.
+    """
+    times = []
+    peaks = []
+    for text in texts:
+        samples = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            run(text)
+            samples.append(time.perf_counter() - started)
+        times.append(statistics.median(samples))
+
+        tracemalloc.start()
+        run(text)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return times, peaks
+
+
+def check_complexity(families: Sequence[str], paths: Sequence[str], sizes: Sequence[int],
+                     runs: int = 3, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Measure the growth exponents of each path on each input family
+
+    Returns:
+        One row per (family, path) with the time and memory exponents and
+        the median time of the largest input
+    """
+    analyzer = PromptAnalyzer()
+    optimizer = PromptOptimizer()
+    rows = []
+    for family in families:
+        rng = random.Random(seed)
+        texts = [FAMILIES[family](size, rng) for size in sizes]
+        actual_sizes = [len(text) for text in texts]
+        for path in paths:
+            times, peaks = measure(lambda text: PATHS[path](analyzer, optimizer, text), texts, runs)
+            rows.append({
+                'family': family,
+                'path': path,
+                'time_exponent': growth_exponent(actual_sizes, times),
+                'memory_exponent': growth_exponent(actual_sizes, peaks),
+                'max_time_ms': times[-1] * 1000
+            })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check analyzer and optimizer cost growth "
+                                                 "on adversarial inputs")
+    parser.add_argument('--families', nargs='+', choices=FAMILIES, default=list(FAMILIES),
+                        help='Input families to generate (default: all)')
+    parser.add_argument('--paths', nargs='+', choices=PATHS, default=list(PATHS),
+                        help='Code paths to measure (default: all)')
+    parser.add_argument('--min-size', type=int, default=MIN_SIZE,
+                        help=f'Smallest input in characters (default: {MIN_SIZE})')
+    parser.add_argument('--max-size', type=int, default=MAX_SIZE,
+                        help=f'Largest input in characters (default: {MAX_SIZE})')
+    parser.add_argument('--runs', type=int, default=3, help='Timed runs per input (default: 3)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the random family (default: 0)')
+    parser.add_argument('--max-time-exponent', type=float, default=TIME_EXPONENT_BOUND,
+                        help=f'Time growth bound (default: {TIME_EXPONENT_BOUND:g})')
+    parser.add_argument('--max-memory-exponent', type=float, default=MEMORY_EXPONENT_BOUND,
+                        help=f'Memory growth bound (default: {MEMORY_EXPONENT_BOUND:g})')
+    args = parser.parse_args()
+
+    sizes = doubling_sizes(args.min_size, args.max_size)
+    if len(sizes) < 2:
+        parser.error("--max-size must be at least twice --min-size")
+
+    rows = check_complexity(args.families, args.paths, sizes, args.runs, args.seed)
+
+    print(f"Sizes: {', '.join(str(size) for size in sizes)} characters\n")
+    print(f"{'Family':<16}{'Path':<22}{'Time exp':>9}{'Mem exp':>9}{'Max ms':>10}")
+    failures = []
+    for row in rows:
+        slow = row['time_exponent'] > args.max_time_exponent
+        hungry = row['memory_exponent'] > args.max_memory_exponent
+        if slow or hungry:
+            failures.append(row)
+        print(f"{row['family']:<16}{row['path']:<22}{row['time_exponent']:>9.2f}"
+              f"{row['memory_exponent']:>9.2f}{row['max_time_ms']:>10.2f}"
+              f"{'  FAIL' if slow or hungry else ''}")
+
+    print(f"\nCOMPLEXITY CHECK: time <= n^{args.max_time_exponent:g}, "
+          f"memory <= n^{args.max_memory_exponent:g}")
+    if failures:
+        for row in failures:
+            print(f"  FAIL  {row['path']} on {row['family']}: time n^{row['time_exponent']:.2f}, "
+                  f"memory n^{row['memory_exponent']:.2f}")
+        sys.exit(1)
+    print(f"  PASS  {len(rows)} paths")
+
+
+if __name__ == '__main__':
+    main()
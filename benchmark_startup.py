@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark
+
+Measures how long ``python main.py --prompt ...`` takes to start: the
+cumulative import time of main (from ``-X importtime``), the wall time
+of a whole CLI run, both as configured (recording history) and with
+``--no-history``, and the time to compile the engine from config.json.
+Each figure is the median of several runs and is checked against a
+budget; the exit status is non-zero if any budget is exceeded.
+
+Runs are measured with bytecode caching enabled, as an installed CLI
+would be: PYTHONDONTWRITEBYTECODE is cleared for the measured processes,
+since with it set every run recompiles any source changed since its
+cached bytecode was written.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+
+IMPORT_BUDGET_MS = 100.0
+ENGINE_BUDGET_MS = 5.0
+
+# Only needed by some modes; a plain --prompt run must not import them
+DEFERRED_MODULES = (
+    'concurrent.futures', 'multiprocessing', 'sqlite3', 'csv', 'datetime',
+    'difflib', 'history', 'edit_script', 'tracemalloc', 'memory_profile',
+    'rule_profile', 'feature_index', 'corpus_stats', 'long_prompt', 'engine',
+    'prefilter', 'deadline'
+)
+
+SAMPLE_PROMPT = "Write a story about a robot"
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Lets the warm-up run write the bytecode the measured runs load
+ENV = {name: value for name, value in os.environ.items() if name != 'PYTHONDONTWRITEBYTECODE'}
+
+
+def measure_imports(runs: int) -> Tuple[float, Dict[str, float]]:
+    """
+    Median cumulative import time of main and per-module self times, in ms
+    """
+    totals = []
+    self_times: Dict[str, List[float]] = {}
+    for _ in range(runs):
+        completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import main'],
+                                   cwd=HERE, env=ENV, capture_output=True, text=True, check=True)
+        for line in completed.stderr.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            own, cumulative, name = line[len('import time:'):].split('|')
+            self_times.setdefault(name.strip(), []).append(int(own) / 1000)
+            if name.strip() == 'main':
+                totals.append(int(cumulative) / 1000)
+    return statistics.median(totals), {name: statistics.median(times)
+                                       for name, times in self_times.items()}
+
+
+def measure_command(command: List[str], runs: int, cwd: str = HERE) -> float:
+    """Median wall time of a command in ms"""
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=cwd, env=ENV, stdout=subprocess.DEVNULL, check=True)
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+def measure_engine(runs: int) -> float:
+    """Median time to load config.json and compile the engine, in ms"""
+    sys.path.insert(0, HERE)
+    from engine import compile_engine
+    from utils import load_config
+
+    config_path = os.path.join(HERE, 'config.json')
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        compile_engine(load_config(config_path))
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+def deferred_imports() -> List[str]:
+    """Deferred modules that ``import main`` pulls in anyway"""
+    code = ("import sys, main; "
+            f"print(' '.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))")
+    completed = subprocess.run([sys.executable, '-c', code], cwd=HERE, env=ENV,
+                               capture_output=True, text=True, check=True)
+    return completed.stdout.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure CLI startup time against a budget")
+    parser.add_argument('--runs', type=int, default=15, help='Runs per measurement (default: 15)')
+    parser.add_argument('--budget-ms', type=float, default=IMPORT_BUDGET_MS,
+                        help=f'Import time budget for main (default: {IMPORT_BUDGET_MS:g})')
+    parser.add_argument('--top', type=int, default=10, help='Slowest modules to list (default: 10)')
+    args = parser.parse_args()
+
+    # Warm up the bytecode cache so every measured run is a warm start
+    measure_command([sys.executable, '-c', 'import main'], 1)
+
+    import_ms, self_times = measure_imports(args.runs)
+    interpreter_ms = measure_command([sys.executable, '-c', 'pass'], args.runs)
+    command = [sys.executable, os.path.join(HERE, 'main.py'), '--prompt', SAMPLE_PROMPT,
+               '--config', os.path.join(HERE, 'config.json')]
+    # The configured history database is relative, so it lands in the scratch directory
+    with tempfile.TemporaryDirectory() as scratch:
+        cli_ms = measure_command(command, args.runs, cwd=scratch)
+    cli_no_history_ms = measure_command(command + ['--no-history'], args.runs)
+    engine_ms = measure_engine(args.runs * 10)
+    leaked = deferred_imports()
+
+    print(f"Interpreter startup:    {interpreter_ms:7.1f} ms")
+    print(f"import main:            {import_ms:7.1f} ms")
+    print(f"Engine compile:         {engine_ms:7.2f} ms")
+    print(f"main.py --prompt:       {cli_ms:7.1f} ms")
+    print(f"  with --no-history:    {cli_no_history_ms:7.1f} ms")
+
+    print(f"\nSlowest modules (self time):")
+    for name, ms in sorted(self_times.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {ms:6.2f} ms  {name}")
+
+    checks = [
+        (f"import main <= {args.budget_ms:g} ms", import_ms <= args.budget_ms),
+        (f"engine compile <= {ENGINE_BUDGET_MS:g} ms", engine_ms <= ENGINE_BUDGET_MS),
+        ("no deferred modules imported" + (f" (found: {', '.join(leaked)})" if leaked else ""),
+         not leaked)
+    ]
+    print(f"\nBUDGET CHECK:")
+    for label, ok in checks:
+        print(f"  {'PASS' if ok else 'FAIL'}  {label}")
+
+    if not all(ok for _, ok in checks):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
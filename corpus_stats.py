@@ -0,0 +1,416 @@
+"""
+Corpus Statistics Module
+
+Streaming aggregations over analysis results for corpora that are too
+large to keep in memory. Every aggregator consumes results one at a
+time and holds only a bounded amount of state.
+"""
+
+import heapq
+import json
+import math
+import random
+from collections import Counter
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from prompt_analyzer import SCORE_CATEGORIES
+
+
+SUMMARY_QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9, 0.99)
+FEEDBACK_FIELDS = ('strengths', 'weaknesses', 'suggestions')
+ESTIMATE_QUANTILES = (0.1, 0.5, 0.9)
+
+
+def result_score(result, category: str) -> float:
+    """Return a result's score for 'overall' or one of the analyzer categories"""
+    return getattr(result, f'{category}_score')
+
+
+class TopKSelector:
+    """
+    Keeps the K lowest- and K highest-scoring results for one category
+
+    Memory is O(K) regardless of how many results are added. Ties are
+    broken in favour of the result seen first.
+    """
+
+    def __init__(self, k: int, category: str = 'overall'):
+        if k < 1:
+            raise ValueError("k must be at least 1")
+        if category not in SCORE_CATEGORIES:
+            raise ValueError(f"Unknown category '{category}'")
+        self.k = k
+        self.category = category
+        # Heap roots are the entries evicted first: the highest score on
+        # the worst-K heap and the lowest score on the best-K heap
+        self._worst: List[Tuple[float, int, object]] = []
+        self._best: List[Tuple[float, int, object]] = []
+
+    def add(self, index: int, result):
+        """Offer a result; ``index`` identifies it in the input stream"""
+        score = result_score(result, self.category)
+        self._offer(self._worst, (-score, -index, result))
+        self._offer(self._best, (score, -index, result))
+
+    def worst(self) -> List[Tuple[int, float, object]]:
+        """Return (index, score, result) for the lowest scores, worst first"""
+        return [(-index, -score, result)
+                for score, index, result in sorted(self._worst, reverse=True)]
+
+    def best(self) -> List[Tuple[int, float, object]]:
+        """Return (index, score, result) for the highest scores, best first"""
+        return [(-index, score, result)
+                for score, index, result in sorted(self._best, key=lambda item: (-item[0], -item[1]))]
+
+    def _offer(self, heap: list, item: tuple):
+        if len(heap) < self.k:
+            heapq.heappush(heap, item)
+        elif item[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, item)
+
+
+class Leaderboard:
+    """Top-K selectors for several categories, fed in a single pass"""
+
+    def __init__(self, k: int, categories: Sequence[str] = ('overall',)):
+        self.selectors: Dict[str, TopKSelector] = {
+            category: TopKSelector(k, category) for category in categories
+        }
+        self.count = 0
+
+    def add(self, index: int, result):
+        """Offer a result to every category's selector"""
+        self.count += 1
+        for selector in self.selectors.values():
+            selector.add(index, result)
+
+    def selected_results(self) -> List[Tuple[int, object]]:
+        """Return every retained (index, result) once, in input order"""
+        retained = {}
+        for selector in self.selectors.values():
+            for index, _, result in selector.worst() + selector.best():
+                retained[index] = result
+        return sorted(retained.items(), key=lambda item: item[0])
+
+
+class RunningStats:
+    """Count, mean, variance, min and max maintained with Welford's method"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+
+    def merge(self, other: 'RunningStats'):
+        """Fold another RunningStats into this one (Chan et al.)"""
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.variance)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "min": self.minimum if self.count else None,
+            "max": self.maximum if self.count else None
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'RunningStats':
+        stats = cls()
+        stats.count = data["count"]
+        stats.mean = data["mean"]
+        stats.m2 = data["m2"]
+        if stats.count:
+            stats.minimum = data["min"]
+            stats.maximum = data["max"]
+        return stats
+
+
+class KLLSketch:
+    """
+    Mergeable quantile sketch (Karnin, Lang and Liberty)
+
+    Items live in a stack of compactors; an item at level h stands for
+    2**h inputs. When the sketch is full, the lowest over-capacity level
+    is sorted and every other item (random offset) is promoted. Rank
+    error is roughly 1.7 / k with high probability, independent of the
+    stream length, and two sketches merge by concatenating levels.
+    """
+
+    def __init__(self, k: int = 200, seed: Optional[int] = None):
+        self.k = k
+        self.n = 0
+        self.compactors: List[List[float]] = [[]]
+        self._random = random.Random(seed)
+        self._update_capacity()
+
+    def update(self, value: float):
+        self.compactors[0].append(value)
+        self.n += 1
+        if self._size() >= self._max_size:
+            self._compress()
+
+    def merge(self, other: 'KLLSketch'):
+        """Fold another sketch into this one"""
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append([])
+        for level, items in enumerate(other.compactors):
+            self.compactors[level].extend(items)
+        self.n += other.n
+        self._update_capacity()
+        while self._size() >= self._max_size:
+            self._compress()
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Return an approximate q-quantile (0 <= q <= 1)"""
+        weighted = sorted(
+            (value, 1 << level)
+            for level, items in enumerate(self.compactors)
+            for value in items
+        )
+        if not weighted:
+            return None
+        target = q * sum(weight for _, weight in weighted)
+        cumulative = 0
+        for value, weight in weighted:
+            cumulative += weight
+            if cumulative >= target:
+                return value
+        return weighted[-1][0]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"k": self.k, "n": self.n, "compactors": self.compactors}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'KLLSketch':
+        sketch = cls(k=data["k"])
+        sketch.n = data["n"]
+        sketch.compactors = [list(items) for items in data["compactors"]] or [[]]
+        sketch._update_capacity()
+        return sketch
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.compactors) - level - 1
+        return int(math.ceil(self.k * (2 / 3) ** depth)) + 1
+
+    def _update_capacity(self):
+        self._max_size = sum(self._capacity(level) for level in range(len(self.compactors)))
+
+    def _size(self) -> int:
+        return sum(len(items) for items in self.compactors)
+
+    def _compress(self):
+        for level, items in enumerate(self.compactors):
+            if len(items) >= self._capacity(level):
+                if level + 1 == len(self.compactors):
+                    self.compactors.append([])
+                    self._update_capacity()
+                items.sort()
+                leftover = [items.pop()] if len(items) % 2 else []
+                offset = self._random.getrandbits(1)
+                self.compactors[level + 1].extend(items[offset::2])
+                self.compactors[level] = leftover
+                return
+
+
+class CorpusSummary:
+    """
+    Streaming summary of a corpus that never stores per-prompt results
+
+    Keeps running moments and a KLL sketch per score category, plus
+    counts of every strength, weakness and suggestion. Summaries built
+    on different workers, shards or days can be merged, and serialize
+    to JSON so that roll-ups only need the saved summaries.
+    """
+
+    def __init__(self, sketch_k: int = 200):
+        self.count = 0
+        self.stats = {category: RunningStats() for category in SCORE_CATEGORIES}
+        self.sketches = {category: KLLSketch(sketch_k) for category in SCORE_CATEGORIES}
+        self.feedback = {field: Counter() for field in FEEDBACK_FIELDS}
+
+    def add(self, result):
+        """Fold one analysis result into the summary"""
+        self.count += 1
+        for category in SCORE_CATEGORIES:
+            score = result_score(result, category)
+            self.stats[category].add(score)
+            self.sketches[category].update(score)
+        for field in FEEDBACK_FIELDS:
+            self.feedback[field].update(getattr(result, field))
+
+    def merge(self, other: 'CorpusSummary') -> 'CorpusSummary':
+        """Fold another summary into this one and return self"""
+        self.count += other.count
+        for category in SCORE_CATEGORIES:
+            self.stats[category].merge(other.stats[category])
+            self.sketches[category].merge(other.sketches[category])
+        for field in FEEDBACK_FIELDS:
+            self.feedback[field].update(other.feedback[field])
+        return self
+
+    def quantiles(self, category: str,
+                  quantiles: Sequence[float] = SUMMARY_QUANTILES) -> Dict[str, Optional[float]]:
+        sketch = self.sketches[category]
+        return {f"p{round(q * 100)}": sketch.quantile(q) for q in quantiles}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "stats": {category: stats.to_dict() for category, stats in self.stats.items()},
+            "sketches": {category: sketch.to_dict() for category, sketch in self.sketches.items()},
+            "feedback": {field: dict(counter) for field, counter in self.feedback.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CorpusSummary':
+        summary = cls()
+        summary.count = data["count"]
+        summary.stats = {category: RunningStats.from_dict(stats)
+                         for category, stats in data["stats"].items()}
+        summary.sketches = {category: KLLSketch.from_dict(sketch)
+                            for category, sketch in data["sketches"].items()}
+        summary.feedback = {field: Counter(counts) for field, counts in data["feedback"].items()}
+        return summary
+
+    def save(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str) -> 'CorpusSummary':
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+
+class ReservoirSampler:
+    """Uniform fixed-size sample of a stream of unknown length (Algorithm R)"""
+
+    def __init__(self, size: int, seed: Optional[int] = None):
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        self.size = size
+        self.seen = 0
+        self._items: List[Any] = []
+        self._random = random.Random(seed)
+
+    def add(self, item):
+        self.seen += 1
+        if len(self._items) < self.size:
+            self._items.append(item)
+        else:
+            slot = self._random.randrange(self.seen)
+            if slot < self.size:
+                self._items[slot] = item
+
+    def sample(self) -> List[Any]:
+        """Return the sample in random order, so any prefix is also uniform"""
+        items = list(self._items)
+        self._random.shuffle(items)
+        return items
+
+
+@dataclass
+class ScoreEstimate:
+    """Estimated mean and quantiles of one category with confidence intervals"""
+    category: str
+    mean: float
+    margin: float
+    quantiles: Dict[str, Tuple[float, float, float]]
+
+
+class SampleEstimator:
+    """
+    Estimates corpus score statistics from a uniform sample
+
+    Mean intervals use the normal approximation with a finite population
+    correction when the population size is known; quantile intervals
+    are distribution-free, taken from the order statistics of the
+    sample.
+    """
+
+    def __init__(self, population: Optional[int] = None, confidence: float = 0.95,
+                 categories: Sequence[str] = SCORE_CATEGORIES):
+        self.population = population
+        self.confidence = confidence
+        self._z = NormalDist().inv_cdf((1 + confidence) / 2)
+        self.stats = {category: RunningStats() for category in categories}
+        self._scores: Dict[str, List[float]] = {category: [] for category in categories}
+
+    @property
+    def count(self) -> int:
+        return next(iter(self.stats.values())).count
+
+    def add(self, result):
+        for category, stats in self.stats.items():
+            score = result_score(result, category)
+            stats.add(score)
+            self._scores[category].append(score)
+
+    def margin(self, category: str) -> float:
+        """Half-width of the confidence interval for a category's mean"""
+        stats = self.stats[category]
+        if stats.count < 2:
+            return math.inf
+        margin = self._z * stats.stdev / math.sqrt(stats.count)
+        if self.population and self.population > 1:
+            margin *= math.sqrt(max(self.population - stats.count, 0) / (self.population - 1))
+        return margin
+
+    def converged(self, precision: float, min_samples: int = 30) -> bool:
+        """True once every category's mean is known to within ``precision``"""
+        if self.count >= (self.population or math.inf):
+            return True
+        return (self.count >= min_samples
+                and all(self.margin(category) <= precision for category in self.stats))
+
+    def estimates(self, quantiles: Sequence[float] = ESTIMATE_QUANTILES) -> Dict[str, ScoreEstimate]:
+        return {
+            category: ScoreEstimate(
+                category=category,
+                mean=stats.mean,
+                margin=self.margin(category),
+                quantiles={f"p{round(q * 100)}": self._quantile_interval(category, q)
+                           for q in quantiles}
+            )
+            for category, stats in self.stats.items()
+        }
+
+    def _quantile_interval(self, category: str, q: float) -> Tuple[float, float, float]:
+        """(estimate, low, high) for the q-quantile from sample order statistics"""
+        scores = sorted(self._scores[category])
+        n = len(scores)
+        if n == 0:
+            return math.nan, math.nan, math.nan
+        spread = self._z * math.sqrt(n * q * (1 - q))
+        low = max(int(math.floor(n * q - spread)), 0)
+        high = min(int(math.ceil(n * q + spread)), n - 1)
+        estimate = scores[min(int(n * q), n - 1)]
+        return estimate, scores[low], scores[high]
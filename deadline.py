@@ -0,0 +1,87 @@
+"""
+Deadline Module
+
+Latency budgets for analysis. A DeadlinePolicy predicts how long each
+stage of the pipeline will take from the throughput it has observed so
+far, decides how far a request can be degraded to finish on time and
+counts how often each degradation level fires.
+"""
+
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+
+# Degradation levels, from none to the cheapest approximation
+FULL = 'full'
+NO_SEARCH = 'no_search'
+SCORES_ONLY = 'scores_only'
+APPROXIMATE = 'approximate'
+DEGRADATION_LEVELS = (FULL, NO_SEARCH, SCORES_ONLY, APPROXIMATE)
+
+# Conservative starting estimates in seconds per character; they are
+# replaced by observed throughput after the first few requests
+DEFAULT_STAGE_RATES = {
+    'analyze': 1e-6,
+    'optimize': 1e-6,
+    'search': 2e-5
+}
+
+# Smallest prefix worth analyzing for an approximate result
+MIN_APPROXIMATE_CHARS = 200
+
+
+class DeadlinePolicy:
+    """
+    Cost model and degradation counters shared by concurrent requests
+
+    Stage costs are modelled as seconds per character, tracked with an
+    exponentially weighted moving average of observed timings.
+    """
+
+    def __init__(self, smoothing: float = 0.2, safety_margin: float = 1.5,
+                 stage_rates: Optional[Dict[str, float]] = None):
+        self.smoothing = smoothing
+        self.safety_margin = safety_margin
+        self._rates = dict(DEFAULT_STAGE_RATES, **(stage_rates or {}))
+        self._counters = Counter({level: 0 for level in DEGRADATION_LEVELS})
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def deadline_after(budget: float) -> float:
+        """Return the deadline ``budget`` seconds from now"""
+        return time.monotonic() + budget
+
+    @staticmethod
+    def remaining(deadline: float) -> float:
+        """Seconds left before ``deadline``"""
+        return deadline - time.monotonic()
+
+    def predict(self, stage: str, chars: int) -> float:
+        """Predicted seconds for running ``stage`` over ``chars`` characters"""
+        return self._rates[stage] * max(chars, 1) * self.safety_margin
+
+    def affords(self, stage: str, chars: int, deadline: float) -> bool:
+        """True if ``stage`` is expected to finish before ``deadline``"""
+        return self.predict(stage, chars) <= self.remaining(deadline)
+
+    def affordable_chars(self, stage: str, deadline: float) -> int:
+        """Largest input ``stage`` is expected to finish before ``deadline``"""
+        return max(int(self.remaining(deadline) / (self._rates[stage] * self.safety_margin)), 0)
+
+    def record(self, stage: str, chars: int, seconds: float):
+        """Fold an observed stage timing into the cost model"""
+        rate = seconds / max(chars, 1)
+        with self._lock:
+            self._rates[stage] += self.smoothing * (rate - self._rates[stage])
+
+    def count(self, level: str):
+        """Record that a request finished at ``level``"""
+        with self._lock:
+            self._counters[level] += 1
+
+    def counters(self) -> Dict[str, int]:
+        """Return how many requests finished at each degradation level"""
+        with self._lock:
+            return {level: self._counters[level] for level in DEGRADATION_LEVELS}
@@ -0,0 +1,216 @@
+"""
+Edit Script Module
+
+Compact representation of an optimized prompt as edits against the
+original. The optimizer mostly inserts fixed template text, so inserted
+templates are stored as references to their ID in
+``prompt_optimizer.TEMPLATES`` rather than as text.
+
+An edit script is a JSON-ready list of edits ``[start, end, *segments]``
+that replace ``original[start:end]``; each segment is either literal
+text or a one-element list holding a template ID.
+
+Encoding runs in time close to linear in the prompt length. The common
+prefix and suffix are skipped, the rest is diffed line by line or
+sentence by sentence, and changed blocks are diffed word by word in
+windows of bounded size. A word-level diff of the whole prompt costs
+about cubic time, because common words repeat so often. Edits a few
+characters apart are merged, and a script that would still be larger
+than the optimized text is replaced by a single edit holding that text.
+"""
+
+import difflib
+import json
+import re
+from typing import List, Sequence, Tuple, Union
+from prompt_optimizer import TEMPLATES
+
+
+# Words keep their trailing whitespace, and a word ends after sentence
+# punctuation even when the next sentence follows without a space
+TOKEN_PATTERN = re.compile(r'\s+|[^\s.!?:]*[.!?:]+\s*|[^\s.!?:]+\s*')
+
+# Longest first, so a template that contains another wins
+TEMPLATE_PATTERN = re.compile('|'.join(
+    re.escape(text) for text in sorted(TEMPLATES.values(), key=len, reverse=True)
+))
+TEMPLATE_IDS = {text: template_id for template_id, text in TEMPLATES.items()}
+
+# Tokens that end a sentence; whitespace with a newline ends a line
+SENTENCE_END_PATTERN = re.compile(r'[.!?:]\s*$')
+# Largest window of tokens diffed word by word
+MAX_TOKEN_DIFF = 128
+# Edits at most this many characters apart are merged into one
+MAX_MERGED_GAP = 12
+
+Segment = Union[str, List[str]]
+Edit = List[Union[int, Segment]]
+
+
+def encode_edits(original: str, optimized: str) -> List[Edit]:
+    """
+    Compute the edit script that turns ``original`` into ``optimized``
+
+    Args:
+        original: The original prompt
+        optimized: The optimized prompt
+
+    Returns:
+        Edit script; empty when the prompts are equal
+    """
+    if original == optimized:
+        return []
+    source = _tokenize(original)
+    target = _tokenize(optimized)
+    offsets = [0]
+    for token in source:
+        offsets.append(offsets[-1] + len(token))
+
+    # Templates are mostly prepended or appended, so most text is shared at the ends
+    prefix = 0
+    limit = min(len(source), len(target))
+    while prefix < limit and source[prefix] == target[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and source[-1 - suffix] == target[-1 - suffix]:
+        suffix += 1
+
+    edits = []
+    for i1, i2, j1, j2 in _changes(source, target, prefix, len(source) - suffix,
+                                   prefix, len(target) - suffix):
+        if edits and offsets[i1] - edits[-1][1] <= MAX_MERGED_GAP:
+            # Repeating a short unchanged gap is cheaper than starting a new edit
+            edits[-1][1] = offsets[i2]
+            edits[-1][3] = j2
+        else:
+            edits.append([offsets[i1], offsets[i2], j1, j2])
+    edits = [[start, end, *_segments(target[j1:j2])] for start, end, j1, j2 in edits]
+
+    # A script that rewrites nearly every sentence can outgrow the text it encodes
+    if len(json.dumps(edits, ensure_ascii=False)) >= len(json.dumps(optimized, ensure_ascii=False)):
+        return [[0, len(original), *_segments(target)]]
+    return edits
+
+
+def apply_edits(original: str, edits: Sequence[Sequence]) -> str:
+    """
+    Rebuild the optimized prompt from the original and an edit script
+
+    Raises:
+        ValueError: If the script refers to an unknown template
+    """
+    pieces = []
+    position = 0
+    for start, end, *segments in edits:
+        pieces.append(original[position:start])
+        for segment in segments:
+            if isinstance(segment, str):
+                pieces.append(segment)
+            elif segment[0] in TEMPLATES:
+                pieces.append(TEMPLATES[segment[0]])
+            else:
+                raise ValueError(f"Unknown template '{segment[0]}' in edit script")
+        position = end
+    pieces.append(original[position:])
+    return ''.join(pieces)
+
+
+def _changes(source: List[str], target: List[str], a1: int, a2: int,
+             b1: int, b2: int) -> List[Tuple[int, int, int, int]]:
+    """Replaced token ranges (i1, i2, j1, j2) between source[a1:a2] and target[b1:b2]"""
+    source_bounds = _segment_bounds(source, a1, a2)
+    target_bounds = _segment_bounds(target, b1, b2)
+    source_segments = [''.join(source[start:end]) for start, end in source_bounds]
+    target_segments = [''.join(target[start:end]) for start, end in target_bounds]
+
+    # Segments are contiguous, so a run of them starts where its first one does
+    source_starts = [start for start, _ in source_bounds] + [a2]
+    target_starts = [start for start, _ in target_bounds] + [b2]
+
+    changes = []
+    # Segments repeated throughout the prompt are junked as anchors
+    matcher = difflib.SequenceMatcher(None, source_segments, target_segments)
+    for tag, s1, s2, t1, t2 in matcher.get_opcodes():
+        if tag == 'equal':
+            continue
+        if tag == 'replace' and s2 - s1 == t2 - t1:
+            # Rewrites within sentences keep the sentences paired, so each
+            # pair is diffed on its own
+            for s, t in zip(range(s1, s2), range(t1, t2)):
+                if source_segments[s] != target_segments[t]:
+                    changes.extend(_word_changes(source, target, source_starts[s],
+                                                 source_starts[s + 1], target_starts[t],
+                                                 target_starts[t + 1]))
+        else:
+            changes.extend(_word_changes(source, target, source_starts[s1], source_starts[s2],
+                                         target_starts[t1], target_starts[t2]))
+    return changes
+
+
+def _word_changes(source: List[str], target: List[str], i1: int, i2: int,
+                  j1: int, j2: int) -> List[Tuple[int, int, int, int]]:
+    """Replaced token ranges between source[i1:i2] and target[j1:j2], diffed word by word"""
+    if i1 == i2 or j1 == j2:
+        return [(i1, i2, j1, j2)]
+    changes = []
+    # The optimizer's edits are local, so large blocks are cut into
+    # windows at proportional positions and each window is diffed alone
+    windows = -(-max(i2 - i1, j2 - j1) // MAX_TOKEN_DIFF)
+    for window in range(windows):
+        k1 = i1 + (i2 - i1) * window // windows
+        k2 = i1 + (i2 - i1) * (window + 1) // windows
+        l1 = j1 + (j2 - j1) * window // windows
+        l2 = j1 + (j2 - j1) * (window + 1) // windows
+        words = difflib.SequenceMatcher(None, source[k1:k2], target[l1:l2], autojunk=False)
+        changes.extend((k1 + m1, k1 + m2, l1 + n1, l1 + n2)
+                       for tag, m1, m2, n1, n2 in words.get_opcodes() if tag != 'equal')
+    return changes
+
+
+def _segment_bounds(tokens: List[str], start: int, end: int) -> List[Tuple[int, int]]:
+    """Split tokens[start:end] into lines and sentences; each template is a segment of its own"""
+    bounds = []
+    segment_start = start
+    for position in range(start, end):
+        token = tokens[position]
+        if token in TEMPLATE_IDS:
+            if segment_start < position:
+                bounds.append((segment_start, position))
+            bounds.append((position, position + 1))
+            segment_start = position + 1
+        elif '\n' in token or SENTENCE_END_PATTERN.search(token):
+            bounds.append((segment_start, position + 1))
+            segment_start = position + 1
+    if segment_start < end:
+        bounds.append((segment_start, end))
+    return bounds
+
+
+def _tokenize(text: str) -> List[str]:
+    """Split text into whitespace and word tokens, keeping templates whole"""
+    tokens = []
+    position = 0
+    for match in TEMPLATE_PATTERN.finditer(text):
+        tokens.extend(TOKEN_PATTERN.findall(text, position, match.start()))
+        tokens.append(match.group())
+        position = match.end()
+    tokens.extend(TOKEN_PATTERN.findall(text, position))
+    return tokens
+
+
+def _segments(tokens: Sequence[str]) -> List[Segment]:
+    """Merge inserted tokens into literal runs and template references"""
+    segments: List[Segment] = []
+    literal = []
+    for token in tokens:
+        template_id = TEMPLATE_IDS.get(token)
+        if template_id is None:
+            literal.append(token)
+            continue
+        if literal:
+            segments.append(''.join(literal))
+            literal = []
+        segments.append([template_id])
+    if literal:
+        segments.append(''.join(literal))
+    return segments
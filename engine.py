@@ -0,0 +1,274 @@
+"""
+Analysis Engine Module
+
+An engine is a PromptAnalyzer/PromptOptimizer pair compiled from one
+configuration. Engines are immutable, cached by a hash of the config
+they were built from, and can be hot-swapped by a ConfigWatcher when
+config.json changes on disk.
+"""
+
+import hashlib
+import json
+import math
+import os
+import sys
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+from prompt_analyzer import CATEGORIES, PromptAnalyzer
+from prompt_optimizer import PromptOptimizer
+from utils import load_config
+
+
+DEFAULT_CACHE_SIZE = 4
+
+_NOT_REJECTED = object()
+
+# Config sections a per-request overlay may change; the rest (history,
+# output settings) belong to the process serving the request
+OVERLAY_SECTIONS = ('scoring_weights', 'thresholds', 'optimization_settings')
+
+# Settings an overlay may change in each section, by kind of value
+OVERLAY_SETTINGS = {
+    'scoring_weights': {category: 'number' for category in CATEGORIES},
+    'thresholds': {'excellent': 'number', 'good': 'number', 'needs_improvement': 'number'},
+    'optimization_settings': {
+        'max_optimizations_per_category': 'count',
+        'preserve_original_intent': 'flag',
+        'add_structure_headers': 'flag',
+        'enhance_creativity': 'flag',
+        'beam_width': 'count',
+        'search_time_budget': 'budget'
+    }
+}
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+# What each kind of setting accepts, and how to say so
+SETTING_KINDS: Dict[str, Tuple[Callable[[Any], bool], str]] = {
+    'number': (_is_number, 'a finite number'),
+    'count': (lambda value: isinstance(value, int) and not isinstance(value, bool) and value >= 1,
+              'an integer of at least 1'),
+    'budget': (lambda value: _is_number(value) and value > 0, 'a finite positive number'),
+    'flag': (lambda value: isinstance(value, bool), 'a boolean')
+}
+
+
+@dataclass(frozen=True)
+class AnalysisEngine:
+    """Analyzer and optimizer compiled from a single configuration"""
+    config_hash: str
+    config: Dict[str, Any]
+    analyzer: PromptAnalyzer
+    optimizer: PromptOptimizer
+
+
+def config_hash(config: Dict[str, Any]) -> str:
+    """Return a stable hash of a configuration dictionary"""
+    canonical = json.dumps(config, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+def compile_engine(config: Dict[str, Any]) -> AnalysisEngine:
+    """
+    Build an engine from a configuration dictionary
+
+    Args:
+        config: Configuration as returned by load_config
+
+    Returns:
+        AnalysisEngine for the configuration
+    """
+    return AnalysisEngine(
+        config_hash=config_hash(config),
+        config=config,
+        analyzer=PromptAnalyzer(
+            scoring_weights=config.get('scoring_weights'),
+            thresholds=config.get('thresholds')
+        ),
+        optimizer=PromptOptimizer(settings=config.get('optimization_settings'))
+    )
+
+
+def apply_overlay(config: Dict[str, Any], overlay: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge a config overlay over a base configuration
+
+    Each overlay section is merged key by key into the base section, so
+    an overlay only needs to name the settings it changes.
+
+    Args:
+        config: Base configuration, as returned by load_config
+        overlay: Sections from OVERLAY_SECTIONS mapping setting names from
+            OVERLAY_SETTINGS to values of their kind
+
+    Returns:
+        The effective configuration; ``config`` itself when there is no overlay
+
+    Raises:
+        ValueError: If the overlay names another section or setting, or
+            a setting has a value of the wrong type or out of range
+    """
+    if not overlay:
+        return config
+    if not isinstance(overlay, dict):
+        raise ValueError("Config overlay must be an object")
+
+    effective = dict(config)
+    for section, settings in overlay.items():
+        if section not in OVERLAY_SECTIONS:
+            raise ValueError(f"Config section '{section}' cannot be overridden "
+                             f"(allowed: {', '.join(OVERLAY_SECTIONS)})")
+        if not isinstance(settings, dict):
+            raise ValueError(f"Config section '{section}' must be an object")
+        allowed = OVERLAY_SETTINGS[section]
+        for name, value in settings.items():
+            if name not in allowed:
+                raise ValueError(f"Setting '{section}.{name}' cannot be overridden "
+                                 f"(allowed: {', '.join(allowed)})")
+            accepts, description = SETTING_KINDS[allowed[name]]
+            if not accepts(value):
+                raise ValueError(f"Setting '{section}.{name}' must be {description}")
+        effective[section] = {**config.get(section, {}), **settings}
+    return effective
+
+
+class EngineCache:
+    """
+    Small LRU cache of compiled engines keyed by config hash
+
+    Configurations that differ only in key order share an engine.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self._engines: "OrderedDict[str, AnalysisEngine]" = OrderedDict()
+        self._counters = Counter({'hits': 0, 'misses': 0, 'evictions': 0})
+        self._lock = threading.Lock()
+
+    def get(self, config: Dict[str, Any]) -> AnalysisEngine:
+        """Return the engine for a config, compiling it on a cache miss"""
+        key = config_hash(config)
+        with self._lock:
+            engine = self._engines.get(key)
+            if engine is not None:
+                self._engines.move_to_end(key)
+                self._counters['hits'] += 1
+                return engine
+            self._counters['misses'] += 1
+
+        engine = compile_engine(config)
+
+        with self._lock:
+            # Another thread may have compiled the same config meanwhile
+            engine = self._engines.setdefault(key, engine)
+            self._engines.move_to_end(key)
+            while len(self._engines) > self.max_size:
+                self._engines.popitem(last=False)
+                self._counters['evictions'] += 1
+        return engine
+
+    def counters(self) -> Dict[str, int]:
+        """Return the number of cache hits, misses (compiles) and evictions"""
+        with self._lock:
+            return dict(self._counters)
+
+    def __contains__(self, config: Dict[str, Any]) -> bool:
+        with self._lock:
+            return config_hash(config) in self._engines
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._engines)
+
+
+class ConfigWatcher:
+    """
+    Watches a config file and swaps in a freshly compiled engine
+
+    Callers read ``watcher.engine`` once per request and use that engine
+    for the whole request. A reload compiles the new engine off to the
+    side and then replaces the reference in a single assignment, so
+    in-flight requests finish on the engine they started with.
+    """
+
+    def __init__(self, config_path: str = "config.json", cache: Optional[EngineCache] = None,
+                 interval: float = 1.0,
+                 on_reload: Optional[Callable[[AnalysisEngine], None]] = None):
+        self.config_path = config_path
+        self.cache = cache or EngineCache()
+        self.interval = interval
+        self.on_reload = on_reload
+        self._signature = self._file_signature()
+        # Signature of the last changed file that failed to load (None if it was removed)
+        self._rejected: Any = _NOT_REJECTED
+        self._engine = self.cache.get(load_config(config_path))
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def engine(self) -> AnalysisEngine:
+        return self._engine
+
+    def check(self) -> bool:
+        """
+        Reload the engine if the config file changed
+
+        Returns:
+            True if a different engine was swapped in
+
+        Raises:
+            OSError, ValueError: If the changed file cannot be loaded; raised
+                once per change, until the file changes again
+        """
+        signature = self._file_signature()
+        if signature == self._signature or signature == self._rejected:
+            return False
+
+        # A missing or invalid file raises here and leaves the current engine in place
+        try:
+            engine = self.cache.get(load_config(self.config_path, strict=True))
+        except (OSError, ValueError):
+            self._rejected = signature
+            raise
+        self._signature = signature
+        self._rejected = _NOT_REJECTED
+        if engine.config_hash == self._engine.config_hash:
+            return False
+        self._engine = engine
+        if self.on_reload:
+            self.on_reload(engine)
+        return True
+
+    def start(self):
+        """Start polling the config file on a background thread"""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the background polling thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                # Keep serving with the current engine on a bad config
+                print(f"Warning: Could not reload {self.config_path}: {e}", file=sys.stderr)
+
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.config_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Feature Index Module
+
+On-disk inverted index from analysis features to prompt numbers, so
+questions such as "which prompts lack a role definition but ask for
+JSON" are answered without analyzing the corpus again. Terms are:
+
+    indicator:<keyword>   the prompt contains an indicator keyword
+    list:<keyword list>   it contains any keyword of a list, e.g. list:role_keywords
+    strength:<code>       it received a strength, e.g. strength:examples
+    weakness:<code>       it received a weakness, e.g. weakness:pronouns
+    suggestion:<code>     it received a suggestion, e.g. suggestion:context.2
+
+Prompt numbers start at 1, in the order of the analysis report. Each
+posting list is stored as varint-encoded gaps between sorted numbers.
+Queries combine terms with AND, OR, NOT and parentheses; quote keywords
+that contain spaces (indicator:"you are").
+"""
+
+import argparse
+import json
+import os
+import re
+import struct
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+from corpus_stats import FEEDBACK_FIELDS
+from prompt_analyzer import PromptAnalyzer
+from prompt_optimizer import STRENGTHS, SUGGESTIONS, WEAKNESSES
+from rule_profile import indicator_owners
+from utils import iter_prompts, truncate_text
+
+
+MAGIC = b"PROMPTIDX1\n"
+HEADER_LENGTH = struct.Struct("<I")
+
+TERM_PREFIXES = ('indicator', 'list', 'strength', 'weakness', 'suggestion')
+
+# Feedback message -> term, per result field
+FEEDBACK_TERMS = {
+    'strengths': {message: f"strength:{code}" for code, message in STRENGTHS.items()},
+    'weaknesses': {message: f"weakness:{code}" for code, message in WEAKNESSES.items()},
+    'suggestions': {message: f"suggestion:{category}.{number}"
+                    for category, messages in SUGGESTIONS.items()
+                    for number, message in enumerate(messages, 1)}
+}
+
+TOKEN_PATTERN = re.compile(r'\s*(\(|\)|[^\s()"]*"[^"]*"|[^\s()]+)')
+
+
+def indicator_term(pattern: str) -> str:
+    """Term of an indicator keyword (pronoun patterns are padded with spaces)"""
+    return f"indicator:{pattern.strip()}"
+
+
+class FeatureIndexBuilder:
+    """Collects the posting lists of analysis results, numbered in order"""
+
+    def __init__(self, analyzer: PromptAnalyzer):
+        self.analyzer = analyzer
+        self.prompts = 0
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        self._terms = {
+            pattern: (indicator_term(pattern), *(f"list:{owner}" for owner in owners))
+            for pattern, owners in indicator_owners(analyzer).items()
+        }
+
+    def add(self, result) -> int:
+        """Index one result and return its prompt number"""
+        self.prompts += 1
+        prompt_lower = result.original_prompt.lower()
+        terms = {term for pattern in self.analyzer.patterns if pattern in prompt_lower
+                 for term in self._terms[pattern]}
+        for kind in FEEDBACK_FIELDS:
+            # Messages outside the codebook have no term
+            codes = FEEDBACK_TERMS[kind]
+            terms.update(codes[message] for message in getattr(result, kind) if message in codes)
+        for term in terms:
+            self._postings[term].append(self.prompts)
+        return self.prompts
+
+    def save(self, output_path: str, source: Optional[str] = None):
+        """Write the index, replacing any previous one only once complete"""
+        blob = bytearray()
+        terms = {}
+        for term in sorted(self._postings):
+            numbers = self._postings[term]
+            encoded = encode_postings(numbers)
+            terms[term] = [len(blob), len(encoded), len(numbers)]
+            blob += encoded
+        header = json.dumps({'prompts': self.prompts, 'source': source, 'terms': terms},
+                            ensure_ascii=False).encode('utf-8')
+        temporary = output_path + ".part"
+        with open(temporary, 'wb') as f:
+            f.write(MAGIC)
+            f.write(HEADER_LENGTH.pack(len(header)))
+            f.write(header)
+            f.write(blob)
+        os.replace(temporary, output_path)
+
+
+def build_index(analyzer: PromptAnalyzer, results: Iterable, output_path: str,
+                source: Optional[str] = None) -> FeatureIndexBuilder:
+    """Index analysis results and save the index"""
+    builder = FeatureIndexBuilder(analyzer)
+    for result in results:
+        builder.add(result)
+    builder.save(output_path, source)
+    return builder
+
+
+def encode_postings(numbers: List[int]) -> bytes:
+    """Varint-encode the gaps between sorted, distinct positive numbers"""
+    encoded = bytearray()
+    previous = 0
+    for number in numbers:
+        gap = number - previous
+        previous = number
+        while gap >= 0x80:
+            encoded.append((gap & 0x7F) | 0x80)
+            gap >>= 7
+        encoded.append(gap)
+    return bytes(encoded)
+
+
+def decode_postings(data: bytes) -> List[int]:
+    """Inverse of encode_postings"""
+    numbers = []
+    number = gap = shift = 0
+    for byte in data:
+        gap |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            number += gap
+            numbers.append(number)
+            gap = shift = 0
+    return numbers
+
+
+class FeatureIndex:
+    """
+    A saved index, queried with boolean expressions of terms
+
+    Only the header is parsed on load; posting lists are decoded when
+    a query uses them.
+    """
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if not data.startswith(MAGIC):
+            raise ValueError(f"'{path}' is not a feature index")
+        start = len(MAGIC) + HEADER_LENGTH.size
+        (length,) = HEADER_LENGTH.unpack_from(data, len(MAGIC))
+        header = json.loads(data[start:start + length].decode('utf-8'))
+        self.prompts: int = header['prompts']
+        self.source: Optional[str] = header['source']
+        self._terms: Dict[str, List[int]] = header['terms']
+        self._blob = memoryview(data)[start + length:]
+
+    def terms(self, prefix: str = '') -> Dict[str, int]:
+        """Terms starting with ``prefix`` and their number of prompts"""
+        return {term: entry[2] for term, entry in self._terms.items() if term.startswith(prefix)}
+
+    def postings(self, term: str) -> List[int]:
+        """Sorted prompt numbers of a term"""
+        if term.split(':', 1)[0] not in TERM_PREFIXES or ':' not in term:
+            raise ValueError(f"Unknown term '{term}' (expected one of: "
+                             f"{', '.join(prefix + ':...' for prefix in TERM_PREFIXES)})")
+        entry = self._terms.get(term)
+        if entry is None:
+            return []
+        offset, length = entry[0], entry[1]
+        return decode_postings(self._blob[offset:offset + length])
+
+    def query(self, expression: str) -> List[int]:
+        """
+        Sorted prompt numbers matching a boolean expression
+
+        Raises:
+            ValueError: If the expression is malformed or names an unknown term
+        """
+        return sorted(_QueryParser(self, expression).parse())
+
+
+class _QueryParser:
+    """
+    Recursive-descent evaluator for query expressions
+
+        expression := conjunction (OR conjunction)*
+        conjunction := negation ([AND] negation)*
+        negation := NOT negation | '(' expression ')' | term
+    """
+
+    def __init__(self, index: FeatureIndex, expression: str):
+        self.index = index
+        self.tokens = TOKEN_PATTERN.findall(expression)
+        self.position = 0
+
+    def parse(self) -> Set[int]:
+        if not self.tokens:
+            raise ValueError("Empty query")
+        matches = self._expression()
+        if self.position < len(self.tokens):
+            raise ValueError(f"Unexpected '{self.tokens[self.position]}' in query")
+        return matches
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _keyword(self, keyword: str) -> bool:
+        token = self._peek()
+        if token is not None and token.upper() == keyword:
+            self.position += 1
+            return True
+        return False
+
+    def _expression(self) -> Set[int]:
+        matches = self._conjunction()
+        while self._keyword('OR'):
+            matches = matches | self._conjunction()
+        return matches
+
+    def _conjunction(self) -> Set[int]:
+        matches = self._negation()
+        while True:
+            token = self._peek()
+            if token is None or token == ')' or token.upper() == 'OR':
+                return matches
+            self._keyword('AND')
+            matches = matches & self._negation()
+
+    def _negation(self) -> Set[int]:
+        if self._keyword('NOT'):
+            return set(range(1, self.index.prompts + 1)) - self._negation()
+        token = self._peek()
+        if token is None:
+            raise ValueError("Query ends where a term was expected")
+        self.position += 1
+        if token == '(':
+            matches = self._expression()
+            if self._peek() != ')':
+                raise ValueError("Missing ')' in query")
+            self.position += 1
+            return matches
+        if token == ')' or token.upper() in ('AND', 'OR'):
+            raise ValueError(f"Unexpected '{token}' in query")
+        return set(self.index.postings(token.replace('"', '')))
+
+
+def main(argv: Optional[list] = None):
+    """Query a feature index from the command line"""
+    parser = argparse.ArgumentParser(
+        description="Query a feature index built with main.py --index",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python feature_index.py prompts.idx "weakness:pronouns"
+  python feature_index.py prompts.idx "indicator:json AND NOT list:role_keywords" --show
+  python feature_index.py prompts.idx "(strength:examples OR indicator:\\"for instance\\") AND weakness:too_long"
+  python feature_index.py prompts.idx --terms weakness:
+        """
+    )
+    parser.add_argument('index', help='Index file')
+    parser.add_argument('query', nargs='?', help='Boolean expression of terms')
+    parser.add_argument('--terms', nargs='?', const='', metavar='PREFIX',
+                        help='List the indexed terms (starting with PREFIX) and their prompt counts')
+    parser.add_argument('--show', action='store_true',
+                        help='Print the matching prompts from the indexed file')
+    parser.add_argument('--limit', type=int, default=20,
+                        help='Matches to print (default: 20)')
+    args = parser.parse_args(argv)
+    if args.query is None and args.terms is None:
+        parser.error("give a query or --terms")
+
+    index = FeatureIndex(args.index)
+    if args.terms is not None:
+        for term, count in sorted(index.terms(args.terms).items(), key=lambda item: -item[1]):
+            print(f"{count:>7}  {term}")
+        return
+
+    started = time.perf_counter()
+    try:
+        matches = index.query(args.query)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(2)
+    elapsed = time.perf_counter() - started
+    print(f"{len(matches)} of {index.prompts} prompts match ({elapsed * 1000:.2f} ms)")
+
+    shown = matches[:args.limit]
+    if args.show and index.source and shown:
+        wanted = set(shown)
+        with open(index.source, 'r', encoding='utf-8') as f:
+            for number, prompt in enumerate(iter_prompts(f), 1):
+                if number in wanted:
+                    print(f"{number:>7}  {truncate_text(' '.join(prompt.split()), 100)}")
+                if number >= shown[-1]:
+                    break
+    elif shown:
+        print(' '.join(str(number) for number in shown))
+    if len(matches) > len(shown):
+        print(f"... and {len(matches) - len(shown)} more")
+
+
+if __name__ == '__main__':
+    main()
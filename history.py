@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+History Module
+
+Local SQLite history of analyzed prompts. Results are queued by the
+analysis threads and written by a background thread in batched
+transactions under WAL mode, so recording adds almost nothing to the
+hot path and readers never block the writer. Trend queries aggregate
+inside SQLite.
+"""
+
+import argparse
+import hashlib
+import json
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from corpus_stats import FEEDBACK_FIELDS, SCORE_CATEGORIES
+from edit_script import encode_edits
+
+
+DEFAULT_HISTORY_PATH = "history.db"
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_FLUSH_INTERVAL = 1.0
+# Results queued before ``record`` waits for the writer
+QUEUE_SIZE = 1024
+# Longer prompts are stored with one edit replacing the whole prompt
+MAX_EDIT_SCRIPT_LENGTH = 4000
+
+BUCKET_FORMATS = {
+    'hour': '%Y-%m-%d %H:00',
+    'day': '%Y-%m-%d',
+    'week': '%Y-W%W',
+    'month': '%Y-%m'
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    prompt_hash TEXT NOT NULL,
+    prompt_length INTEGER NOT NULL,
+    overall REAL NOT NULL,
+    clarity REAL NOT NULL,
+    specificity REAL NOT NULL,
+    structure REAL NOT NULL,
+    context REAL NOT NULL,
+    creativity REAL NOT NULL,
+    optimized_edits TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_analyses_created_at ON analyses (created_at);
+CREATE INDEX IF NOT EXISTS idx_analyses_overall ON analyses (overall, created_at);
+CREATE INDEX IF NOT EXISTS idx_analyses_prompt_hash ON analyses (prompt_hash, created_at);
+
+CREATE TABLE IF NOT EXISTS feedback (
+    code INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    message TEXT NOT NULL,
+    UNIQUE (kind, message)
+);
+
+CREATE TABLE IF NOT EXISTS analysis_feedback (
+    analysis_id INTEGER NOT NULL REFERENCES analyses (id),
+    code INTEGER NOT NULL REFERENCES feedback (code),
+    PRIMARY KEY (analysis_id, code)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_analysis_feedback_code ON analysis_feedback (code);
+"""
+
+_STOP = object()
+_FLUSH = object()
+
+
+def prompt_hash(prompt: str) -> str:
+    """Return the hash used to identify a prompt in the history"""
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:32]
+
+
+class HistoryRow(NamedTuple):
+    """The values recorded for one result: its analyses row and (kind, message) feedback"""
+    values: Tuple
+    feedback: Tuple[Tuple[str, str], ...]
+
+
+def history_row(result, created_at: Optional[float] = None) -> HistoryRow:
+    """
+    Build the row recorded for a result
+
+    Worker processes send rows rather than whole results back to the
+    process that owns the store, which queues them with ``record_row``.
+    """
+    return HistoryRow(
+        (time.time() if created_at is None else created_at, prompt_hash(result.original_prompt),
+         len(result.original_prompt),
+         *(getattr(result, f'{category}_score') for category in SCORE_CATEGORIES),
+         json.dumps(_edits(result), ensure_ascii=False)),
+        tuple((kind, message) for kind in FEEDBACK_FIELDS for message in getattr(result, kind))
+    )
+
+
+class HistoryStore:
+    """
+    Records analysis results to SQLite on a background writer thread
+
+    ``record`` only enqueues; the writer drains up to ``batch_size``
+    results per transaction, or whatever has arrived after
+    ``flush_interval`` seconds. The queue is bounded, so a writer that
+    falls behind slows the analysis down instead of piling results up
+    in memory. Call ``close`` (or use the store as a context manager)
+    to flush the remaining results.
+    """
+
+    def __init__(self, path: str = DEFAULT_HISTORY_PATH, batch_size: int = DEFAULT_BATCH_SIZE,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue" = queue.Queue(maxsize=QUEUE_SIZE)
+        self._error: Optional[Exception] = None
+
+        # Create the schema up front so that readers can query immediately
+        with connect(path) as connection:
+            connection.executescript(SCHEMA)
+        connection.close()
+
+        self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._thread.start()
+
+    def record(self, result, created_at: Optional[float] = None):
+        """Queue an analysis result for writing"""
+        self._queue.put((time.time() if created_at is None else created_at, result))
+
+    def record_row(self, row: HistoryRow):
+        """Queue a row built with ``history_row`` for writing"""
+        self._queue.put(row)
+
+    def flush(self):
+        """Block until every queued result has been written"""
+        # The marker ends the batch being collected, so the writer does not wait it out
+        self._queue.put(_FLUSH)
+        self._queue.join()
+        if self._error:
+            raise self._error
+
+    def close(self):
+        """Write any queued results and stop the writer thread"""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        if self._error:
+            raise self._error
+
+    def __enter__(self) -> 'HistoryStore':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _run(self):
+        connection = connect(self.path)
+        feedback_codes: Dict[Tuple[str, str], int] = {}
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1] not in (_STOP, _FLUSH):
+                try:
+                    batch.append(self._queue.get(timeout=max(deadline - time.monotonic(), 0)))
+                except queue.Empty:
+                    break
+            stopping = batch[-1] is _STOP
+            entries = [item for item in batch if item not in (_STOP, _FLUSH)]
+            try:
+                if entries:
+                    with connection:
+                        self._write(connection, entries, feedback_codes)
+            except Exception as e:
+                # Keep draining so flush/close never hang; report on close
+                self._error = e
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        connection.close()
+
+    def _write(self, connection: sqlite3.Connection, entries: List[Any],
+               feedback_codes: Dict[Tuple[str, str], int]):
+        for entry in entries:
+            row = entry if isinstance(entry, HistoryRow) else history_row(entry[1], entry[0])
+            cursor = connection.execute(
+                "INSERT INTO analyses (created_at, prompt_hash, prompt_length, overall, clarity,"
+                " specificity, structure, context, creativity, optimized_edits)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                row.values
+            )
+            codes = {self._feedback_code(connection, feedback_codes, kind, message)
+                     for kind, message in row.feedback}
+            connection.executemany(
+                "INSERT INTO analysis_feedback (analysis_id, code) VALUES (?, ?)",
+                [(cursor.lastrowid, code) for code in codes]
+            )
+
+    @staticmethod
+    def _feedback_code(connection: sqlite3.Connection, feedback_codes: Dict[Tuple[str, str], int],
+                       kind: str, message: str) -> int:
+        key = (kind, message)
+        code = feedback_codes.get(key)
+        if code is None:
+            connection.execute("INSERT OR IGNORE INTO feedback (kind, message) VALUES (?, ?)", key)
+            code = connection.execute(
+                "SELECT code FROM feedback WHERE kind = ? AND message = ?", key
+            ).fetchone()[0]
+            feedback_codes[key] = code
+        return code
+
+
+def _edits(result) -> list:
+    """Return a result's optimized prompt as an edit script"""
+    edits = getattr(result, 'optimized_edits', None)
+    if edits is None:
+        original = result.original_prompt
+        optimized = result.optimized_prompt
+        if len(original) > MAX_EDIT_SCRIPT_LENGTH:
+            # Diffing costs more than the space it saves on long prompts
+            edits = [] if original == optimized else [[0, len(original), optimized]]
+        else:
+            edits = encode_edits(original, optimized)
+    return edits
+
+
+def connect(path: str = DEFAULT_HISTORY_PATH, read_only: bool = False) -> sqlite3.Connection:
+    """
+    Open a history database in WAL mode
+
+    A read-only connection never creates the file, so a wrong path
+    raises sqlite3.OperationalError instead of yielding an empty database.
+    """
+    if read_only:
+        return sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True)
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+def query_trend(connection: sqlite3.Connection, bucket: str = 'day', category: str = 'overall',
+                since: Optional[float] = None, until: Optional[float] = None) -> List[Tuple]:
+    """Return (bucket, count, mean, min, max) rows for a score category over time"""
+    if category not in SCORE_CATEGORIES:
+        raise ValueError(f"Unknown category '{category}'")
+    where, params = _time_filter(since, until)
+    return connection.execute(
+        f"SELECT strftime(?, created_at, 'unixepoch', 'localtime') AS bucket, COUNT(*),"
+        f" AVG({category}), MIN({category}), MAX({category})"
+        f" FROM analyses{where} GROUP BY bucket ORDER BY bucket",
+        (BUCKET_FORMATS[bucket], *params)
+    ).fetchall()
+
+
+def query_band(connection: sqlite3.Connection, low: float, high: float,
+               since: Optional[float] = None, until: Optional[float] = None,
+               limit: int = 20) -> Tuple[int, List[Tuple]]:
+    """Return the number of analyses with overall in [low, high) and the most recent ones"""
+    where, params = _time_filter(since, until, "overall >= ? AND overall < ?")
+    params = (low, high, *params)
+    count = connection.execute(f"SELECT COUNT(*) FROM analyses{where}", params).fetchone()[0]
+    rows = connection.execute(
+        f"SELECT created_at, prompt_hash, overall FROM analyses{where}"
+        f" ORDER BY created_at DESC LIMIT ?", (*params, limit)
+    ).fetchall()
+    return count, rows
+
+
+def query_prompt(connection: sqlite3.Connection, hash_prefix: str) -> List[Tuple]:
+    """Return (created_at, prompt_hash, overall) for every analysis of a prompt"""
+    # Hashes are lowercase hex, so every match sorts below prefix + 'g'
+    return connection.execute(
+        "SELECT created_at, prompt_hash, overall FROM analyses"
+        " WHERE prompt_hash >= ? AND prompt_hash < ? ORDER BY created_at",
+        (hash_prefix.lower(), hash_prefix.lower() + 'g')
+    ).fetchall()
+
+
+def query_feedback(connection: sqlite3.Connection, kind: str = 'weaknesses',
+                   since: Optional[float] = None, until: Optional[float] = None,
+                   limit: int = 10) -> List[Tuple[str, int]]:
+    """Return the most frequent feedback messages of one kind"""
+    where, params = _time_filter(since, until, "f.kind = ?")
+    return connection.execute(
+        f"SELECT f.message, COUNT(*) AS n FROM analysis_feedback af"
+        f" JOIN feedback f ON f.code = af.code JOIN analyses a ON a.id = af.analysis_id"
+        f"{where} GROUP BY f.code ORDER BY n DESC LIMIT ?",
+        (kind, *params, limit)
+    ).fetchall()
+
+
+def _time_filter(since: Optional[float], until: Optional[float],
+                 condition: Optional[str] = None) -> Tuple[str, Tuple]:
+    conditions = [condition] if condition else []
+    params = []
+    if since is not None:
+        conditions.append("created_at >= ?")
+        params.append(since)
+    if until is not None:
+        conditions.append("created_at < ?")
+        params.append(until)
+    return (" WHERE " + " AND ".join(conditions) if conditions else ""), tuple(params)
+
+
+def _parse_time(value: str) -> float:
+    return datetime.fromisoformat(value).timestamp()
+
+
+def _format_time(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def main():
+    """Query the analysis history from the command line"""
+    parser = argparse.ArgumentParser(
+        description="Query the AI Prompt Analyzer history",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python history.py trend --bucket week --category specificity
+  python history.py band 0 4 --since 2024-01-01
+  python history.py prompt 3fa2c1
+  python history.py feedback weaknesses --since 2024-01-01 --until 2024-02-01
+        """
+    )
+    parser.add_argument('--db', default=DEFAULT_HISTORY_PATH,
+                        help=f'History database (default: {DEFAULT_HISTORY_PATH})')
+    parser.add_argument('--since', type=_parse_time, help='Start time (ISO format, inclusive)')
+    parser.add_argument('--until', type=_parse_time, help='End time (ISO format, exclusive)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    trend = commands.add_parser('trend', help='Score statistics per time bucket')
+    trend.add_argument('--bucket', choices=BUCKET_FORMATS, default='day')
+    trend.add_argument('--category', choices=SCORE_CATEGORIES, default='overall')
+
+    band = commands.add_parser('band', help='Analyses with an overall score in [LOW, HIGH)')
+    band.add_argument('low', type=float)
+    band.add_argument('high', type=float)
+    band.add_argument('--limit', type=int, default=20)
+
+    prompt = commands.add_parser('prompt', help='History of one prompt by hash (prefix)')
+    prompt.add_argument('hash')
+
+    feedback = commands.add_parser('feedback', help='Most frequent feedback messages')
+    feedback.add_argument('kind', choices=FEEDBACK_FIELDS, nargs='?', default='weaknesses')
+    feedback.add_argument('--limit', type=int, default=10)
+
+    args = parser.parse_args()
+    try:
+        connection = connect(args.db, read_only=True)
+        connection.execute("SELECT 1 FROM analyses LIMIT 1")
+    except sqlite3.Error as e:
+        print(f"Error: Cannot read history database '{args.db}': {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.command == 'trend':
+        print(f"{'Bucket':<17} {'Count':>7} {'Mean':>6} {'Min':>5} {'Max':>5}")
+        print("-" * 44)
+        for bucket, count, mean, low, high in query_trend(connection, args.bucket, args.category,
+                                                           args.since, args.until):
+            print(f"{bucket:<17} {count:>7} {mean:6.2f} {low:5.1f} {high:5.1f}")
+    elif args.command == 'band':
+        count, rows = query_band(connection, args.low, args.high, args.since, args.until, args.limit)
+        print(f"{count} analyses with overall score in [{args.low}, {args.high})")
+        for created_at, hash_value, overall in rows:
+            print(f"{_format_time(created_at)}  {hash_value[:12]}  {overall:4.1f}/10")
+    elif args.command == 'prompt':
+        for created_at, hash_value, overall in query_prompt(connection, args.hash):
+            print(f"{_format_time(created_at)}  {hash_value[:12]}  {overall:4.1f}/10")
+    elif args.command == 'feedback':
+        for message, count in query_feedback(connection, args.kind, args.since, args.until,
+                                             args.limit):
+            print(f"{count:>7}  {message}")
+
+    connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Long Prompt Analysis Module
+
+This module analyzes prompts that are far beyond the interactive size
+limit (RAG contexts, large system prompts). The prompt is split into
+paragraph-aligned chunks, features are extracted from the chunks in
+parallel and then merged into a single whole-prompt score, while each
+chunk is also scored on its own to show where a long prompt is weak.
+"""
+
+import re
+from dataclasses import dataclass
+from functools import reduce
+from typing import Dict, List, Optional, Tuple
+from prompt_analyzer import (
+    AnalysisMetrics, PromptAnalyzer, PromptFeatures, SEGMENT_BOUNDARY_PATTERN
+)
+
+
+DEFAULT_CHUNK_SIZE = 8000
+
+# Segment boundaries that are also followed by a blank line
+PARAGRAPH_BOUNDARY_PATTERN = re.compile(r'[.!?]\n(?=[^\S\n]*\n)')
+
+_worker_analyzer: Optional[PromptAnalyzer] = None
+
+
+@dataclass
+class SectionScore:
+    """Scores for one chunk of a long prompt"""
+    start: int
+    end: int
+    start_line: int
+    overall_score: float
+    scores: Dict[str, float]
+
+
+@dataclass
+class LongPromptAnalysis:
+    """Whole-prompt metrics together with per-section scores"""
+    metrics: AnalysisMetrics
+    sections: List[SectionScore]
+
+    @property
+    def weakest_section(self) -> SectionScore:
+        return min(self.sections, key=lambda section: section.overall_score)
+
+
+def split_into_chunks(prompt: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[Tuple[int, int]]:
+    """
+    Split a prompt into chunks of roughly ``chunk_size`` characters
+
+    Chunks end at paragraph breaks where possible and otherwise at the
+    end of a line that closes a sentence. A chunk grows past
+    ``chunk_size`` only when no such boundary exists inside it.
+
+    Args:
+        prompt: The prompt text to split
+        chunk_size: Target chunk length in characters
+
+    Returns:
+        List of (start, end) character offsets covering the prompt
+    """
+    spans = []
+    start = 0
+    length = len(prompt)
+
+    while length - start > chunk_size:
+        limit = start + chunk_size
+        cut = (_last_boundary(PARAGRAPH_BOUNDARY_PATTERN, prompt, start, limit)
+               or _last_boundary(SEGMENT_BOUNDARY_PATTERN, prompt, start, limit))
+        if cut is None:
+            match = SEGMENT_BOUNDARY_PATTERN.search(prompt, limit)
+            if match is None:
+                break
+            cut = match.end()
+        spans.append((start, cut))
+        start = cut
+
+    if start < length or not spans:
+        spans.append((start, length))
+    return spans
+
+
+def analyze_long_prompt(prompt: str, analyzer: Optional[PromptAnalyzer] = None,
+                        chunk_size: int = DEFAULT_CHUNK_SIZE,
+                        max_workers: Optional[int] = None) -> LongPromptAnalysis:
+    """
+    Analyze a long prompt chunk by chunk
+
+    The whole-prompt metrics are identical to ``analyzer.analyze(prompt)``
+    because chunk features are merged at segment boundaries.
+
+    Args:
+        prompt: The prompt text to analyze
+        analyzer: Analyzer to use (a default one is created if omitted)
+        chunk_size: Target chunk length in characters
+        max_workers: Worker processes for feature extraction; chunks are
+            processed in this process when None or 1
+
+    Returns:
+        LongPromptAnalysis with whole-prompt metrics and section scores
+    """
+    analyzer = analyzer or PromptAnalyzer()
+    spans = split_into_chunks(prompt, chunk_size)
+    chunks = [prompt[start:end] for start, end in spans]
+
+    if max_workers and max_workers > 1 and len(chunks) > 1:
+        # Imported on demand; multiprocessing is slow to import
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(analyzer,)) as executor:
+            chunk_features = list(executor.map(_extract_chunk_features, chunks))
+    else:
+        chunk_features = [analyzer.extract_features(chunk) for chunk in chunks]
+
+    sections = []
+    line = 1
+    for (start, end), chunk, features in zip(spans, chunks, chunk_features):
+        scores = analyzer.score_features(features)
+        sections.append(SectionScore(
+            start=start,
+            end=end,
+            start_line=line,
+            overall_score=scores['overall'],
+            scores=scores
+        ))
+        line += chunk.count('\n')
+
+    features = reduce(PromptFeatures.merge, chunk_features)
+    return LongPromptAnalysis(metrics=analyzer.build_metrics(features), sections=sections)
+
+
+def _last_boundary(pattern, prompt: str, start: int, limit: int) -> Optional[int]:
+    """Return the last boundary offset in (start, limit], if any"""
+    cut = None
+    for match in pattern.finditer(prompt, start, limit):
+        cut = match.end()
+    return cut
+
+
+def _init_worker(analyzer: PromptAnalyzer):
+    """Install the analyzer used by worker processes"""
+    global _worker_analyzer
+    _worker_analyzer = analyzer
+
+
+def _extract_chunk_features(chunk: str) -> PromptFeatures:
+    """Extract features from one chunk inside a worker process"""
+    return _worker_analyzer.extract_features(chunk)
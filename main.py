@@ -6,20 +6,49 @@ A Python application that analyzes user-provided prompts for AI models
 and provides optimized versions with detailed feedback.
 """
 
+import os
 import re
+import sys
+import json
+import time
 import argparse
-from typing import Dict, List, Tuple
-from dataclasses import dataclass
-from prompt_analyzer import PromptAnalyzer
-from prompt_optimizer import PromptOptimizer
-from utils import load_config, save_analysis_report
+import threading
+from collections import deque
+from contextlib import nullcontext, redirect_stdout
+from itertools import islice
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from dataclasses import dataclass, field
+from functools import partial
+from prompt_analyzer import SCORE_CATEGORIES, LazyField, PromptAnalyzer
+from prompt_optimizer import OptimizationCandidate, PromptOptimizer
+from utils import (
+    DEFAULT_MAX_PROMPT_LENGTH, ReadabilityStats, iter_prompts, load_config, result_to_dict, save_analysis_reports, truncate_text
+)
+
+# Modules needed only by some modes (corpus statistics, long prompts,
+# deadlines, gating, process pools, the history database, edit scripts)
+# are imported where they are used, keeping startup fast for a single
+# --prompt
+if TYPE_CHECKING:
+    from corpus_stats import CorpusSummary, Leaderboard, SampleEstimator
+    from deadline import DeadlinePolicy
+    from engine import ConfigWatcher
+    from history import HistoryRow, HistoryStore
+    from long_prompt import SectionScore
+    from memory_profile import MemoryProfiler
+    from prefilter import PromptScreen, ScoreGate
+    from prefix_cache import PrefixCache
+    from rule_profile import RuleProfile
+    from shared_results import SharedScoreArray
+    from template_batch import TemplateBatch
 
 
 @dataclass
 class AnalysisResult:
     """Data structure to hold analysis results"""
     original_prompt: str
-    optimized_prompt: str
+    # Compact results pass a callable that expands optimized_edits on first access
+    optimized_prompt: str = LazyField()
     clarity_score: float
     specificity_score: float
     structure_score: float
@@ -29,18 +58,88 @@ class AnalysisResult:
     strengths: List[str]
     weaknesses: List[str]
     suggestions: List[str]
+    readability: Optional[ReadabilityStats] = None
+    variants: List[OptimizationCandidate] = field(default_factory=list)
+    sections: List['SectionScore'] = field(default_factory=list)
+    degraded: Optional[str] = None
+    optimized_edits: Optional[list] = None
+
+
+SUMMARY_BATCH_SIZE = 64
+RULE_REPORT_SIZE = 15
+ANALYSIS_BATCH_SIZE = 64
+
+_summary_worker: Optional[Tuple] = None
+_analysis_worker: Optional[Tuple] = None
+
+
+class LazyHistoryStore:
+    """
+    Stands in for a HistoryStore until the first result is recorded
+
+    Opening the store imports sqlite3 and creates the schema; a run that
+    records nothing never pays for it, and a single --prompt pays for it
+    only after its result is shown. Safe to share between threads.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._store: Optional['HistoryStore'] = None
+        self._lock = threading.Lock()
+
+    def record(self, result, created_at: Optional[float] = None):
+        self._open().record(result, created_at)
+
+    def record_row(self, row: 'HistoryRow'):
+        self._open().record_row(row)
+
+    def flush(self):
+        if self._store is not None:
+            self._store.flush()
+
+    def close(self):
+        if self._store is not None:
+            self._store.close()
+
+    def _open(self) -> 'HistoryStore':
+        with self._lock:
+            if self._store is None:
+                from history import DEFAULT_HISTORY_PATH, HistoryStore
+                self._store = HistoryStore(self.path or DEFAULT_HISTORY_PATH)
+            return self._store
 
 
 def main():
     """Main entry point for the application"""
+    from engine import ConfigWatcher, compile_engine
+    from long_prompt import DEFAULT_CHUNK_SIZE
+    from prefilter import PromptScreen
+    
     parser = argparse.ArgumentParser(
         description="AI Prompt Analyzer and Optimizer",
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Examples:
   python main.py --interactive
+  python main.py --interactive --watch-config
   python main.py --file prompts.txt
   python main.py --prompt "Write a story about a robot"
+  python main.py --prompt "Write a story about a robot" --search beam --variants 3
+  python main.py --file system_prompt.txt --chunked --workers 4
+  python main.py --file prompts.txt --threads 8
+  python main.py --file prompts.txt --workers 4 -o report.json
+  python main.py --file filled_templates.txt --templates
+  python main.py --file chat_log.txt --top 20 --prefix-cache
+  python main.py --file prompts.txt --top 100 --by specificity clarity
+  python main.py --file day1.txt --summary --workers 4 -o day1.summary.json
+  python main.py --merge-summaries day1.summary.json day2.summary.json -o month.summary.json
+  python main.py --file huge.txt --estimate --precision 0.05
+  python main.py --file prompts.txt --deadline-ms 50
+  python main.py --file prompts.txt --scores-only -o scores.csv
+  python main.py --file prompts.txt --compact -o report.json
+  python main.py --file prompts.txt --gate --threshold 6.0 --gate-category context
+  python main.py --file prompts.txt --index prompts.idx
+  tail -f incoming.txt | python main.py --stream --sink out/ --rotate-mb 16
         """
     )
     
@@ -64,8 +163,10 @@ Examples:
     
     parser.add_argument(
         '--output', '-o',
-        type=str,
-        help='Output file path for analysis report'
+        nargs='+',
+        metavar='PATH',
+        help='Output file path(s) for the analysis report; each extension '
+             '(.json, .csv, other: text) selects a format, all written in one pass'
     )
     
     parser.add_argument(
@@ -74,24 +175,427 @@ Examples:
         help='Enable verbose output'
     )
     
+    parser.add_argument(
+        '--search',
+        choices=['greedy', 'beam'],
+        default='greedy',
+        help='Optimization strategy search mode (default: greedy)'
+    )
+    
+    parser.add_argument(
+        '--variants',
+        type=int,
+        default=3,
+        help='Number of optimized variants to return in beam search mode'
+    )
+    
+    parser.add_argument(
+        '--chunked',
+        action='store_true',
+        help='Analyze long prompts in paragraph-aligned chunks and report per-section scores'
+    )
+    
+    parser.add_argument(
+        '--chunk-size',
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help=f'Target chunk size in characters for --chunked (default: {DEFAULT_CHUNK_SIZE})'
+    )
+    
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Number of worker processes (default: 1)'
+    )
+    
+    parser.add_argument(
+        '--threads',
+        type=int,
+        default=1,
+        help='Analyze file prompts on N threads sharing one analyzer (default: 1)'
+    )
+    
+    parser.add_argument(
+        '--templates',
+        action='store_true',
+        help='Scan text shared by the prompts of a file once (for prompts filled in from templates)'
+    )
+    
+    parser.add_argument(
+        '--prefix-cache',
+        action='store_true',
+        help='Cache features of shared leading paragraphs, such as a common system preamble'
+    )
+    
+    parser.add_argument(
+        '--profile-memory',
+        metavar='PATH',
+        help='Track memory per pipeline stage with tracemalloc (file mode) and save the profile as JSON'
+    )
+    
+    parser.add_argument(
+        '--profile-rules',
+        action='store_true',
+        help='Rank analyzer indicators, feature passes and optimizer strategies by cost '
+             'and matches over the file; --output saves the full profile as JSON'
+    )
+    
+    parser.add_argument(
+        '--index',
+        metavar='PATH',
+        help='Save an inverted index of indicator and feedback codes to prompt numbers '
+             '(file mode); query it with feature_index.py'
+    )
+    
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Analyze prompts from standard input as they arrive (separated by blank lines) '
+             'and write each result as a JSON line to standard output or --sink'
+    )
+    
+    parser.add_argument(
+        '--sink',
+        metavar='DIR',
+        help='Write --stream results to rotating compressed JSONL files in DIR'
+    )
+    
+    parser.add_argument(
+        '--sink-compression',
+        choices=['gzip', 'lzma'],
+        default='gzip',
+        help='Compression for --sink files (default: gzip)'
+    )
+    
+    parser.add_argument(
+        '--rotate-mb',
+        type=float,
+        default=64.0,
+        help='Start a new --sink file after this many megabytes of JSONL, before compression (default: 64)'
+    )
+    
+    parser.add_argument(
+        '--rotate-minutes',
+        type=float,
+        default=60.0,
+        help='Start a new --sink file after this many minutes (default: 60)'
+    )
+    
+    parser.add_argument(
+        '--max-length',
+        type=int,
+        default=DEFAULT_MAX_PROMPT_LENGTH,
+        help='Reject longer prompts before analysis; not applied with --chunked '
+             f'(default: {DEFAULT_MAX_PROMPT_LENGTH})'
+    )
+    
+    parser.add_argument(
+        '--rejects',
+        metavar='PATH',
+        help='Write prompts rejected by validation, with their reasons, as JSON lines to PATH'
+    )
+    
+    parser.add_argument(
+        '--no-validate',
+        action='store_true',
+        help='Analyze every prompt, including empty, test and oversized inputs'
+    )
+    
+    parser.add_argument(
+        '--config',
+        type=str,
+        default=os.environ.get('AI_PROMPT_CONFIG', 'config.json'),
+        help='Path to configuration file (default: $AI_PROMPT_CONFIG or config.json)'
+    )
+    
+    parser.add_argument(
+        '--watch-config',
+        action='store_true',
+        help='Reload the configuration when it changes (interactive mode)'
+    )
+    
+    parser.add_argument(
+        '--top',
+        type=int,
+        metavar='K',
+        help='Stream the file and report only the K worst and best prompts'
+    )
+    
+    parser.add_argument(
+        '--by',
+        nargs='+',
+        choices=SCORE_CATEGORIES,
+        default=['overall'],
+        help='Categories to rank by with --top (default: overall)'
+    )
+    
+    parser.add_argument(
+        '--end',
+        choices=['worst', 'best', 'both'],
+        default='both',
+        help='Which end of the distribution to show with --top (default: both)'
+    )
+    
+    parser.add_argument(
+        '--summary',
+        action='store_true',
+        help='Stream the file and report corpus statistics only; --output saves a mergeable summary'
+    )
+    
+    parser.add_argument(
+        '--merge-summaries',
+        nargs='+',
+        metavar='SUMMARY',
+        help='Merge saved summary files and report the combined statistics'
+    )
+    
+    parser.add_argument(
+        '--estimate',
+        action='store_true',
+        help='Estimate corpus scores from a random sample of the file'
+    )
+    
+    parser.add_argument(
+        '--precision',
+        type=float,
+        default=0.05,
+        help='Stop sampling once every mean is known to +/- this many points (default: 0.05)'
+    )
+    
+    parser.add_argument(
+        '--sample-size',
+        type=int,
+        default=10000,
+        help='Maximum number of prompts to sample with --estimate (default: 10000)'
+    )
+    
+    parser.add_argument(
+        '--confidence',
+        type=float,
+        default=0.95,
+        help='Confidence level for --estimate intervals (default: 0.95)'
+    )
+    
+    parser.add_argument(
+        '--deadline-ms',
+        type=float,
+        help='Per-prompt latency budget; degrade to cheaper results rather than run late'
+    )
+    
+    parser.add_argument(
+        '--scores-only',
+        action='store_true',
+        help='Report scores only, skipping feedback and optimization'
+    )
+    
+    parser.add_argument(
+        '--compact',
+        action='store_true',
+        help='Keep optimized prompts as edit scripts against the original in results and reports'
+    )
+    
+    parser.add_argument(
+        '--no-history',
+        action='store_true',
+        help='Do not record this run in the history database'
+    )
+    
+    parser.add_argument(
+        '--gate',
+        action='store_true',
+        help='Only report whether prompts reach a score threshold'
+    )
+    
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        help="Threshold for --gate (default: the configured 'good' threshold)"
+    )
+    
+    parser.add_argument(
+        '--gate-category',
+        choices=SCORE_CATEGORIES,
+        default='overall',
+        help='Score category to gate on with --gate (default: overall)'
+    )
+    
     args = parser.parse_args()
+    if args.output and len(args.output) > 1 and (args.summary or args.merge_summaries
+                                                 or args.profile_rules):
+        parser.error("--summary, --merge-summaries and --profile-rules save to a single --output path")
+    if args.index and (not args.file or args.gate or args.profile_rules or args.estimate
+                       or args.summary or args.top):
+        parser.error("--index requires --file without --gate, --profile-rules, --estimate, "
+                     "--summary or --top")
+    if args.sink and not args.stream:
+        parser.error("--sink requires --stream")
+    if args.rotate_mb <= 0 or args.rotate_minutes <= 0:
+        parser.error("--rotate-mb and --rotate-minutes must be positive")
+    if args.rejects and args.no_validate:
+        parser.error("--rejects requires validation (drop --no-validate)")
     
-    # Initialize analyzer and optimizer
-    analyzer = PromptAnalyzer()
-    optimizer = PromptOptimizer()
+    # Compile the analyzer and optimizer from the configuration
+    watcher = None
+    if args.watch_config:
+        watcher = ConfigWatcher(
+            args.config,
+            on_reload=lambda engine: print(f"\n[Configuration reloaded: {engine.config_hash}]")
+        )
+        watcher.start()
+        engine = watcher.engine
+    else:
+        engine = compile_engine(load_config(args.config))
+    config = engine.config
+    analyzer = engine.analyzer
+    optimizer = engine.optimizer
+    
+    search_options = None
+    if args.search == 'beam':
+        settings = config.get('optimization_settings', {})
+        search_options = {
+            'beam_width': settings.get('beam_width', 3),
+            'top_k': args.variants,
+            'time_budget': settings.get('search_time_budget', 1.0)
+        }
+    
+    long_options = None
+    if args.chunked:
+        long_options = {'chunk_size': args.chunk_size, 'max_workers': args.workers}
+    
+    deadline_options = None
+    if args.deadline_ms is not None:
+        from deadline import DeadlinePolicy
+        deadline_options = {'budget': args.deadline_ms / 1000, 'policy': DeadlinePolicy()}
+    
+    # Record every analyzed prompt when the configuration asks for it
+    history = None
+    if config.get('save_history') and not args.no_history:
+        history = LazyHistoryStore(config.get('history_path'))
     
+    feature_cache = None
+    if args.prefix_cache:
+        from prefix_cache import PrefixCache
+        feature_cache = PrefixCache(analyzer)
+    
+    memory_profile = None
+    if args.profile_memory:
+        from memory_profile import MemoryProfiler
+        memory_profile = MemoryProfiler()
+    
+    # Invalid inputs are rejected before they reach the analyzer
+    screen = None
+    if not args.no_validate:
+        screen = PromptScreen(None if args.chunked else args.max_length, args.rejects)
+    
+    try:
+        run_mode(args, analyzer, optimizer, watcher, search_options, long_options,
+                 deadline_options, history, feature_cache, memory_profile, screen)
+    finally:
+        if history:
+            history.close()
+        if screen:
+            screen.close()
+
+
+def run_mode(args: argparse.Namespace, analyzer: PromptAnalyzer, optimizer: PromptOptimizer,
+             watcher: Optional['ConfigWatcher'], search_options: Optional[Dict],
+             long_options: Optional[Dict], deadline_options: Optional[Dict],
+             history: Optional[LazyHistoryStore], feature_cache: Optional['PrefixCache'] = None,
+             memory_profile: Optional['MemoryProfiler'] = None,
+             screen: Optional['PromptScreen'] = None):
+    """Dispatch to the mode selected on the command line"""
+    summary_path = args.output[0] if args.output else None
     if args.interactive:
-        run_interactive_mode(analyzer, optimizer, args.verbose)
+        run_interactive_mode(analyzer, optimizer, args.verbose, search_options, watcher,
+                             deadline_options, history)
+    elif args.gate and (args.file or args.prompt):
+        from prefilter import ScoreGate
+        gate = ScoreGate(analyzer, args.threshold, args.gate_category)
+        gate_prompts(gate, file_path=args.file, prompt=args.prompt, verbose=args.verbose,
+                     screen=screen)
+    elif args.stream:
+        sink_options = None
+        if args.sink:
+            sink_options = {'directory': args.sink, 'compression': args.sink_compression,
+                            'max_bytes': int(args.rotate_mb * 1024 * 1024),
+                            'max_seconds': args.rotate_minutes * 60}
+        stream_prompts(analyzer, optimizer, lines=sys.stdin, sink_options=sink_options,
+                       search_options=search_options, long_options=long_options,
+                       deadline_options=deadline_options, scores_only=args.scores_only,
+                       compact=args.compact, history=history, threads=args.threads,
+                       screen=screen)
+    elif args.merge_summaries:
+        merge_summaries(args.merge_summaries, output_path=summary_path)
+    elif args.file and args.profile_rules:
+        profile_rules_from_file(analyzer, optimizer, file_path=args.file, output_path=summary_path,
+                                screen=screen)
+    elif args.file and args.estimate:
+        estimate_from_file(analyzer, optimizer, file_path=args.file,
+                           precision=args.precision, sample_size=args.sample_size,
+                           confidence=args.confidence, search_options=search_options,
+                           long_options=long_options, deadline_options=deadline_options,
+                           scores_only=args.scores_only, compact=args.compact,
+                           history=history, threads=args.threads, feature_cache=feature_cache,
+                           screen=screen)
+    elif args.file and args.summary:
+        summarize_file(analyzer, optimizer, file_path=args.file,
+                       output_path=summary_path, search_options=search_options,
+                       long_options=long_options, deadline_options=deadline_options,
+                       scores_only=args.scores_only, compact=args.compact,
+                       history=history, threads=args.threads, workers=args.workers,
+                       feature_cache=feature_cache, screen=screen)
+    elif args.file and args.top:
+        analyze_top_k_from_file(analyzer, optimizer, file_path=args.file,
+                                output_paths=args.output, k=args.top,
+                                categories=args.by, end=args.end,
+                                search_options=search_options, long_options=long_options,
+                                deadline_options=deadline_options,
+                                scores_only=args.scores_only, compact=args.compact,
+                                history=history, threads=args.threads,
+                                feature_cache=feature_cache, screen=screen)
     elif args.file:
-        analyze_from_file(analyzer, optimizer, args.file, args.output, args.verbose)
+        analyze_from_file(analyzer, optimizer, file_path=args.file,
+                          output_paths=args.output, verbose=args.verbose,
+                          search_options=search_options, long_options=long_options,
+                          deadline_options=deadline_options,
+                          scores_only=args.scores_only, compact=args.compact,
+                          history=history, threads=args.threads, workers=args.workers,
+                          templates=args.templates, feature_cache=feature_cache,
+                          memory_profile=memory_profile, index_path=args.index,
+                          screen=screen)
     elif args.prompt:
-        analyze_single_prompt(analyzer, optimizer, args.prompt, args.output, args.verbose)
+        analyze_single_prompt(analyzer, optimizer, prompt=args.prompt,
+                              output_paths=args.output, verbose=args.verbose,
+                              search_options=search_options, long_options=long_options,
+                              deadline_options=deadline_options,
+                              scores_only=args.scores_only, compact=args.compact,
+                              history=history, screen=screen)
     else:
         print("No input provided. Use --help for usage information.")
         print("Quick start: python main.py --interactive")
+        return
+    
+    # Standard output of a stream carries the results themselves
+    with redirect_stdout(sys.stderr) if args.stream else nullcontext():
+        if screen is not None and screen.rejected and screen.accepted + screen.rejected > 1:
+            display_rejections(screen)
+        if deadline_options:
+            display_degradation_counters(deadline_options['policy'])
+        if feature_cache is not None:
+            display_feature_reuse(feature_cache)
+    if memory_profile is not None:
+        memory_profile.stop()
+        memory_profile.save(args.profile_memory)
+        display_memory_profile(memory_profile)
+        print(f"Memory profile saved to: {args.profile_memory}")
 
 
-def run_interactive_mode(analyzer: PromptAnalyzer, optimizer: PromptOptimizer, verbose: bool = False):
+def run_interactive_mode(analyzer: PromptAnalyzer, optimizer: PromptOptimizer, verbose: bool = False,
+                         search_options: Optional[Dict] = None,
+                         watcher: Optional['ConfigWatcher'] = None,
+                         deadline_options: Optional[Dict] = None,
+                         history: Optional[LazyHistoryStore] = None):
     """Run the application in interactive mode"""
     print("=== AI Prompt Analyzer and Optimizer ===")
     print("Enter your prompt for analysis (press Enter twice to finish):")
@@ -118,7 +622,14 @@ def run_interactive_mode(analyzer: PromptAnalyzer, optimizer: PromptOptimizer, v
             continue
             
         prompt = "\n".join(lines)
-        result = analyze_and_optimize_prompt(analyzer, optimizer, prompt)
+        if watcher:
+            # Pick up the latest engine; the whole request uses this one
+            engine = watcher.engine
+            analyzer, optimizer = engine.analyzer, engine.optimizer
+        analyze = build_analyze(analyzer, optimizer, {'search_options': search_options,
+                                                      'deadline_options': deadline_options,
+                                                      'history': history})
+        result = analyze(prompt)
         display_analysis_result(result, verbose)
         print("\n" + "="*60 + "\n")
 
@@ -127,8 +638,16 @@ def analyze_from_file(analyzer: PromptAnalyzer, optimizer: PromptOptimizer,
                      **kwargs):
     """Analyze prompts from a file"""
     file_path = kwargs.get('file_path')
-    output_path = kwargs.get('output_path')
+    output_paths = kwargs.get('output_paths')
     verbose = kwargs.get('verbose', False)
+    scores_only = kwargs.get('scores_only', False)
+    threads = kwargs.get('threads', 1)
+    workers = kwargs.get('workers', 1)
+    history = kwargs.get('history')
+    feature_cache = kwargs.get('feature_cache')
+    memory_profile = kwargs.get('memory_profile')
+    index_path = kwargs.get('index_path')
+    template_batch = None
 
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
@@ -136,69 +655,627 @@ def analyze_from_file(analyzer: PromptAnalyzer, optimizer: PromptOptimizer,
         
         # Split by double newlines to handle multiple prompts
         prompts = [p.strip() for p in content.split('\n\n') if p.strip()]
+        prompts = list(screened(prompts, kwargs.get('screen')))
+        if memory_profile:
+            memory_profile.checkpoint('read')
+        
+        if kwargs.get('templates') and workers <= 1:
+            from template_batch import TemplateBatch
+            feature_cache = template_batch = TemplateBatch(analyzer, prompts)
+        analyze = build_analyze(analyzer, optimizer, dict(kwargs, feature_cache=feature_cache))
+        
+        # Every report format is fed in one pass as results arrive
+        reports = nullcontext()
+        if output_paths:
+            from report_writers import ReportFanout
+            reports = ReportFanout(output_paths, len(prompts))
         
-        results = []
-        for i, prompt in enumerate(prompts, 1):
-            print(f"Analyzing prompt {i}/{len(prompts)}...")
-            result = analyze_and_optimize_prompt(analyzer, optimizer, prompt)
-            results.append(result)
+        with reports:
+            if workers > 1:
+                print(f"Analyzing {len(prompts)} prompts on {workers} processes...")
+                results = analyze_in_processes(analyzer, optimizer, prompts, workers, kwargs)
+                if history:
+                    for result in results:
+                        history.record(result)
+            elif threads > 1:
+                from concurrent.futures import ThreadPoolExecutor
+                # Analyzer and optimizer are immutable, so the threads share them
+                print(f"Analyzing {len(prompts)} prompts on {threads} threads...")
+                with ThreadPoolExecutor(max_workers=threads) as executor:
+                    results = list(executor.map(analyze, prompts))
+            else:
+                results = []
+                for i, prompt in enumerate(prompts, 1):
+                    print(f"Analyzing prompt {i}/{len(prompts)}...")
+                    results.append(analyze(prompt))
+                    if output_paths:
+                        reports.write(results[-1])
+            if output_paths and (workers > 1 or threads > 1):
+                reports.write_all(results)
+            if memory_profile:
+                memory_profile.checkpoint('analyze')
             
             if len(prompts) == 1 or verbose:
-                display_analysis_result(result, verbose)
+                for result in results:
+                    display_analysis_result(result, verbose, scores_only)
+            
+            if template_batch:
+                display_feature_reuse(template_batch)
         
-        if output_path:
-            save_analysis_report(results, output_path)
-            print(f"Analysis report saved to: {output_path}")
+        if output_paths:
+            for output_path in output_paths:
+                print(f"Analysis report saved to: {output_path}")
+            if memory_profile:
+                memory_profile.checkpoint('report')
+        
+        if index_path:
+            from feature_index import build_index
+            build_index(analyzer, results, index_path, source=os.path.abspath(file_path))
+            print(f"Feature index saved to: {index_path}")
+        
+        if memory_profile:
+            memory_profile.measure_results(results)
             
-    except FileNotFoundError:
-        print(f"Error: File '{file_path}' not found.")
+    except FileNotFoundError as e:
+        # The prompt file or a report directory
+        print(f"Error: File '{e.filename or file_path}' not found.")
     except Exception as e:
         print(f"Error reading file: {e}")
 
 
+def stream_prompts(analyzer: PromptAnalyzer, optimizer: PromptOptimizer, **kwargs):
+    """Analyze prompts as they arrive and write each result as a JSON line"""
+    lines = kwargs.get('lines')
+    sink_options = kwargs.get('sink_options')
+    threads = kwargs.get('threads', 1)
+    analyze = build_analyze(analyzer, optimizer, kwargs)
+    prompts = screened(iter_prompts(lines), kwargs.get('screen'))
+
+    sink = None
+    if sink_options:
+        from stream_sink import RotatingJsonlSink
+        sink = RotatingJsonlSink(**sink_options)
+
+    # Standard output may be the stream itself, so progress goes to stderr
+    count = 0
+    try:
+        for result in iter_results(analyze, prompts, threads):
+            entry = result_to_dict(result)
+            if sink:
+                sink.write(entry)
+            else:
+                print(json.dumps(entry, ensure_ascii=False), flush=True)
+            count += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if sink:
+            sink.close()
+
+    print(f"Streamed {count} prompts", file=sys.stderr)
+    if sink:
+        print(f"Sink files finished in {sink.directory}: {len(sink.files)}", file=sys.stderr)
+
+
+def analyze_top_k_from_file(analyzer: PromptAnalyzer, optimizer: PromptOptimizer,
+                            **kwargs):
+    """Stream prompts from a file, keeping only the K worst/best per category"""
+    file_path = kwargs.get('file_path')
+    output_paths = kwargs.get('output_paths')
+    k = kwargs.get('k')
+    categories = kwargs.get('categories', ['overall'])
+    end = kwargs.get('end', 'both')
+    threads = kwargs.get('threads', 1)
+
+    from corpus_stats import Leaderboard
+    analyze = build_analyze(analyzer, optimizer, kwargs)
+
+    leaderboard = Leaderboard(k, categories)
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            prompts = screened(iter_prompts(f), kwargs.get('screen'))
+            for index, result in enumerate(iter_results(analyze, prompts, threads), 1):
+                leaderboard.add(index, result)
+                if index % 1000 == 0:
+                    print(f"Analyzed {index} prompts...")
+    except FileNotFoundError:
+        print(f"Error: File '{file_path}' not found.")
+        return
+
+    print(f"Analyzed {leaderboard.count} prompts.")
+    display_leaderboard(leaderboard, end)
+
+    if output_paths:
+        save_analysis_reports([result for _, result in leaderboard.selected_results()], output_paths)
+        for output_path in output_paths:
+            print(f"Analysis report saved to: {output_path}")
+
+
+def summarize_file(analyzer: PromptAnalyzer, optimizer: PromptOptimizer,
+                   **kwargs):
+    """Stream prompts from a file into a CorpusSummary without keeping results"""
+    file_path = kwargs.get('file_path')
+    output_path = kwargs.get('output_path')
+    search_options = kwargs.get('search_options')
+    long_options = kwargs.get('long_options')
+    scores_only = kwargs.get('scores_only', False)
+    threads = kwargs.get('threads', 1)
+    workers = kwargs.get('workers', 1)
+    history = kwargs.get('history')
+
+    from corpus_stats import CorpusSummary
+    analyze = build_analyze(analyzer, optimizer, kwargs)
+
+    summary = CorpusSummary()
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            prompts = screened(iter_prompts(f), kwargs.get('screen'))
+            if workers > 1:
+                # Each worker summarizes whole batches; only the summaries come back
+                from concurrent.futures import ProcessPoolExecutor
+                if long_options:
+                    long_options = dict(long_options, max_workers=1)
+                # History rows come back with each summary and are recorded here,
+                # so the parent's store stays the only writer of the database
+                def collect(future):
+                    part, rows = future.result()
+                    summary.merge(part)
+                    for row in rows:
+                        history.record_row(row)
+
+                with ProcessPoolExecutor(max_workers=workers, mp_context=_worker_context(),
+                                         initializer=_init_summary_worker,
+                                         initargs=(analyzer, optimizer, search_options,
+                                                   long_options, scores_only,
+                                                   history is not None)) as executor:
+                    pending = deque()
+                    for batch in iter(lambda: list(islice(prompts, SUMMARY_BATCH_SIZE)), []):
+                        pending.append(executor.submit(_summarize_batch, batch))
+                        if len(pending) >= workers * 2:
+                            collect(pending.popleft())
+                    while pending:
+                        collect(pending.popleft())
+            else:
+                for result in iter_results(analyze, prompts, threads):
+                    summary.add(result)
+                    if summary.count % 1000 == 0:
+                        print(f"Analyzed {summary.count} prompts...")
+    except FileNotFoundError:
+        print(f"Error: File '{file_path}' not found.")
+        return
+
+    display_summary(summary)
+
+    if output_path:
+        summary.save(output_path)
+        print(f"Summary saved to: {output_path}")
+
+
+def profile_rules_from_file(analyzer: PromptAnalyzer, optimizer: PromptOptimizer, **kwargs):
+    """Rank the analyzer's and optimizer's rules by cost over a file's prompts"""
+    from rule_profile import profile_rules
+    file_path = kwargs.get('file_path')
+    output_path = kwargs.get('output_path')
+
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            prompts = list(screened(iter_prompts(f), kwargs.get('screen')))
+    except FileNotFoundError:
+        print(f"Error: File '{file_path}' not found.")
+        return
+
+    print(f"Profiling rules over {len(prompts)} prompts...")
+    profile = profile_rules(analyzer, optimizer, prompts)
+    display_rule_profile(profile)
+
+    if output_path:
+        profile.save(output_path)
+        print(f"Rule profile saved to: {output_path}")
+
+
+def merge_summaries(summary_paths: List[str], output_path: Optional[str] = None):
+    """Roll saved summaries up into one and report it"""
+    from corpus_stats import CorpusSummary
+    summary = CorpusSummary()
+    try:
+        for path in summary_paths:
+            summary.merge(CorpusSummary.load(path))
+    except FileNotFoundError as e:
+        print(f"Error: File '{e.filename}' not found.")
+        return
+
+    display_summary(summary)
+
+    if output_path:
+        summary.save(output_path)
+        print(f"Summary saved to: {output_path}")
+
+
+def estimate_from_file(analyzer: PromptAnalyzer, optimizer: PromptOptimizer,
+                       **kwargs):
+    """Estimate corpus scores from a reservoir sample, stopping at a target precision"""
+    file_path = kwargs.get('file_path')
+    precision = kwargs.get('precision', 0.05)
+    sample_size = kwargs.get('sample_size', 10000)
+    confidence = kwargs.get('confidence', 0.95)
+    threads = kwargs.get('threads', 1)
+
+    from corpus_stats import ReservoirSampler, SampleEstimator
+    analyze = build_analyze(analyzer, optimizer, kwargs)
+
+    # Sampling only reads text, so the full pass is cheap next to analysis
+    sampler = ReservoirSampler(sample_size)
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for prompt in screened(iter_prompts(f), kwargs.get('screen')):
+                sampler.add(prompt)
+    except FileNotFoundError:
+        print(f"Error: File '{file_path}' not found.")
+        return
+
+    estimator = SampleEstimator(population=sampler.seen, confidence=confidence)
+    for result in iter_results(analyze, sampler.sample(), threads):
+        estimator.add(result)
+        if estimator.count % 10 == 0 and estimator.converged(precision):
+            break
+
+    if estimator.count == 0:
+        print("Error: No prompts analyzed.", file=sys.stderr)
+        sys.exit(1)
+
+    display_estimates(estimator, sampler.seen, precision)
+
+
+def _init_summary_worker(analyzer: PromptAnalyzer, optimizer: PromptOptimizer,
+                         search_options: Optional[Dict], long_options: Optional[Dict],
+                         scores_only: bool = False, record_history: bool = False):
+    """Install the engine used by summary worker processes"""
+    global _summary_worker
+    _summary_worker = (analyzer, optimizer, search_options, long_options, scores_only,
+                       record_history)
+
+
+def _summarize_batch(prompts: List[str]) -> Tuple['CorpusSummary', List['HistoryRow']]:
+    """Summarize one batch of prompts inside a worker process, with its history rows"""
+    from corpus_stats import CorpusSummary
+    analyzer, optimizer, search_options, long_options, scores_only, record_history = _summary_worker
+    if record_history:
+        from history import history_row
+    summary = CorpusSummary()
+    rows = []
+    for prompt in prompts:
+        result = analyze_and_optimize_prompt(analyzer, optimizer, prompt,
+                                             search_options, long_options,
+                                             scores_only=scores_only)
+        summary.add(result)
+        if record_history:
+            rows.append(history_row(result))
+    return summary, rows
+
+
+def _worker_context():
+    """
+    Start method for worker process pools
+
+    Pools are spawned, not forked: by the time they start, the history
+    writer and report writer threads may be running, and a fork can copy
+    a lock one of them holds into the child.
+    """
+    from multiprocessing import get_context
+    return get_context('spawn')
+
+
+def analyze_in_processes(analyzer: PromptAnalyzer, optimizer: PromptOptimizer,
+                         prompts: List[str], workers: int, options: Dict) -> List[AnalysisResult]:
+    """
+    Analyze prompts on worker processes, without pickling whole results back
+
+    Workers write scores, readability counts and feedback codes into a
+    SharedScoreArray indexed by prompt number; only the optimized text
+    (or its edit script) and a small residue come back over the pipe.
+    Latency budgets are not applied on worker processes.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from shared_results import SharedScoreArray
+
+    compact = options.get('compact', False)
+    long_options = options.get('long_options')
+    if long_options:
+        long_options = dict(long_options, max_workers=1)
+
+    scores_array = SharedScoreArray(len(prompts))
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_worker_context(),
+                                 initializer=_init_analysis_worker,
+                                 initargs=(analyzer, optimizer, options.get('search_options'),
+                                           long_options, options.get('scores_only', False),
+                                           compact, scores_array.name)) as executor:
+            batches = [executor.submit(_analyze_batch, start, prompts[start:start + ANALYSIS_BATCH_SIZE])
+                       for start in range(0, len(prompts), ANALYSIS_BATCH_SIZE)]
+            payloads = [payload for batch in batches for payload in batch.result()]
+        return [_result_from_worker(scores_array, index, prompt, payload, compact)
+                for index, (prompt, payload) in enumerate(zip(prompts, payloads))]
+    finally:
+        scores_array.close()
+        scores_array.unlink()
+
+
+def _init_analysis_worker(analyzer: PromptAnalyzer, optimizer: PromptOptimizer,
+                          search_options: Optional[Dict], long_options: Optional[Dict],
+                          scores_only: bool, compact: bool, array_name: str):
+    """Install the engine and shared score array used by analysis worker processes"""
+    global _analysis_worker
+    from shared_results import SharedScoreArray
+    _analysis_worker = (analyzer, optimizer, search_options, long_options, scores_only, compact,
+                        SharedScoreArray(name=array_name))
+
+
+def _analyze_batch(start: int, prompts: List[str]) -> List[Tuple]:
+    """Analyze one batch of prompts inside a worker process"""
+    from corpus_stats import FEEDBACK_FIELDS, result_score
+    analyzer, optimizer, search_options, long_options, scores_only, compact, scores_array = _analysis_worker
+    payloads = []
+    for index, prompt in enumerate(prompts, start):
+        result = analyze_and_optimize_prompt(analyzer, optimizer, prompt, search_options,
+                                             long_options, scores_only=scores_only, compact=compact)
+        residue = scores_array.write(
+            index,
+            {category: result_score(result, category) for category in SCORE_CATEGORIES},
+            {kind: getattr(result, kind) for kind in FEEDBACK_FIELDS},
+            result.readability
+        )
+        # The parent already has the prompt, so an unchanged one is not sent back
+        if compact:
+            optimized = result.optimized_edits
+        else:
+            optimized = None if result.optimized_prompt == prompt else result.optimized_prompt
+        extras = {name: getattr(result, name) for name in ('variants', 'sections', 'degraded')
+                  if getattr(result, name)}
+        payloads.append((residue, optimized, extras or None))
+    return payloads
+
+
+def _result_from_worker(scores_array: 'SharedScoreArray', index: int, prompt: str,
+                        payload: Tuple, compact: bool) -> AnalysisResult:
+    """Rebuild a worker's result from its shared record and pipe payload"""
+    residue, optimized, extras = payload
+    scores, feedback, readability = scores_array.read(index, residue)
+    optimized_edits = None
+    if compact:
+        from edit_script import apply_edits
+        optimized_edits = optimized
+        optimized = partial(apply_edits, prompt, optimized_edits)
+    elif optimized is None:
+        optimized = prompt
+    return AnalysisResult(
+        original_prompt=prompt,
+        optimized_prompt=optimized,
+        **{f'{category}_score': scores[category] for category in SCORE_CATEGORIES},
+        **feedback,
+        readability=readability,
+        optimized_edits=optimized_edits,
+        **(extras or {})
+    )
+
+
+def gate_prompts(gate: 'ScoreGate', **kwargs):
+    """Report which prompts reach the gate's threshold"""
+    file_path = kwargs.get('file_path')
+    prompt = kwargs.get('prompt')
+    verbose = kwargs.get('verbose', False)
+    screen = kwargs.get('screen')
+
+    passed = total = 0
+    try:
+        if file_path:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                for total, text in enumerate(screened(iter_prompts(f), screen), 1):
+                    ok = gate.passes(text)
+                    passed += ok
+                    if verbose:
+                        print(f"{'PASS' if ok else 'FAIL'}  #{total:<6} "
+                              f"{truncate_text(' '.join(text.split()), 60)}")
+        else:
+            reason = screen.check(prompt, 1) if screen else ''
+            if reason:
+                print(f"Error: {reason}")
+                return
+            total = 1
+            passed = int(gate.passes(prompt))
+            print("PASS" if passed else "FAIL")
+    except FileNotFoundError:
+        print(f"Error: File '{file_path}' not found.")
+        return
+
+    from prefilter import FULL_ANALYSIS, PREFILTER
+    counters = gate.counters()
+    print(f"\n{passed}/{total} prompts reach {gate.category} >= {gate.threshold}")
+    print(f"Decided by prefilter: {counters[PREFILTER]}, full analysis: {counters[FULL_ANALYSIS]}")
+
+
+def build_analyze(analyzer: PromptAnalyzer, optimizer: PromptOptimizer,
+                  options: Dict) -> Callable[[str], AnalysisResult]:
+    """Bind the engine and a handler's per-run options into one prompt -> result function"""
+    search_options = options.get('search_options')
+    long_options = options.get('long_options')
+    deadline_options = options.get('deadline_options')
+    scores_only = options.get('scores_only', False)
+    compact = options.get('compact', False)
+    history = options.get('history')
+    feature_cache = options.get('feature_cache')
+
+    def analyze(prompt: str) -> AnalysisResult:
+        result = analyze_and_optimize_prompt(analyzer, optimizer, prompt, search_options,
+                                             long_options, deadline_options,
+                                             scores_only=scores_only, compact=compact,
+                                             feature_cache=feature_cache)
+        if history:
+            history.record(result)
+        return result
+
+    return analyze
+
+
+def screened(prompts: Iterable[str], screen: Optional['PromptScreen']) -> Iterable[str]:
+    """The prompts a screen accepts, or all of them without one"""
+    return screen.filter(prompts) if screen else prompts
+
+
+def iter_results(analyze: Callable[[str], AnalysisResult], prompts: Iterable[str],
+                 threads: int = 1) -> Iterator[AnalysisResult]:
+    """Analyze a stream of prompts in order, with a bounded number in flight"""
+    if threads <= 1:
+        yield from map(analyze, prompts)
+        return
+
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        pending = deque()
+        for prompt in prompts:
+            pending.append(executor.submit(analyze, prompt))
+            if len(pending) >= threads * 4:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
 def analyze_single_prompt(analyzer: PromptAnalyzer, optimizer: PromptOptimizer,
                          **kwargs):
     """Analyze a single prompt provided via command line"""
     prompt = kwargs.get('prompt')
-    output_path = kwargs.get('output_path')
+    output_paths = kwargs.get('output_paths')
     verbose = kwargs.get('verbose', False)
+    scores_only = kwargs.get('scores_only', False)
+    screen = kwargs.get('screen')
 
-    result = analyze_and_optimize_prompt(analyzer, optimizer, prompt)
-    display_analysis_result(result, verbose)
+    reason = screen.check(prompt, 1) if screen else ''
+    if reason:
+        print(f"Error: {reason}")
+        return
+
+    history = kwargs.get('history')
+    result = build_analyze(analyzer, optimizer, dict(kwargs, history=None))(prompt)
+    display_analysis_result(result, verbose, scores_only)
+    # Recorded once shown, so opening the history database does not delay the result
+    if history:
+        history.record(result)
     
-    if output_path:
-        save_analysis_report([result], output_path)
-        print(f"Analysis report saved to: {output_path}")
+    if output_paths:
+        save_analysis_reports([result], output_paths)
+        for output_path in output_paths:
+            print(f"Analysis report saved to: {output_path}")
 
 
 def analyze_and_optimize_prompt(analyzer: PromptAnalyzer, optimizer: PromptOptimizer, 
-                               prompt: str) -> AnalysisResult:
-    """Analyze and optimize a prompt"""
-    # Analyze the prompt
-    analysis = analyzer.analyze(prompt)
+                               prompt: str, search_options: Optional[Dict] = None,
+                               long_options: Optional[Dict] = None,
+                               deadline_options: Optional[Dict] = None,
+                               scores_only: bool = False, compact: bool = False,
+                               feature_cache: Optional[Union['TemplateBatch', 'PrefixCache']] = None
+                               ) -> AnalysisResult:
+    """
+    Analyze and optimize a prompt
+    
+    ``scores_only`` skips the optimizer; ``compact`` keeps the optimized
+    prompt as an edit script that is expanded on first access.
+    ``feature_cache`` analyzes in place of the analyzer, reusing the
+    features of text shared between prompts.
+    """
+    from deadline import APPROXIMATE, FULL, MIN_APPROXIMATE_CHARS, NO_SEARCH, SCORES_ONLY
+    
+    # With a latency budget, each stage runs only if it is predicted to
+    # finish in time; otherwise the result is degraded one level further
+    policy = deadline = None
+    if deadline_options:
+        policy = deadline_options['policy']
+        deadline = policy.deadline_after(deadline_options['budget'])
+    level = FULL
+    
+    analyzed = prompt
+    if deadline and not policy.affords('analyze', len(prompt), deadline):
+        # Score only the prefix that fits in the budget
+        level = APPROXIMATE
+        analyzed = prompt[:max(policy.affordable_chars('analyze', deadline), MIN_APPROXIMATE_CHARS)]
+    
+    # Analyze the prompt, chunk by chunk when it is long
+    sections = []
+    started = time.monotonic()
+    if long_options and len(analyzed) > long_options['chunk_size']:
+        from long_prompt import analyze_long_prompt
+        long_analysis = analyze_long_prompt(analyzed, analyzer, **long_options)
+        analysis = long_analysis.metrics
+        sections = long_analysis.sections
+    else:
+        analysis = (analyzer if feature_cache is None else feature_cache).analyze(analyzed)
+    if policy:
+        policy.record('analyze', len(analyzed), time.monotonic() - started)
+    
+    if (level == FULL and deadline and not scores_only
+            and not policy.affords('optimize', len(prompt), deadline)):
+        level = SCORES_ONLY
     
     # Optimize the prompt
-    optimized = optimizer.optimize(prompt, analysis)
+    optimized_prompt = prompt
+    strengths, weaknesses, suggestions = [], [], []
+    if level == FULL and not scores_only:
+        started = time.monotonic()
+        optimized = optimizer.optimize(prompt, analysis)
+        if policy:
+            policy.record('optimize', len(prompt), time.monotonic() - started)
+        optimized_prompt = optimized.optimized_prompt
+        strengths = optimized.strengths
+        weaknesses = optimized.weaknesses
+        suggestions = optimized.suggestions
+    
+    # Beam search replaces the greedy candidate with the best variant found
+    variants = []
+    if search_options and level == FULL and not scores_only:
+        if deadline and not policy.affords('search', len(prompt), deadline):
+            level = NO_SEARCH
+        else:
+            if deadline:
+                search_options = dict(search_options, time_budget=min(
+                    search_options.get('time_budget', 1.0), policy.remaining(deadline)))
+            started = time.monotonic()
+            variants = optimizer.search(prompt, analyzer, **search_options)
+            if policy:
+                policy.record('search', len(prompt), time.monotonic() - started)
+            optimized_prompt = variants[0].optimized_prompt
+    
+    if policy:
+        policy.count(level)
+    
+    optimized_edits = None
+    if compact:
+        from edit_script import apply_edits, encode_edits
+        optimized_edits = encode_edits(prompt, optimized_prompt)
+        optimized_prompt = partial(apply_edits, prompt, optimized_edits)
     
     # Create result object
     result = AnalysisResult(
         original_prompt=prompt,
-        optimized_prompt=optimized.optimized_prompt,
+        optimized_prompt=optimized_prompt,
         clarity_score=analysis.clarity_score,
         specificity_score=analysis.specificity_score,
         structure_score=analysis.structure_score,
         context_score=analysis.context_score,
         creativity_score=analysis.creativity_score,
         overall_score=analysis.overall_score,
-        strengths=optimized.strengths,
-        weaknesses=optimized.weaknesses,
-        suggestions=optimized.suggestions
+        strengths=strengths,
+        weaknesses=weaknesses,
+        suggestions=suggestions,
+        readability=analysis.readability,
+        variants=variants,
+        sections=sections,
+        degraded=None if level == FULL else level,
+        optimized_edits=optimized_edits
     )
     
     return result
 
 
-def display_analysis_result(result: AnalysisResult, verbose: bool = False):
+def display_analysis_result(result: AnalysisResult, verbose: bool = False,
+                            scores_only: bool = False):
     """Display the analysis result in a formatted way"""
     print("="*60)
     print("PROMPT ANALYSIS RESULTS")
@@ -209,12 +1286,15 @@ def display_analysis_result(result: AnalysisResult, verbose: bool = False):
         print("-" * 20)
         print(f"{result.original_prompt}\n")
     
-    print(f"OPTIMIZED PROMPT:")
-    print("-" * 20)
-    print(f"{result.optimized_prompt}\n")
+    if not scores_only:
+        print(f"OPTIMIZED PROMPT:")
+        print("-" * 20)
+        print(f"{result.optimized_prompt}\n")
     
     print(f"ANALYSIS SCORES:")
     print("-" * 20)
+    if result.degraded:
+        print(f"(Degraded to '{result.degraded}' to meet the deadline)")
     print(f"Overall Score:     {result.overall_score:.1f}/10")
     print(f"Clarity:          {result.clarity_score:.1f}/10")
     print(f"Specificity:      {result.specificity_score:.1f}/10")
@@ -222,6 +1302,31 @@ def display_analysis_result(result: AnalysisResult, verbose: bool = False):
     print(f"Context:          {result.context_score:.1f}/10")
     print(f"Creativity:       {result.creativity_score:.1f}/10")
     
+    if verbose and result.readability:
+        print(f"\nREADABILITY:")
+        print("-" * 20)
+        print(f"Flesch Reading Ease: {result.readability.flesch_reading_ease:.1f}")
+        print(f"Flesch-Kincaid Grade: {result.readability.flesch_kincaid_grade:.1f}")
+        print(f"Words/Sentences:     {result.readability.word_count}/{result.readability.sentence_count}")
+    
+    if result.sections:
+        weakest = min(result.sections, key=lambda section: section.overall_score)
+        print(f"\nSECTION SCORES:")
+        print("-" * 20)
+        for section in result.sections:
+            marker = "  <- weakest" if section is weakest else ""
+            print(f"Line {section.start_line:>6}: {section.overall_score:.1f}/10{marker}")
+    
+    if len(result.variants) > 1:
+        print(f"\nALTERNATIVE VARIANTS:")
+        print("-" * 20)
+        for i, variant in enumerate(result.variants[1:], 2):
+            print(f"#{i} ({variant.overall_score:.1f}/10, {', '.join(variant.strategies)}):")
+            print(f"{variant.optimized_prompt}\n")
+    
+    if scores_only:
+        return
+    
     print(f"\nSTRENGTHS:")
     print("-" * 20)
     for strength in result.strengths:
@@ -238,5 +1343,125 @@ def display_analysis_result(result: AnalysisResult, verbose: bool = False):
         print(f"• {suggestion}")
 
 
+def display_leaderboard(leaderboard: 'Leaderboard', end: str = 'both'):
+    """Display the worst/best prompts for each ranked category"""
+    for category, selector in leaderboard.selectors.items():
+        ends = []
+        if end in ('worst', 'both'):
+            ends.append(("WORST", selector.worst()))
+        if end in ('best', 'both'):
+            ends.append(("BEST", selector.best()))
+        
+        for label, entries in ends:
+            print(f"\n{label} {len(entries)} BY {category.upper()}:")
+            print("-" * 20)
+            for rank, (index, score, result) in enumerate(entries, 1):
+                prompt = truncate_text(' '.join(result.original_prompt.split()), 70)
+                print(f"{rank:>3}. {score:4.1f}/10  #{index:<6} {prompt}")
+
+
+def display_summary(summary: 'CorpusSummary', top: int = 5):
+    """Display corpus statistics from a CorpusSummary"""
+    print("="*60)
+    print(f"CORPUS SUMMARY ({summary.count} prompts)")
+    print("="*60)
+    
+    print(f"\n{'Category':<12} {'Mean':>6} {'StdDev':>6} {'Min':>5} {'P10':>5} {'P50':>5} {'P90':>5} {'Max':>5}")
+    print("-" * 56)
+    for category in SCORE_CATEGORIES:
+        stats = summary.stats[category]
+        if not stats.count:
+            continue
+        quantiles = summary.quantiles(category, (0.1, 0.5, 0.9))
+        print(f"{category.capitalize():<12} {stats.mean:6.2f} {stats.stdev:6.2f} {stats.minimum:5.1f} "
+              f"{quantiles['p10']:5.1f} {quantiles['p50']:5.1f} {quantiles['p90']:5.1f} {stats.maximum:5.1f}")
+    
+    for field_name, counts in summary.feedback.items():
+        if not counts:
+            continue
+        print(f"\nMOST COMMON {field_name.upper()}:")
+        print("-" * 20)
+        for message, count in counts.most_common(top):
+            print(f"{count:>7}  {truncate_text(message, 65)}")
+
+
+def display_estimates(estimator: 'SampleEstimator', population: int, precision: float):
+    """Display sampled score estimates with confidence intervals"""
+    print("="*60)
+    print(f"ESTIMATED SCORES ({estimator.count} of {population} prompts sampled, "
+          f"{estimator.confidence:.0%} confidence)")
+    print("="*60)
+    
+    for category, estimate in estimator.estimates().items():
+        print(f"\n{category.capitalize()}: {estimate.mean:.2f} +/- {estimate.margin:.2f}")
+        for name, (value, low, high) in estimate.quantiles.items():
+            print(f"  {name.upper():>4}: {value:.1f}  [{low:.1f}, {high:.1f}]")
+    
+    if not estimator.converged(precision):
+        print(f"\nWarning: target precision +/-{precision} not reached; "
+              f"increase --sample-size for tighter intervals")
+
+
+def display_feature_reuse(feature_cache: Union['TemplateBatch', 'PrefixCache']):
+    """Display how much prompt text was covered by cached features"""
+    counters = feature_cache.counters()
+    total = counters['reused_chars'] + counters['scanned_chars']
+    if total:
+        print(f"\nCached features covered {counters['reused_chars'] / total:.0%} of the text; "
+              f"{counters['scanned_chars']} characters were scanned")
+
+
+def display_rule_profile(profile: 'RuleProfile', top: int = RULE_REPORT_SIZE):
+    """Display the most expensive rules and the rules that never matched"""
+    total = profile.total_seconds
+    print(f"\nMOST EXPENSIVE RULES ({profile.prompts} prompts, {total * 1000:.1f} ms in total):")
+    print("-" * 20)
+    print(f"{'Rule':<24} {'Kind':<10} {'ms':>9} {'Share':>7} {'Matches':>15}")
+    for rule in profile.ranked()[:top]:
+        share = rule.seconds / total if total else 0.0
+        print(f"{truncate_text(rule.rule, 24):<24} {rule.kind:<10} {rule.seconds * 1000:>9.2f} "
+              f"{share:>7.1%} {f'{rule.matches}/{rule.calls}':>15}")
+
+    dead = profile.dead()
+    print(f"\nRULES THAT NEVER MATCHED ({len(dead)}):")
+    print("-" * 20)
+    for rule in dead:
+        owners = f"  ({', '.join(rule.owners)})" if rule.owners else ""
+        print(f"{rule.rule!r:<24} {rule.kind}{owners}")
+
+
+def display_memory_profile(memory_profile: 'MemoryProfiler'):
+    """Display peak and retained memory per pipeline stage"""
+    profile = memory_profile.to_dict()
+    print(f"\nMEMORY PROFILE:")
+    print("-" * 20)
+    for stage in profile['stages']:
+        print(f"{stage['stage']:<12} peak {stage['peak_bytes'] / 1024:10.1f} KiB   "
+              f"retained {stage['retained_bytes'] / 1024:10.1f} KiB")
+    if 'bytes_per_prompt' in profile:
+        per_prompt = profile['bytes_per_prompt']
+        print(f"Per prompt: {per_prompt['results']:.0f} bytes in results, "
+              f"{per_prompt['peak']:.0f} bytes at peak")
+
+
+def display_rejections(screen: 'PromptScreen'):
+    """Display how many prompts validation rejected, by reason"""
+    total = screen.accepted + screen.rejected
+    print(f"\nREJECTED BEFORE ANALYSIS: {screen.rejected} of {total} prompts")
+    print("-" * 20)
+    for reason, count in sorted(screen.reasons().items(), key=lambda item: -item[1]):
+        print(f"{count:>7}  {reason}")
+    if screen.rejects_path:
+        print(f"Rejected prompts saved to: {screen.rejects_path}")
+
+
+def display_degradation_counters(policy: 'DeadlinePolicy'):
+    """Display how many prompts finished at each degradation level"""
+    print(f"\nDEADLINE DEGRADATIONS:")
+    print("-" * 20)
+    for level, count in policy.counters().items():
+        print(f"{level:<12} {count}")
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,169 @@
+"""
+Memory Profile Module
+
+Allocation tracking for batch runs with tracemalloc. A MemoryProfiler
+takes a snapshot at the end of each pipeline stage (reading the file,
+analyzing, writing the report) and records the stage's peak and
+retained bytes and its largest allocation sites. The results list is
+also measured object by object, grouped by type and by result field,
+so the profile shows what a prompt costs to keep. Profiles are saved as
+JSON for comparison between benchmark runs.
+"""
+
+import json
+import sys
+import tracemalloc
+from dataclasses import fields, is_dataclass
+from functools import partial
+from typing import Any, Dict, List, Optional, Sequence
+from corpus_stats import FEEDBACK_FIELDS
+
+
+DEFAULT_TOP_SITES = 5
+
+# Objects that hold no references worth following
+_LEAF_TYPES = (str, bytes, int, float, bool, type(None))
+
+
+class MemoryProfiler:
+    """
+    Per-stage allocation profile of one run
+
+    Tracing starts when the profiler is created and stops with ``stop``.
+    Each ``checkpoint`` closes a stage: its peak is the highest traced
+    memory above the start of the stage, and its retained bytes are what
+    is still allocated at the end of it. The profiler's own snapshots are
+    excluded from both.
+    """
+
+    def __init__(self, top_sites: int = DEFAULT_TOP_SITES):
+        self.top_sites = top_sites
+        self.stages: List[Dict[str, Any]] = []
+        self.prompts = 0
+        self.footprint: Optional[Dict[str, Dict]] = None
+        tracemalloc.start()
+        self._snapshot = self._take_snapshot()
+        self._baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    def checkpoint(self, stage: str):
+        """Close a pipeline stage and record its memory use"""
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = self._take_snapshot()
+        sites = [
+            {'site': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+             'bytes': stat.size_diff}
+            for stat in snapshot.compare_to(self._snapshot, 'lineno')[:self.top_sites]
+            if stat.size_diff > 0
+        ]
+        self.stages.append({
+            'stage': stage,
+            'peak_bytes': peak - self._baseline,
+            'retained_bytes': current - self._baseline,
+            'top_sites': sites
+        })
+        self._snapshot = snapshot
+        self._baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    def measure_results(self, results: Sequence[Any]):
+        """
+        Measure the objects reachable from a results list
+
+        Objects shared between results, such as feedback messages, are
+        counted once, under the first result and field that reach them.
+        """
+        self.prompts = len(results)
+        seen = set()
+        types: Dict[str, Dict[str, int]] = {}
+        by_field: Dict[str, int] = {}
+        for result in results:
+            by_field['result'] = by_field.get('result', 0) + _deep_size(result, seen, types, False)
+            for name, value in vars(result).items():
+                # LazyField values live under a leading underscore
+                field_name = name.lstrip('_')
+                group = 'feedback' if field_name in FEEDBACK_FIELDS else field_name
+                by_field[group] = by_field.get(group, 0) + _deep_size(value, seen, types)
+        self.footprint = {'types': types, 'fields': by_field}
+
+    def stop(self):
+        """Stop tracing; the recorded profile is kept"""
+        self._snapshot = None
+        tracemalloc.stop()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the profile as JSON-serializable data"""
+        # Stage figures are relative to the stage's start; the run's peak
+        # adds what earlier stages retained
+        peak = retained = 0
+        for stage in self.stages:
+            peak = max(peak, retained + stage['peak_bytes'])
+            retained += stage['retained_bytes']
+        profile = {
+            'prompts': self.prompts,
+            'peak_bytes': peak,
+            'retained_bytes': retained,
+            'stages': self.stages
+        }
+        if self.footprint is not None:
+            results_bytes = sum(self.footprint['fields'].values())
+            profile['results_bytes'] = results_bytes
+            profile['result_types'] = self.footprint['types']
+            profile['result_fields'] = self.footprint['fields']
+            if self.prompts:
+                profile['bytes_per_prompt'] = {
+                    'peak': peak / self.prompts,
+                    'retained': retained / self.prompts,
+                    'results': results_bytes / self.prompts
+                }
+        return profile
+
+    def save(self, output_path: str):
+        """Save the profile as JSON"""
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def _take_snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__),)
+        )
+
+
+def _deep_size(root: Any, seen: set, types: Dict[str, Dict[str, int]],
+               follow_fields: bool = True) -> int:
+    """
+    Size in bytes of the objects reachable from ``root`` not yet in ``seen``
+
+    Follows containers, dataclass fields and the arguments of partials
+    (compact results keep their optimized prompt as one). With
+    ``follow_fields`` off, a dataclass is counted with its attribute
+    dictionary but without the values in it.
+    """
+    total = 0
+    stack = [(root, follow_fields)]
+    while stack:
+        obj, follow = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size = sys.getsizeof(obj)
+        entry = types.setdefault(type(obj).__name__, {'count': 0, 'bytes': 0})
+        entry['count'] += 1
+        entry['bytes'] += size
+        total += size
+
+        if isinstance(obj, _LEAF_TYPES):
+            continue
+        if isinstance(obj, dict):
+            if follow:
+                stack.extend((item, True) for pair in obj.items() for item in pair)
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend((item, True) for item in obj)
+        elif isinstance(obj, partial):
+            stack.extend((item, True) for item in obj.args)
+        elif is_dataclass(obj):
+            if hasattr(obj, '__dict__'):
+                stack.append((vars(obj), follow))
+            elif follow:
+                stack.extend((getattr(obj, field.name), True) for field in fields(obj))
+    return total
@@ -0,0 +1,253 @@
+"""
+Prefilter Module
+
+Work that runs ahead of full analysis. A PromptScreen rejects empty,
+test or oversized inputs before the analyzer lowercases or scans them,
+and writes them with their reason to a separate rejects file. A
+ScoreGate decides pass/fail against a score threshold: a cheap first
+tier bounds the score without the readability pass, and the full
+analyzer runs only when those bounds straddle the threshold, so the
+decision is always identical to ``analyzer.analyze(prompt)``.
+"""
+
+import json
+import threading
+from collections import Counter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from prompt_analyzer import (BASE_SCORES, CATEGORIES, FEATURE_PROBES, READABILITY_PENALTIES,
+                             FeatureTerm, KeywordTerm, PromptAnalyzer)
+from utils import DEFAULT_MAX_PROMPT_LENGTH, validate_prompt
+
+
+PREFILTER = 'prefilter'
+FULL_ANALYSIS = 'full_analysis'
+
+# Bounds are summed in a different order than the exact score, so they
+# must clear the threshold by more than the rounding error
+BOUND_TOLERANCE = 1e-9
+
+# Evaluates one term on (prompt, lowercased prompt, keywords found so
+# far), adding any keywords it finds, and returns the score change
+Probe = Callable[[str, str, Set[str]], float]
+
+
+class PromptScreen:
+    """
+    Rejects invalid prompts before any analysis work
+
+    Every rejection is counted by reason and, with a rejects path,
+    written as one JSON line with the prompt's number, the reason and
+    the prompt itself. A screen can be shared by threads.
+    """
+
+    def __init__(self, max_length: Optional[int] = DEFAULT_MAX_PROMPT_LENGTH,
+                 rejects_path: Optional[str] = None):
+        """
+        Args:
+            max_length: Longest accepted prompt in characters (None for no limit)
+            rejects_path: JSONL file for rejected prompts
+        """
+        self.max_length = max_length
+        self.rejects_path = rejects_path
+        self.accepted = 0
+        self._reasons: Counter = Counter()
+        self._lock = threading.Lock()
+        self._rejects = open(rejects_path, 'w', encoding='utf-8') if rejects_path else None
+
+    def check(self, prompt: str, number: Optional[int] = None) -> str:
+        """
+        Screen one prompt
+
+        Args:
+            prompt: The prompt text
+            number: Position of the prompt in its input, for the rejects file
+
+        Returns:
+            The reason the prompt is rejected, or '' if it is accepted
+        """
+        valid, reason = validate_prompt(prompt, self.max_length)
+        with self._lock:
+            if valid:
+                self.accepted += 1
+                return ''
+            self._reasons[reason] += 1
+            if self._rejects:
+                self._rejects.write(json.dumps({'number': number, 'reason': reason,
+                                                'prompt': prompt}, ensure_ascii=False) + '\n')
+        return reason
+
+    def filter(self, prompts: Iterable[str]) -> Iterator[str]:
+        """Yield the accepted prompts of a stream, numbering inputs from 1"""
+        for number, prompt in enumerate(prompts, 1):
+            if not self.check(prompt, number):
+                yield prompt
+
+    @property
+    def rejected(self) -> int:
+        with self._lock:
+            return sum(self._reasons.values())
+
+    def reasons(self) -> Dict[str, int]:
+        """Return the number of rejections per reason"""
+        with self._lock:
+            return dict(self._reasons)
+
+    def close(self):
+        """Close the rejects file"""
+        if self._rejects:
+            self._rejects.close()
+            self._rejects = None
+
+
+class ScoreGate:
+    """
+    Decides whether prompts clear a score threshold, analyzing as little as possible
+
+    The first tier starts from score bounds that hold for every prompt
+    with the same word count, then probes one keyword list or marker
+    feature at a time, those that can move the gated score most first,
+    and stops as soon as the bounds clear the threshold either way. Only
+    prompts whose bounds still straddle it after every probe are scored
+    exactly, reusing the keywords the probes found.
+    """
+
+    def __init__(self, analyzer: PromptAnalyzer, threshold: Optional[float] = None,
+                 category: str = 'overall'):
+        if category != 'overall' and category not in CATEGORIES:
+            raise ValueError(f"Unknown category '{category}'")
+        self.analyzer = analyzer
+        self.threshold = analyzer.thresholds['good'] if threshold is None else threshold
+        self.category = category
+        # Bounds on the overall score rely on it being monotone in every
+        # category, which only holds for non-negative weights
+        self._bounded = category != 'overall' or all(
+            weight >= 0 for weight in analyzer.scoring_weights.values())
+        self._factors = self._category_factors()
+        terms = [term for table in (analyzer.keyword_terms, analyzer.feature_terms)
+                 for category_terms in table.values() for term in category_terms.values()
+                 if self._factors[term.category]]
+        self._keyword_terms = [term for term in terms if isinstance(term, KeywordTerm)]
+        # Base scores plus every term's full range, before readability
+        self._lower = dict(BASE_SCORES)
+        self._upper = dict(BASE_SCORES)
+        for term in terms:
+            low, high = term.bounds()
+            self._lower[term.category] += low
+            self._upper[term.category] += high
+        # Widest weighted range first
+        def reach(term) -> float:
+            low, high = term.bounds()
+            return self._factors[term.category] * (high - low)
+        terms.sort(key=reach, reverse=True)
+        self._probes: List[Tuple[str, float, float, float, Probe]] = [
+            (term.category, self._factors[term.category], *term.bounds(), _probe_for(term))
+            for term in terms]
+        self._counters = Counter({PREFILTER: 0, FULL_ANALYSIS: 0})
+        self._lock = threading.Lock()
+
+    def passes(self, prompt: str) -> bool:
+        """
+        Check whether a prompt's score reaches the threshold
+
+        Args:
+            prompt: The prompt text to check
+
+        Returns:
+            True if the score is at least the threshold
+        """
+        prompt_lower = prompt.lower()
+        matched: Set[str] = set()
+        if self._bounded:
+            decision = self._probe(prompt, prompt_lower, matched)
+            if decision is not None:
+                self._count(PREFILTER)
+                return decision
+        else:
+            for term in self._keyword_terms:
+                matched.update(keyword for keyword in term.keywords if keyword in prompt_lower)
+
+        self._count(FULL_ANALYSIS)
+        # The probes found every keyword the gated score depends on
+        features = self.analyzer.extract_features(prompt, matched=frozenset(matched))
+        scores = self.analyzer.score_features(features)
+        return scores[self.category] >= self.threshold
+
+    def counters(self) -> Dict[str, int]:
+        """Return how many decisions each tier made"""
+        with self._lock:
+            return dict(self._counters)
+
+    def _count(self, tier: str):
+        with self._lock:
+            self._counters[tier] += 1
+
+    def _probe(self, prompt: str, prompt_lower: str, matched: Set[str]) -> Optional[bool]:
+        """
+        Narrow the score bounds one term at a time
+
+        Adds the keywords found to ``matched``. Returns the decision once
+        the bounds clear the threshold, or None if every list was probed
+        and they still straddle it.
+        """
+        factors = self._factors
+        lower = dict(self._lower)
+        upper = dict(self._upper)
+        word_count = len(prompt.split())
+        for category, (penalty, min_words) in READABILITY_PENALTIES.items():
+            if word_count > min_words:
+                lower[category] -= penalty
+        low = sum(factors[category] * _clip(lower[category]) for category in CATEGORIES)
+        high = sum(factors[category] * _clip(upper[category]) for category in CATEGORIES)
+        passing = self.threshold + BOUND_TOLERANCE
+        failing = self.threshold - BOUND_TOLERANCE
+
+        for category, factor, term_low, term_high, probe in self._probes:
+            if low >= passing:
+                return True
+            if high < failing:
+                return False
+            change = probe(prompt, prompt_lower, matched)
+            # A term that is absent only ever moves one of the bounds
+            if change != term_low:
+                previous = lower[category]
+                lower[category] = previous + change - term_low
+                low += factor * (_clip(lower[category]) - _clip(previous))
+            if change != term_high:
+                previous = upper[category]
+                upper[category] = previous + change - term_high
+                high += factor * (_clip(upper[category]) - _clip(previous))
+
+        if low >= passing:
+            return True
+        if high < failing:
+            return False
+        return None
+
+    def _category_factors(self) -> Dict[str, float]:
+        """Return how much each category score counts towards the gated score"""
+        if self.category != 'overall':
+            return {category: float(category == self.category) for category in CATEGORIES}
+        weights = self.analyzer.scoring_weights
+        total_weight = sum(weights.values())
+        # Mirrors PromptAnalyzer._overall_score
+        if len(set(weights.values())) == 1 or total_weight <= 0:
+            return {category: 1 / len(CATEGORIES) for category in CATEGORIES}
+        return {category: weights[category] / total_weight for category in CATEGORIES}
+
+
+def _probe_for(term) -> Probe:
+    """Return a probe evaluating a KeywordTerm or FeatureTerm on its own"""
+    if isinstance(term, FeatureTerm):
+        read = FEATURE_PROBES[term.feature]
+        return lambda prompt, prompt_lower, matched: term.contribution(read(prompt))
+
+    def probe(prompt: str, prompt_lower: str, matched: Set[str]) -> float:
+        found = [keyword for keyword in term.keywords if keyword in prompt_lower]
+        matched.update(found)
+        return term.contribution(len(found))
+    return probe
+
+
+def _clip(score: float) -> float:
+    """Clip a score to the 0-10 range the analyzer reports"""
+    return 0.0 if score < 0.0 else 10.0 if score > 10.0 else score
@@ -0,0 +1,110 @@
+"""
+Prefix Cache Module
+
+Feature caching for prompts that start with the same long preamble
+(system prompts, role descriptions) followed by a short question. The
+features accumulated up to each segment boundary are cached, so only
+the part of a prompt after its longest cached prefix is scanned.
+
+Segment boundaries (see SEGMENT_BOUNDARY_PATTERN in prompt_analyzer)
+are line ends that close a sentence. Blank lines separate prompts in
+prompt files, so these are the paragraph breaks a prompt can contain.
+No indicator, number or sentence can span a segment boundary, so
+features merged across one are exactly those of the whole prompt.
+"""
+
+import itertools
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, Optional, Tuple
+from prompt_analyzer import AnalysisMetrics, PromptAnalyzer, PromptFeatures
+from template_batch import split_segments
+
+
+DEFAULT_PREFIX_CACHE_SIZE = 4096
+
+# Key of the empty prefix, which every prompt starts with
+ROOT = 0
+
+
+class PrefixCache:
+    """
+    LRU cache of the features of prompt prefixes
+
+    Entries form a trie flattened into one dictionary: a prefix is keyed
+    by the ID of the prefix one segment shorter and its last segment.
+    Dictionary lookups compare the paragraph text, so a hit is always an
+    exact match. Evicting a prefix leaves its extensions unreachable;
+    they are evicted in turn as they age.
+    """
+
+    def __init__(self, analyzer: PromptAnalyzer, max_entries: int = DEFAULT_PREFIX_CACHE_SIZE):
+        self.analyzer = analyzer
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[int, str], Tuple[int, PromptFeatures]]" = OrderedDict()
+        self._ids = itertools.count(ROOT + 1)
+        self._counters = Counter({'reused_chars': 0, 'scanned_chars': 0})
+        self._lock = threading.Lock()
+
+    def analyze(self, prompt: str) -> AnalysisMetrics:
+        """Analyze a prompt, same as ``analyzer.analyze(prompt)``"""
+        return self.analyzer.build_metrics(self.extract_features(prompt))
+
+    def extract_features(self, prompt: str) -> PromptFeatures:
+        """
+        Extract a prompt's features, scanning only past its longest cached prefix
+
+        Args:
+            prompt: The prompt text to scan
+
+        Returns:
+            PromptFeatures equal to ``analyzer.extract_features(prompt)``
+        """
+        pieces = split_segments(prompt)
+        parent = ROOT
+        features: Optional[PromptFeatures] = None
+        matched = 0
+
+        with self._lock:
+            for piece in pieces[:-1]:
+                entry = self._entries.get((parent, piece))
+                if entry is None:
+                    break
+                self._entries.move_to_end((parent, piece))
+                parent, features = entry
+                matched += 1
+
+        # Scan the rest piece by piece, caching each longer prefix
+        for index in range(matched, len(pieces)):
+            scanned = self.analyzer.extract_features(pieces[index])
+            features = scanned if features is None else features.merge(scanned)
+            if index < len(pieces) - 1:
+                parent = self._insert(parent, pieces[index], features)
+
+        reused = sum(len(piece) for piece in pieces[:matched])
+
+        with self._lock:
+            self._counters['reused_chars'] += reused
+            self._counters['scanned_chars'] += len(prompt) - reused
+        return features
+
+    def counters(self) -> Dict[str, int]:
+        """Return how many characters came from cached prefixes and were scanned"""
+        with self._lock:
+            return dict(self._counters)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _insert(self, parent: int, piece: str, features: PromptFeatures) -> int:
+        """Cache the prefix extending ``parent`` by ``piece``; return its ID"""
+        with self._lock:
+            entry = self._entries.get((parent, piece))
+            if entry is None:
+                # Another thread may have inserted it meanwhile; its ID is kept
+                entry = (next(self._ids), features)
+                self._entries[(parent, piece)] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return entry[0]
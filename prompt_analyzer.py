@@ -8,8 +8,124 @@ context, and creativity.
 
 import re
 import statistics
-from typing import Dict, List, Tuple
+from functools import partial
+from typing import Dict, FrozenSet, List, Optional, Tuple
 from dataclasses import dataclass
+from utils import Immutable, ReadabilityStats, compute_readability
+
+
+NUMBER_PATTERN = re.compile(r'\b\d+\b')
+# Leading whitespace stays on the marker's line: a bullet after blank
+# lines still starts a line of its own, and '\s*' spanning newlines made
+# every line start rescan the whitespace after it
+BULLET_PATTERN = re.compile(r'^[^\S\n]*[-*•]\s', re.MULTILINE)
+NUMBERED_PATTERN = re.compile(r'^[^\S\n]*\d+\.\s', re.MULTILINE)
+# A section header runs from a capitalized line start to a colon ending a
+# line, with no sentence terminator in between (see has_section_header)
+HEADER_PATTERN = re.compile(r'^[A-Z][^.!?]*:$', re.MULTILINE)
+HEADER_START_PATTERN = re.compile(r'^[A-Z]', re.MULTILINE)
+HEADER_END_PATTERN = re.compile(r':$', re.MULTILINE)
+TERMINATOR_PATTERN = re.compile(r'[.!?]')
+
+# A segment boundary sits right after a sentence terminator and a newline.
+# No indicator or regex feature can match across it, which is what makes
+# PromptFeatures.merge exact.
+SEGMENT_BOUNDARY_PATTERN = re.compile(r'[.!?]\n')
+
+CATEGORIES = ('clarity', 'specificity', 'structure', 'context', 'creativity')
+# Every score a result carries, in report order
+SCORE_CATEGORIES = ('overall',) + CATEGORIES
+DEFAULT_THRESHOLDS = {'excellent': 8.0, 'good': 6.0, 'needs_improvement': 4.0}
+
+# Readability only ever lowers a score: by at most this much, and only
+# when the prompt has more than this many words (see _analyze_clarity
+# and _analyze_structure)
+READABILITY_PENALTIES = {'clarity': (1.0, 25), 'structure': (1.5, 50)}
+
+# Every category score starts here before indicators move it
+BASE_SCORES = {'clarity': 5.0, 'specificity': 4.0, 'structure': 5.0, 'context': 4.0, 'creativity': 5.0}
+
+
+def count_questions(prompt: str) -> int:
+    """Return the number of question marks in a prompt"""
+    return prompt.count('?')
+
+
+def count_numbers(prompt: str) -> int:
+    """Return the number of whole numbers in a prompt"""
+    return len(NUMBER_PATTERN.findall(prompt))
+
+
+def has_bullet_list(prompt: str) -> bool:
+    """Return whether any line of a prompt starts with a bullet"""
+    return BULLET_PATTERN.search(prompt) is not None
+
+
+def has_numbered_list(prompt: str) -> bool:
+    """Return whether any line of a prompt starts with a list number"""
+    return NUMBERED_PATTERN.search(prompt) is not None
+
+
+def has_section_header(prompt: str) -> bool:
+    """
+    Return whether HEADER_PATTERN matches the prompt, in linear time
+
+    Searching HEADER_PATTERN directly rescans the text up to the next
+    sentence terminator from every capitalized line start, which is
+    quadratic in prompts made of many unpunctuated lines. Once a start
+    fails, every later start before the same terminator fails too, so
+    the search resumes after it.
+    """
+    position = 0
+    end = None
+    while True:
+        start = HEADER_START_PATTERN.search(prompt, position)
+        if start is None:
+            return False
+        if end is None or end.start() < start.end():
+            end = HEADER_END_PATTERN.search(prompt, start.end())
+            if end is None:
+                return False
+        terminator = TERMINATOR_PATTERN.search(prompt, start.end(), end.start())
+        if terminator is None:
+            return True
+        position = terminator.end()
+
+
+# How each count or marker field of PromptFeatures is read off a prompt
+FEATURE_PROBES = {
+    'question_count': count_questions,
+    'number_count': count_numbers,
+    'has_bullet_list': has_bullet_list,
+    'has_numbered_list': has_numbered_list,
+    'has_section_header': has_section_header
+}
+
+
+class LazyField:
+    """
+    Dataclass field descriptor that accepts a zero-argument callable
+    
+    The callable runs on first access and its result replaces it, so an
+    expensive value is only computed if somebody reads it. Computing it
+    must be idempotent, which makes concurrent first accesses harmless.
+    """
+    
+    def __set_name__(self, owner, name: str):
+        self._attribute = f'_{name}'
+    
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            # No default value for the dataclass field
+            raise AttributeError(self._attribute[1:])
+        value = instance.__dict__[self._attribute]
+        if callable(value):
+            value = value()
+            instance.__dict__[self._attribute] = value
+        return value
+    
+    def __set__(self, instance, value):
+        instance.__dict__[self._attribute] = value
 
 
 @dataclass
@@ -21,14 +137,126 @@ class AnalysisMetrics:
     context_score: float
     creativity_score: float
     overall_score: float
-    detailed_feedback: Dict[str, List[str]]
+    detailed_feedback: Dict[str, List[str]] = LazyField()
+    readability: Optional[ReadabilityStats] = None
+
+
+@dataclass(frozen=True)
+class PromptFeatures:
+    """Countable features of a prompt that all scores are computed from"""
+    matched: FrozenSet[str]
+    question_count: int
+    number_count: int
+    has_bullet_list: bool
+    has_numbered_list: bool
+    has_section_header: bool
+    readability: ReadabilityStats
+    
+    def merge(self, other: 'PromptFeatures') -> 'PromptFeatures':
+        """
+        Combine the features of two adjacent segments of a prompt
+        
+        The result equals the features of the concatenated text as long as
+        ``self`` ends on a segment boundary (see SEGMENT_BOUNDARY_PATTERN).
+        """
+        return PromptFeatures(
+            matched=self.matched | other.matched,
+            question_count=self.question_count + other.question_count,
+            number_count=self.number_count + other.number_count,
+            has_bullet_list=self.has_bullet_list or other.has_bullet_list,
+            has_numbered_list=self.has_numbered_list or other.has_numbered_list,
+            has_section_header=self.has_section_header or other.has_section_header,
+            readability=self.readability.merge(other.readability)
+        )
+
+
+@dataclass(frozen=True)
+class KeywordTerm:
+    """
+    One keyword list's contribution to a category score
+    
+    Each keyword found moves the score by ``weight``, up to ``cap`` in
+    either direction, once at least ``min_count`` of them are found.
+    """
+    category: str
+    keywords: Tuple[str, ...]
+    weight: float
+    cap: float
+    min_count: int = 1
+    
+    def contribution(self, count: int) -> float:
+        """Return the score change for a number of keywords found"""
+        if count < self.min_count:
+            return 0.0
+        if self.weight < 0:
+            return max(count * self.weight, -self.cap)
+        return min(count * self.weight, self.cap)
+    
+    def score(self, features: 'PromptFeatures') -> float:
+        """Return the score change for the keywords among a prompt's features"""
+        return self.contribution(sum(1 for keyword in self.keywords if keyword in features.matched))
+    
+    def bounds(self) -> Tuple[float, float]:
+        """Return the smallest and largest possible score change"""
+        extreme = self.contribution(len(self.keywords))
+        return min(extreme, 0.0), max(extreme, 0.0)
+
+
+@dataclass(frozen=True)
+class FeatureTerm:
+    """
+    One count or marker feature's contribution to a category score
+    
+    The feature's value (see FEATURE_PROBES) moves the score by
+    ``weight`` per count, or once for a marker, up to ``cap``.
+    """
+    category: str
+    feature: str
+    weight: float
+    cap: float
+    
+    def contribution(self, value: int) -> float:
+        """Return the score change for a feature value"""
+        return min(value * self.weight, self.cap)
+    
+    def score(self, features: 'PromptFeatures') -> float:
+        """Return the score change for a prompt's features"""
+        return self.contribution(getattr(features, self.feature))
+    
+    def bounds(self) -> Tuple[float, float]:
+        """Return the smallest and largest possible score change"""
+        return 0.0, self.cap
+
+
+# Incurs no readability penalty
+EMPTY_READABILITY = compute_readability('')
 
 
-class PromptAnalyzer:
-    """Analyzes prompts based on multiple criteria"""
+class PromptAnalyzer(Immutable):
+    """
+    Analyzes prompts based on multiple criteria
     
-    def __init__(self):
-        """Initialize the analyzer with predefined patterns and keywords"""
+    Thread safety: all indicator tables are frozen at the end of
+    ``__init__`` and analysis keeps its state in local variables, so a
+    single instance can be shared by any number of threads (including on
+    free-threaded CPython builds).
+    """
+    
+    def __init__(self, scoring_weights: Optional[Dict[str, float]] = None,
+                 thresholds: Optional[Dict[str, float]] = None):
+        """
+        Initialize the analyzer with predefined patterns and keywords
+        
+        Args:
+            scoring_weights: Per-category weights for the overall score
+                (``scoring_weights`` in config.json, all 1.0 by default)
+            thresholds: Score thresholds for feedback (``thresholds`` in
+                config.json)
+        """
+        weights = scoring_weights or {}
+        self.scoring_weights = {category: float(weights.get(category, 1.0)) for category in CATEGORIES}
+        self.thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+        
         self.clarity_indicators = {
             'positive': [
                 'clearly', 'specifically', 'exactly', 'precisely', 'detailed',
@@ -80,6 +308,85 @@ class PromptAnalyzer:
                 'common', 'ordinary', 'basic', 'simple'
             ]
         }
+        
+        self.ambiguous_pronouns = ['it', 'this', 'that', 'they', 'them']
+        self.format_keywords = ['json', 'csv', 'xml', 'markdown', 'html', 'list', 'table', 'paragraph']
+        self.example_keywords = ['example', 'for instance']
+        self.transition_words = ['however', 'therefore', 'furthermore', 'moreover', 'additionally', 'consequently']
+        self.role_keywords = ['you are', 'act as', 'pretend to be', 'imagine you are', 'role:', 'persona:']
+        self.domain_keywords = ['technical', 'medical', 'legal', 'financial', 'academic', 'creative', 'business']
+        self.constraint_keywords = ['must', 'should', 'cannot', 'avoid', 'include', 'exclude', 'limit', 'maximum', 'minimum']
+        self.open_question_keywords = ['what if', 'how might', 'what could', 'imagine', 'suppose']
+        self.perspective_keywords = ['different ways', 'various approaches', 'multiple solutions', 'alternatives']
+        self.restrictive_keywords = ['only', 'exactly', 'precisely', 'must be', 'required']
+        
+        # Every substring looked up by the scoring methods, scanned once per prompt
+        self.patterns = tuple(dict.fromkeys(
+            self.clarity_indicators['positive'] + self.clarity_indicators['negative'] +
+            [f' {pronoun} ' for pronoun in self.ambiguous_pronouns] +
+            self.specificity_indicators['positive'] + self.specificity_indicators['negative'] +
+            self.format_keywords + self.example_keywords +
+            self.structure_indicators['positive'] + self.transition_words +
+            self.context_indicators['positive'] + self.role_keywords +
+            self.domain_keywords + self.constraint_keywords +
+            self.creativity_indicators['positive'] + self.creativity_indicators['negative'] +
+            self.open_question_keywords + self.perspective_keywords +
+            self.restrictive_keywords
+        ))
+        self.pronoun_patterns = [f' {pronoun} ' for pronoun in self.ambiguous_pronouns]
+        
+        # How each keyword list moves its category's score, by category
+        # and name, in the order the scoring methods apply them
+        def term(category, keywords, weight, cap, min_count=1):
+            return KeywordTerm(category, tuple(keywords), weight, cap, min_count)
+        
+        self.keyword_terms = {
+            'clarity': {
+                'positive': term('clarity', self.clarity_indicators['positive'], 0.5, 3.0),
+                'negative': term('clarity', self.clarity_indicators['negative'], -0.8, 3.0),
+                'pronouns': term('clarity', self.pronoun_patterns, -0.2, 1.5)
+            },
+            'specificity': {
+                'positive': term('specificity', self.specificity_indicators['positive'], 0.8, 4.0),
+                'negative': term('specificity', self.specificity_indicators['negative'], -0.6, 2.0),
+                'format': term('specificity', self.format_keywords, 0.5, 1.5),
+                'example': term('specificity', self.example_keywords, 1.0, 1.0)
+            },
+            'structure': {
+                'positive': term('structure', self.structure_indicators['positive'], 0.6, 3.0),
+                'transition': term('structure', self.transition_words, 0.3, 1.0)
+            },
+            'context': {
+                'positive': term('context', self.context_indicators['positive'], 1.0, 4.0),
+                'role': term('context', self.role_keywords, 1.5, 1.5),
+                'domain': term('context', self.domain_keywords, 0.4, 1.0),
+                'constraint': term('context', self.constraint_keywords, 0.2, 1.5)
+            },
+            'creativity': {
+                'positive': term('creativity', self.creativity_indicators['positive'], 0.8, 3.0),
+                'negative': term('creativity', self.creativity_indicators['negative'], -0.5, 2.0),
+                'open_question': term('creativity', self.open_question_keywords, 0.6, 2.0),
+                'perspective': term('creativity', self.perspective_keywords, 1.0, 1.0),
+                # Only overly restrictive prompts lose a point
+                'restrictive': term('creativity', self.restrictive_keywords, -1.0, 1.0, min_count=4)
+            }
+        }
+        # How count and marker features move their category's score
+        self.feature_terms = {
+            'clarity': {
+                'questions': FeatureTerm('clarity', 'question_count', 0.3, 1.0)
+            },
+            'specificity': {
+                'numbers': FeatureTerm('specificity', 'number_count', 0.3, 2.0)
+            },
+            'structure': {
+                'bullet_list': FeatureTerm('structure', 'has_bullet_list', 1.0, 1.0),
+                'numbered_list': FeatureTerm('structure', 'has_numbered_list', 1.0, 1.0),
+                'section_header': FeatureTerm('structure', 'has_section_header', 0.5, 0.5)
+            }
+        }
+        
+        self._freeze(scoring_weights, thresholds)
     
     def analyze(self, prompt: str) -> AnalysisMetrics:
         """
@@ -91,68 +398,149 @@ class PromptAnalyzer:
         Returns:
             AnalysisMetrics object containing scores and feedback
         """
-        prompt_lower = prompt.lower()
-        
-        # Calculate individual scores
-        clarity_score = self._analyze_clarity(prompt, prompt_lower)
-        specificity_score = self._analyze_specificity(prompt, prompt_lower)
-        structure_score = self._analyze_structure(prompt, prompt_lower)
-        context_score = self._analyze_context(prompt, prompt_lower)
-        creativity_score = self._analyze_creativity(prompt, prompt_lower)
-        
-        # Calculate overall score
-        scores = [clarity_score, specificity_score, structure_score, context_score, creativity_score]
-        overall_score = statistics.mean(scores)
-        
-        # Generate detailed feedback
-        detailed_feedback = self._generate_detailed_feedback(
-            prompt, prompt_lower, {
-                'clarity': clarity_score,
-                'specificity': specificity_score,
-                'structure': structure_score,
-                'context': context_score,
-                'creativity': creativity_score
-            }
+        return self.build_metrics(self.extract_features(prompt))
+    
+    def score(self, prompt: str) -> Dict[str, float]:
+        """
+        Score a prompt without building metrics or feedback
+        
+        Args:
+            prompt: The prompt text to score
+            
+        Returns:
+            Dictionary of category scores plus 'overall'
+        """
+        return self.score_features(self.extract_features(prompt))
+    
+    def extract_features(self, prompt: str, readability: bool = True,
+                         matched: Optional[FrozenSet[str]] = None) -> PromptFeatures:
+        """
+        Scan a prompt once and collect the features used for scoring
+        
+        Args:
+            prompt: The prompt text (or a segment of it) to scan
+            readability: Whether to run the readability pass; without it
+                the features carry EMPTY_READABILITY
+            matched: The patterns the prompt contains, if already scanned
+            
+        Returns:
+            PromptFeatures for the text
+        """
+        if matched is None:
+            prompt_lower = prompt.lower()
+            matched = frozenset(pattern for pattern in self.patterns if pattern in prompt_lower)
+        
+        return PromptFeatures(
+            matched=matched,
+            question_count=count_questions(prompt),
+            number_count=count_numbers(prompt),
+            has_bullet_list=has_bullet_list(prompt),
+            has_numbered_list=has_numbered_list(prompt),
+            has_section_header=has_section_header(prompt),
+            # Tokenize once; sentence, word and paragraph counts are shared
+            readability=compute_readability(prompt) if readability else EMPTY_READABILITY
         )
+    
+    def score_bounds(self, prompt: str, features: Optional[PromptFeatures] = None
+                     ) -> Tuple[Dict[str, float], Dict[str, float]]:
+        """
+        Bound a prompt's scores without the readability pass
+        
+        Indicators, counts and list markers are exact; the readability
+        penalties are bounded using the word count alone. The bounds
+        coincide with the exact scores whenever no penalty can apply.
+        
+        Args:
+            prompt: The prompt text to bound
+            features: The prompt's features without readability, if
+                already extracted
+            
+        Returns:
+            (lower, upper) dictionaries of category scores plus 'overall'
+        """
+        if features is None:
+            features = self.extract_features(prompt, readability=False)
+        upper = self.score_features(features)
+        
+        word_count = len(prompt.split())
+        lower = dict(upper)
+        for category, (penalty, min_words) in READABILITY_PENALTIES.items():
+            if word_count > min_words:
+                lower[category] = max(0.0, upper[category] - penalty)
+        if lower != upper:
+            lower['overall'] = self._overall_score(lower)
+        return lower, upper
+    
+    def score_features(self, features: PromptFeatures) -> Dict[str, float]:
+        """
+        Compute category scores and the overall score from features
+        
+        Args:
+            features: Features extracted from a prompt
+            
+        Returns:
+            Dictionary of category scores plus 'overall'
+        """
+        scores = {
+            'clarity': self._analyze_clarity(features),
+            'specificity': self._analyze_specificity(features),
+            'structure': self._analyze_structure(features),
+            'context': self._analyze_context(features),
+            'creativity': self._analyze_creativity(features)
+        }
+        scores['overall'] = self._overall_score(scores)
+        return scores
+    
+    def build_metrics(self, features: PromptFeatures) -> AnalysisMetrics:
+        """
+        Score features and attach detailed feedback
+        
+        Feedback is generated on first access to ``detailed_feedback``.
+        
+        Args:
+            features: Features extracted from a prompt
+            
+        Returns:
+            AnalysisMetrics object containing scores and feedback
+        """
+        scores = self.score_features(features)
         
         return AnalysisMetrics(
-            clarity_score=clarity_score,
-            specificity_score=specificity_score,
-            structure_score=structure_score,
-            context_score=context_score,
-            creativity_score=creativity_score,
-            overall_score=overall_score,
-            detailed_feedback=detailed_feedback
+            clarity_score=scores['clarity'],
+            specificity_score=scores['specificity'],
+            structure_score=scores['structure'],
+            context_score=scores['context'],
+            creativity_score=scores['creativity'],
+            overall_score=scores['overall'],
+            detailed_feedback=partial(self._generate_detailed_feedback, scores),
+            readability=features.readability
         )
     
-    def _analyze_clarity(self, prompt: str, prompt_lower: str) -> float:
+    def _overall_score(self, scores: Dict[str, float]) -> float:
+        """Combine category scores using the configured weights"""
+        weights = self.scoring_weights
+        total_weight = sum(weights.values())
+        if len(set(weights.values())) == 1 or total_weight <= 0:
+            return statistics.mean(scores[category] for category in CATEGORIES)
+        return sum(scores[category] * weights[category] for category in CATEGORIES) / total_weight
+    
+    def _analyze_clarity(self, features: PromptFeatures) -> float:
         """Analyze prompt clarity"""
-        score = 5.0  # Base score
-        
-        # Check for clarity indicators
-        positive_count = sum(1 for indicator in self.clarity_indicators['positive'] 
-                           if indicator in prompt_lower)
-        negative_count = sum(1 for indicator in self.clarity_indicators['negative'] 
-                           if indicator in prompt_lower)
+        terms = self.keyword_terms['clarity']
+        score = BASE_SCORES['clarity']
         
-        # Adjust score based on indicators
-        score += min(positive_count * 0.5, 3.0)
-        score -= min(negative_count * 0.8, 3.0)
+        # Adjust score based on clarity indicators
+        score += terms['positive'].score(features)
+        score += terms['negative'].score(features)
         
         # Check for question marks (good for clarity)
-        question_count = prompt.count('?')
-        if question_count > 0:
-            score += min(question_count * 0.3, 1.0)
+        score += self.feature_terms['clarity']['questions'].score(features)
         
         # Check for ambiguous pronouns
-        ambiguous_pronouns = ['it', 'this', 'that', 'they', 'them']
-        ambiguous_count = sum(1 for pronoun in ambiguous_pronouns 
-                            if f' {pronoun} ' in prompt_lower)
-        score -= min(ambiguous_count * 0.2, 1.5)
+        score += terms['pronouns'].score(features)
         
         # Check sentence length (very long sentences reduce clarity)
-        sentences = re.split(r'[.!?]+', prompt)
-        avg_sentence_length = sum(len(s.split()) for s in sentences if s.strip()) / max(len([s for s in sentences if s.strip()]), 1)
+        avg_sentence_length = features.readability.avg_words_per_sentence
         if avg_sentence_length > 25:
             score -= 1.0
         elif avg_sentence_length > 35:
@@ -160,124 +548,95 @@ class PromptAnalyzer:
         
         return max(0.0, min(10.0, score))
     
-    def _analyze_specificity(self, prompt: str, prompt_lower: str) -> float:
+    def _analyze_specificity(self, features: PromptFeatures) -> float:
         """Analyze prompt specificity"""
-        score = 4.0  # Base score
+        terms = self.keyword_terms['specificity']
+        score = BASE_SCORES['specificity']
         
         # Check for specificity indicators
-        positive_count = sum(1 for indicator in self.specificity_indicators['positive'] 
-                           if indicator in prompt_lower)
-        negative_count = sum(1 for indicator in self.specificity_indicators['negative'] 
-                           if indicator in prompt_lower)
-        
-        score += min(positive_count * 0.8, 4.0)
-        score -= min(negative_count * 0.6, 2.0)
+        score += terms['positive'].score(features)
+        score += terms['negative'].score(features)
         
         # Check for numbers and specific quantities
-        number_count = len(re.findall(r'\b\d+\b', prompt))
-        score += min(number_count * 0.3, 2.0)
+        score += self.feature_terms['specificity']['numbers'].score(features)
         
         # Check for specific formats mentioned
-        format_keywords = ['json', 'csv', 'xml', 'markdown', 'html', 'list', 'table', 'paragraph']
-        format_count = sum(1 for keyword in format_keywords if keyword in prompt_lower)
-        score += min(format_count * 0.5, 1.5)
+        score += terms['format'].score(features)
         
         # Check for examples
-        if 'example' in prompt_lower or 'for instance' in prompt_lower:
-            score += 1.0
+        score += terms['example'].score(features)
         
         return max(0.0, min(10.0, score))
     
-    def _analyze_structure(self, prompt: str, prompt_lower: str) -> float:
+    def _analyze_structure(self, features: PromptFeatures) -> float:
         """Analyze prompt structure"""
-        score = 5.0  # Base score
+        terms = self.keyword_terms['structure']
+        markers = self.feature_terms['structure']
+        score = BASE_SCORES['structure']
         
         # Check for structural indicators
-        structure_count = sum(1 for indicator in self.structure_indicators['positive'] 
-                            if indicator in prompt_lower)
-        score += min(structure_count * 0.6, 3.0)
+        score += terms['positive'].score(features)
         
         # Check for bullet points or numbered lists
-        if re.search(r'^\s*[-*•]\s', prompt, re.MULTILINE):
-            score += 1.0
-        if re.search(r'^\s*\d+\.\s', prompt, re.MULTILINE):
-            score += 1.0
+        score += markers['bullet_list'].score(features)
+        score += markers['numbered_list'].score(features)
         
         # Check for sections or headers
-        if re.search(r'^[A-Z][^.!?]*:$', prompt, re.MULTILINE):
-            score += 0.5
+        score += markers['section_header'].score(features)
         
         # Check for logical flow
-        transition_words = ['however', 'therefore', 'furthermore', 'moreover', 'additionally', 'consequently']
-        transition_count = sum(1 for word in transition_words if word in prompt_lower)
-        score += min(transition_count * 0.3, 1.0)
+        score += terms['transition'].score(features)
         
         # Penalize if prompt is just one long paragraph
-        paragraph_count = len([p for p in prompt.split('\n\n') if p.strip()])
-        if paragraph_count == 1 and len(prompt.split()) > 50:
+        readability = features.readability
+        if readability.paragraph_count == 1 and readability.word_count > 50:
             score -= 1.5
         
         return max(0.0, min(10.0, score))
     
-    def _analyze_context(self, prompt: str, prompt_lower: str) -> float:
+    def _analyze_context(self, features: PromptFeatures) -> float:
         """Analyze prompt context"""
-        score = 4.0  # Base score
+        terms = self.keyword_terms['context']
+        score = BASE_SCORES['context']
         
         # Check for context indicators
-        context_count = sum(1 for indicator in self.context_indicators['positive'] 
-                          if indicator in prompt_lower)
-        score += min(context_count * 1.0, 4.0)
+        score += terms['positive'].score(features)
         
         # Check for role definition
-        role_keywords = ['you are', 'act as', 'pretend to be', 'imagine you are', 'role:', 'persona:']
-        if any(keyword in prompt_lower for keyword in role_keywords):
-            score += 1.5
+        score += terms['role'].score(features)
         
         # Check for domain-specific terminology
-        domains = ['technical', 'medical', 'legal', 'financial', 'academic', 'creative', 'business']
-        domain_count = sum(1 for domain in domains if domain in prompt_lower)
-        score += min(domain_count * 0.4, 1.0)
+        score += terms['domain'].score(features)
         
         # Check for constraints or requirements
-        constraint_keywords = ['must', 'should', 'cannot', 'avoid', 'include', 'exclude', 'limit', 'maximum', 'minimum']
-        constraint_count = sum(1 for keyword in constraint_keywords if keyword in prompt_lower)
-        score += min(constraint_count * 0.2, 1.5)
+        score += terms['constraint'].score(features)
         
         return max(0.0, min(10.0, score))
     
-    def _analyze_creativity(self, prompt: str, prompt_lower: str) -> float:
+    def _analyze_creativity(self, features: PromptFeatures) -> float:
         """Analyze prompt creativity encouragement"""
-        score = 5.0  # Base score
+        terms = self.keyword_terms['creativity']
+        score = BASE_SCORES['creativity']
         
         # Check for creativity indicators
-        positive_count = sum(1 for indicator in self.creativity_indicators['positive'] 
-                           if indicator in prompt_lower)
-        negative_count = sum(1 for indicator in self.creativity_indicators['negative'] 
-                           if indicator in prompt_lower)
-        
-        score += min(positive_count * 0.8, 3.0)
-        score -= min(negative_count * 0.5, 2.0)
+        score += terms['positive'].score(features)
+        score += terms['negative'].score(features)
         
         # Check for open-ended questions
-        open_questions = ['what if', 'how might', 'what could', 'imagine', 'suppose']
-        open_count = sum(1 for question in open_questions if question in prompt_lower)
-        score += min(open_count * 0.6, 2.0)
+        score += terms['open_question'].score(features)
         
         # Check for multiple perspectives requested
-        perspective_keywords = ['different ways', 'various approaches', 'multiple solutions', 'alternatives']
-        if any(keyword in prompt_lower for keyword in perspective_keywords):
-            score += 1.0
+        score += terms['perspective'].score(features)
         
         # Penalize overly restrictive prompts
-        restrictive_keywords = ['only', 'exactly', 'precisely', 'must be', 'required']
-        restrictive_count = sum(1 for keyword in restrictive_keywords if keyword in prompt_lower)
-        if restrictive_count > 3:
-            score -= 1.0
+        score += terms['restrictive'].score(features)
         
         return max(0.0, min(10.0, score))
     
-    def _generate_detailed_feedback(self, prompt: str, prompt_lower: str, scores: Dict[str, float]) -> Dict[str, List[str]]:
+    def _generate_detailed_feedback(self, scores: Dict[str, float]) -> Dict[str, List[str]]:
         """Generate detailed feedback for each category"""
+        good = self.thresholds['good']
+        excellent = self.thresholds['excellent']
         feedback = {
             'clarity': [],
             'specificity': [],
@@ -287,53 +646,53 @@ class PromptAnalyzer:
         }
         
         # Clarity feedback
-        if scores['clarity'] < 6.0:
+        if scores['clarity'] < good:
             feedback['clarity'].extend([
                 "Consider using more specific and clear language",
                 "Avoid ambiguous pronouns like 'it', 'this', 'that'",
                 "Break down complex sentences into simpler ones"
             ])
-        if scores['clarity'] >= 8.0:
+        if scores['clarity'] >= excellent:
             feedback['clarity'].append("Prompt demonstrates excellent clarity")
         
         # Specificity feedback
-        if scores['specificity'] < 6.0:
+        if scores['specificity'] < good:
             feedback['specificity'].extend([
                 "Add specific requirements or constraints",
                 "Include desired format, length, or style",
                 "Provide examples of expected output"
             ])
-        if scores['specificity'] >= 8.0:
+        if scores['specificity'] >= excellent:
             feedback['specificity'].append("Prompt is highly specific and detailed")
         
         # Structure feedback
-        if scores['structure'] < 6.0:
+        if scores['structure'] < good:
             feedback['structure'].extend([
                 "Organize the prompt with clear sections",
                 "Use bullet points or numbered lists for multiple requirements",
                 "Add transition words to improve flow"
             ])
-        if scores['structure'] >= 8.0:
+        if scores['structure'] >= excellent:
             feedback['structure'].append("Prompt is well-structured and organized")
         
         # Context feedback
-        if scores['context'] < 6.0:
+        if scores['context'] < good:
             feedback['context'].extend([
                 "Provide more background information",
                 "Define the role or persona for the AI",
                 "Specify the target audience or use case"
             ])
-        if scores['context'] >= 8.0:
+        if scores['context'] >= excellent:
             feedback['context'].append("Prompt provides excellent context")
         
         # Creativity feedback
-        if scores['creativity'] < 6.0:
+        if scores['creativity'] < good:
             feedback['creativity'].extend([
                 "Encourage creative and innovative responses",
                 "Ask for multiple alternatives or approaches",
                 "Use open-ended questions to inspire creativity"
             ])
-        if scores['creativity'] >= 8.0:
+        if scores['creativity'] >= excellent:
             feedback['creativity'].append("Prompt effectively encourages creativity")
         
         return feedback
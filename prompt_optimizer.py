@@ -6,9 +6,103 @@ and generates optimized versions of prompts along with specific feedback.
 """
 
 import re
-from typing import List, Dict
+import time
+from typing import Any, Dict, List, Optional
 from dataclasses import dataclass
-from prompt_analyzer import AnalysisMetrics
+from prompt_analyzer import AnalysisMetrics, PromptAnalyzer
+from utils import Immutable
+
+
+DEFAULT_OPTIMIZATION_SETTINGS = {
+    'max_optimizations_per_category': 3,
+    'preserve_original_intent': True,
+    'add_structure_headers': True,
+    'enhance_creativity': True
+}
+
+# Fixed text the strategies insert, by template ID. Edit scripts refer to
+# these IDs, so existing IDs must keep their text.
+TEMPLATES = {
+    'format': "\n\nFormat: Please provide your response in a clear, structured format.",
+    'length': "\n\nLength: Provide a comprehensive response with sufficient detail.",
+    'requirements': "\n\nRequirements:\n- Be specific and detailed\n- Include relevant examples\n- Address all aspects of the request",
+    'task': "Task:\n",
+    'instructions': "\n\nInstructions:\nPlease ensure your response is comprehensive and well-structured.",
+    'role': "Context: You are an expert assistant helping with this task.\n\n",
+    'purpose': "\n\nPurpose: This information will be used to provide accurate and helpful guidance.",
+    'audience': "\n\nAudience: General audience seeking clear and actionable information.",
+    'approach': "\n\nApproach: Feel free to be creative and think of innovative solutions.",
+    'alternatives': "\n\nAdditional: Please consider multiple approaches and provide alternatives where applicable."
+}
+
+# Feedback messages, by kind and ID. Worker processes send these as
+# codes (see shared_results), so they are listed in the order the
+# optimizer reports them.
+STRENGTHS = {
+    'clarity': "Clear and unambiguous language",
+    'specificity': "Specific requirements and detailed instructions",
+    'structure': "Well-organized and logically structured",
+    'context': "Provides sufficient background and context",
+    'creativity': "Encourages creative and innovative thinking",
+    'questions': "Uses questions to guide response",
+    'examples': "Includes examples for clarification",
+    'paragraphs': "Uses paragraphs for better organization",
+    'intent': "Shows clear intent to communicate a request"
+}
+WEAKNESSES = {
+    'clarity': "Could be clearer and less ambiguous",
+    'specificity': "Lacks specific requirements and constraints",
+    'structure': "Could benefit from better organization",
+    'context': "Needs more background information and context",
+    'creativity': "Could better encourage creative responses",
+    'too_brief': "Too brief - could provide more detail",
+    'too_long': "Quite lengthy - consider breaking into sections",
+    'pronouns': "Contains ambiguous pronouns"
+}
+SUGGESTIONS = {
+    'clarity': (
+        "Use specific nouns instead of pronouns when possible",
+        "Keep sentences concise and focused",
+        "Define any technical terms or jargon"
+    ),
+    'specificity': (
+        "Specify the desired format for the response",
+        "Include length or scope requirements",
+        "Provide examples of what you're looking for"
+    ),
+    'structure': (
+        "Use bullet points or numbered lists for multiple requirements",
+        "Organize complex prompts into clear sections",
+        "Use headers to separate different types of instructions"
+    ),
+    'context': (
+        "Provide background information about the task",
+        "Define the role you want the AI to assume",
+        "Specify the target audience for the response"
+    ),
+    'creativity': (
+        "Ask for multiple approaches or alternatives",
+        "Use open-ended questions to encourage exploration",
+        "Avoid overly restrictive constraints unless necessary"
+    ),
+    'general': (
+        "Test your prompts with different phrasings to see what works best",
+        "Consider the AI's perspective when crafting instructions",
+        "Be explicit about what you want rather than assuming the AI will infer it"
+    )
+}
+
+# Patterns are compiled once at import; compiled patterns are safe to share
+AMBIGUOUS_REPLACEMENTS = (
+    (' it ', re.compile(' it ', re.IGNORECASE), ' the item '),
+    (' they ', re.compile(' they ', re.IGNORECASE), ' these items '),
+    (' them ', re.compile(' them ', re.IGNORECASE), ' these elements ')
+)
+SENTENCE_SPLIT_PATTERN = re.compile(r'([.!?]+)')
+SENTENCE_BOUNDARY_PATTERN = re.compile(r'[.!?]+')
+RESTRICTIVE_PATTERN = re.compile(r'\b(only|exactly|precisely|must be|required)\b', re.IGNORECASE)
+ONLY_PATTERN = re.compile(r'\bonly\b', re.IGNORECASE)
+EXACTLY_PATTERN = re.compile(r'\bexactly\b', re.IGNORECASE)
 
 
 @dataclass
@@ -20,11 +114,32 @@ class OptimizationResult:
     suggestions: List[str]
 
 
-class PromptOptimizer:
-    """Optimizes prompts based on analysis results"""
+@dataclass
+class OptimizationCandidate:
+    """A prompt variant produced by the beam search"""
+    optimized_prompt: str
+    overall_score: float
+    strategies: List[str]
+    improvements: List[str]
+
+
+class PromptOptimizer(Immutable):
+    """
+    Optimizes prompts based on analysis results
     
-    def __init__(self):
-        """Initialize the optimizer with improvement strategies"""
+    Like PromptAnalyzer, instances are frozen after ``__init__`` and keep
+    per-call state local, so one optimizer can be shared across threads.
+    """
+    
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the optimizer with improvement strategies
+        
+        Args:
+            settings: ``optimization_settings`` from config.json
+        """
+        self.settings = {**DEFAULT_OPTIMIZATION_SETTINGS, **(settings or {})}
+        
         self.optimization_strategies = {
             'clarity': self._optimize_clarity,
             'specificity': self._optimize_specificity,
@@ -32,6 +147,8 @@ class PromptOptimizer:
             'context': self._optimize_context,
             'creativity': self._optimize_creativity
         }
+        if not self.settings['enhance_creativity']:
+            del self.optimization_strategies['creativity']
         
         self.general_tips = [
             "Use active voice instead of passive voice when possible",
@@ -45,6 +162,8 @@ class PromptOptimizer:
             "Set clear expectations and constraints",
             "Encourage creative thinking when appropriate"
         ]
+        
+        self._freeze(settings)
     
     def optimize(self, original_prompt: str, analysis: AnalysisMetrics) -> OptimizationResult:
         """
@@ -57,30 +176,10 @@ class PromptOptimizer:
         Returns:
             OptimizationResult with optimized prompt and feedback
         """
-        # Start with the original prompt
-        optimized = original_prompt
-        applied_optimizations = []
-        
         # Apply optimizations based on low scores
-        scores = {
-            'clarity': analysis.clarity_score,
-            'specificity': analysis.specificity_score,
-            'structure': analysis.structure_score,
-            'context': analysis.context_score,
-            'creativity': analysis.creativity_score
-        }
-        
-        # Sort by lowest scores first to prioritize improvements
-        sorted_scores = sorted(scores.items(), key=lambda x: x[1])
-        
-        for category, score in sorted_scores:
-            if score < 7.0:  # Apply optimization if score is below 7
-                try:
-                    optimized, improvements = self.optimization_strategies[category](optimized, score)
-                    applied_optimizations.extend(improvements)
-                except Exception as e:
-                    # Continue with other optimizations if one fails
-                    continue
+        optimized, _, applied_optimizations = self._apply_greedy(
+            original_prompt, self._category_scores(analysis)
+        )
         
         # Generate strengths, weaknesses, and suggestions
         strengths = self._identify_strengths(original_prompt, analysis)
@@ -94,25 +193,133 @@ class PromptOptimizer:
             suggestions=suggestions
         )
     
+    def search(self, original_prompt: str, analyzer: PromptAnalyzer,
+               beam_width: int = 3, top_k: int = 3,
+               time_budget: float = 1.0) -> List[OptimizationCandidate]:
+        """
+        Explore orderings and subsets of strategies with a beam search
+        
+        Each level of the search applies one more strategy to every prompt
+        on the beam and keeps the ``beam_width`` best-scoring results.
+        Analyses are memoized by prompt text, so states reached through
+        different orderings (or shared prefixes) are only scored once.
+        
+        Args:
+            original_prompt: The original prompt text
+            analyzer: Analyzer used to score intermediate prompts
+            beam_width: Number of states kept at each search depth
+            top_k: Number of variants to return
+            time_budget: Wall-clock budget in seconds for the search
+            
+        Returns:
+            Up to ``top_k`` OptimizationCandidate objects, best first
+        """
+        deadline = time.perf_counter() + time_budget
+        analyses: Dict[str, AnalysisMetrics] = {}
+        
+        def score(text: str) -> AnalysisMetrics:
+            if text not in analyses:
+                analyses[text] = analyzer.analyze(text)
+            return analyses[text]
+        
+        root_analysis = score(original_prompt)
+        root = OptimizationCandidate(original_prompt, root_analysis.overall_score, [], [])
+        visited = {original_prompt: root}
+        beam = [root]
+        
+        # The greedy path is always a candidate, so search never does worse
+        text, categories, improvements = self._apply_greedy(
+            original_prompt, self._category_scores(root_analysis)
+        )
+        if text != original_prompt:
+            visited[text] = OptimizationCandidate(
+                text, score(text).overall_score, categories, improvements
+            )
+        
+        while beam and time.perf_counter() < deadline:
+            children = []
+            for state in beam:
+                category_scores = self._category_scores(score(state.optimized_prompt))
+                for category, strategy in self.optimization_strategies.items():
+                    if category in state.strategies or category_scores[category] >= 7.0:
+                        continue
+                    try:
+                        text, improvements = strategy(state.optimized_prompt, category_scores[category])
+                    except Exception:
+                        continue
+                    if text in visited:
+                        continue
+                    child = OptimizationCandidate(
+                        optimized_prompt=text,
+                        overall_score=0.0,
+                        strategies=state.strategies + [category],
+                        improvements=state.improvements + improvements[:self.settings['max_optimizations_per_category']]
+                    )
+                    visited[text] = child
+                    children.append(child)
+            
+            scored = []
+            for child in children:
+                if time.perf_counter() >= deadline:
+                    break
+                child.overall_score = score(child.optimized_prompt).overall_score
+                scored.append(child)
+            
+            scored.sort(key=lambda c: (-c.overall_score, len(c.strategies)))
+            beam = scored[:beam_width]
+        
+        candidates = [c for text, c in visited.items()
+                      if text in analyses and text != original_prompt]
+        candidates.sort(key=lambda c: (-c.overall_score, len(c.strategies)))
+        return candidates[:top_k] or [root]
+    
+    def _apply_greedy(self, prompt: str, scores: Dict[str, float]) -> tuple[str, List[str], List[str]]:
+        """Apply strategies in lowest-score-first order, returning text, categories and improvements"""
+        optimized = prompt
+        applied_categories = []
+        applied_optimizations = []
+        
+        # Sort by lowest scores first to prioritize improvements
+        sorted_scores = sorted(scores.items(), key=lambda x: x[1])
+        
+        for category, score in sorted_scores:
+            strategy = self.optimization_strategies.get(category)
+            if strategy is not None and score < 7.0:  # Apply optimization if score is below 7
+                try:
+                    text, improvements = strategy(optimized, score)
+                    if text != optimized:
+                        applied_categories.append(category)
+                    optimized = text
+                    applied_optimizations.extend(improvements[:self.settings['max_optimizations_per_category']])
+                except Exception as e:
+                    # Continue with other optimizations if one fails
+                    continue
+        
+        return optimized, applied_categories, applied_optimizations
+    
+    def _category_scores(self, analysis: AnalysisMetrics) -> Dict[str, float]:
+        """Map category names to their scores"""
+        return {
+            'clarity': analysis.clarity_score,
+            'specificity': analysis.specificity_score,
+            'structure': analysis.structure_score,
+            'context': analysis.context_score,
+            'creativity': analysis.creativity_score
+        }
+    
     def _optimize_clarity(self, prompt: str, score: float) -> tuple[str, List[str]]:
         """Optimize prompt clarity"""
         improvements = []
         optimized = prompt
-          # Replace ambiguous pronouns (only when they appear to be ambiguous)
-        ambiguous_replacements = {
-            ' it ': ' the item ',
-            ' they ': ' these items ',
-            ' them ': ' these elements '
-        }
-        
-        for ambiguous, replacement in ambiguous_replacements.items():
+        # Replace ambiguous pronouns (only when they appear to be ambiguous)
+        for ambiguous, pattern, replacement in AMBIGUOUS_REPLACEMENTS:
             if ambiguous in optimized.lower():
-                optimized = re.sub(ambiguous, replacement, optimized, flags=re.IGNORECASE)
+                optimized = pattern.sub(replacement, optimized)
                 improvements.append("Replaced ambiguous pronouns with specific terms")
                 break
         
         # Break down overly long sentences
-        sentences = re.split(r'([.!?]+)', optimized)
+        sentences = SENTENCE_SPLIT_PATTERN.split(optimized)
         new_sentences = []
         
         for i in range(0, len(sentences), 2):
@@ -153,19 +360,19 @@ class PromptOptimizer:
         # Add format specification if missing
         format_keywords = ['format', 'json', 'csv', 'list', 'paragraph', 'table']
         if not any(keyword in optimized.lower() for keyword in format_keywords):
-            optimized += "\n\nFormat: Please provide your response in a clear, structured format."
+            optimized += TEMPLATES['format']
             improvements.append("Added format specification")
         
         # Add length specification if missing
         length_keywords = ['length', 'words', 'sentences', 'paragraphs', 'brief', 'detailed']
         if not any(keyword in optimized.lower() for keyword in length_keywords):
-            optimized += "\n\nLength: Provide a comprehensive response with sufficient detail."
+            optimized += TEMPLATES['length']
             improvements.append("Added length guideline")
         
         # Add constraints section if score is very low
         if score < 4.0:
             if 'requirements:' not in optimized.lower() and 'constraints:' not in optimized.lower():
-                optimized += "\n\nRequirements:\n- Be specific and detailed\n- Include relevant examples\n- Address all aspects of the request"
+                optimized += TEMPLATES['requirements']
                 improvements.append("Added specific requirements")
         
         return optimized, improvements
@@ -181,7 +388,7 @@ class PromptOptimizer:
             parts = []
             current_part = []
             
-            sentences = re.split(r'[.!?]+', optimized)
+            sentences = SENTENCE_BOUNDARY_PATTERN.split(optimized)
             for sentence in sentences:
                 sentence = sentence.strip()
                 if sentence:
@@ -202,11 +409,12 @@ class PromptOptimizer:
                 improvements.append("Restructured into clear paragraphs")
         
         # Add section headers if missing and content is complex
-        if len(optimized.split()) > 100 and ':' not in optimized:
+        if (self.settings['add_structure_headers'] and
+                len(optimized.split()) > 100 and ':' not in optimized):
             # Check if we can identify task and requirements
             lines = optimized.split('\n')
             if len(lines) <= 2:
-                optimized = "Task:\n" + optimized + "\n\nInstructions:\nPlease ensure your response is comprehensive and well-structured."
+                optimized = TEMPLATES['task'] + optimized + TEMPLATES['instructions']
                 improvements.append("Added clear section headers")
         
         return optimized, improvements
@@ -219,20 +427,20 @@ class PromptOptimizer:
         # Add role definition if missing
         role_keywords = ['you are', 'act as', 'pretend', 'imagine you', 'role:']
         if not any(keyword in optimized.lower() for keyword in role_keywords):
-            optimized = "Context: You are an expert assistant helping with this task.\n\n" + optimized
+            optimized = TEMPLATES['role'] + optimized
             improvements.append("Added role context")
         
         # Add purpose if missing
         purpose_keywords = ['purpose:', 'goal:', 'objective:', 'for the purpose', 'in order to']
         if not any(keyword in optimized.lower() for keyword in purpose_keywords):
-            optimized += "\n\nPurpose: This information will be used to provide accurate and helpful guidance."
+            optimized += TEMPLATES['purpose']
             improvements.append("Added purpose statement")
         
         # Add audience context if score is very low
         if score < 4.0:
             audience_keywords = ['audience:', 'for', 'target', 'readers', 'users']
             if not any(keyword in optimized.lower() for keyword in audience_keywords):
-                optimized += "\n\nAudience: General audience seeking clear and actionable information."
+                optimized += TEMPLATES['audience']
                 improvements.append("Added audience context")
         
         return optimized, improvements
@@ -245,21 +453,21 @@ class PromptOptimizer:
         # Add creativity encouragement if missing
         creative_keywords = ['creative', 'innovative', 'unique', 'original', 'think outside']
         if not any(keyword in optimized.lower() for keyword in creative_keywords):
-            optimized += "\n\nApproach: Feel free to be creative and think of innovative solutions."
+            optimized += TEMPLATES['approach']
             improvements.append("Added creativity encouragement")
         
         # Add request for alternatives if score is low
         if score < 5.0:
             alternative_keywords = ['alternatives', 'different ways', 'various approaches', 'multiple']
             if not any(keyword in optimized.lower() for keyword in alternative_keywords):
-                optimized += "\n\nAdditional: Please consider multiple approaches and provide alternatives where applicable."
+                optimized += TEMPLATES['alternatives']
                 improvements.append("Encouraged multiple perspectives")
         
         # Transform restrictive language if too many constraints
-        restrictive_count = len(re.findall(r'\b(only|exactly|precisely|must be|required)\b', optimized, re.IGNORECASE))
+        restrictive_count = len(RESTRICTIVE_PATTERN.findall(optimized))
         if restrictive_count > 3:
-            optimized = re.sub(r'\bonly\b', 'primarily', optimized, flags=re.IGNORECASE, count=1)
-            optimized = re.sub(r'\bexactly\b', 'preferably', optimized, flags=re.IGNORECASE, count=1)
+            optimized = ONLY_PATTERN.sub('primarily', optimized, count=1)
+            optimized = EXACTLY_PATTERN.sub('preferably', optimized, count=1)
             improvements.append("Softened restrictive language to encourage creativity")
         
         return optimized, improvements
@@ -269,32 +477,32 @@ class PromptOptimizer:
         strengths = []
         
         if analysis.clarity_score >= 7.0:
-            strengths.append("Clear and unambiguous language")
+            strengths.append(STRENGTHS['clarity'])
         
         if analysis.specificity_score >= 7.0:
-            strengths.append("Specific requirements and detailed instructions")
+            strengths.append(STRENGTHS['specificity'])
         
         if analysis.structure_score >= 7.0:
-            strengths.append("Well-organized and logically structured")
+            strengths.append(STRENGTHS['structure'])
         
         if analysis.context_score >= 7.0:
-            strengths.append("Provides sufficient background and context")
+            strengths.append(STRENGTHS['context'])
         
         if analysis.creativity_score >= 7.0:
-            strengths.append("Encourages creative and innovative thinking")
+            strengths.append(STRENGTHS['creativity'])
         
         # Check for specific good practices
         if '?' in prompt:
-            strengths.append("Uses questions to guide response")
+            strengths.append(STRENGTHS['questions'])
         
         if 'example' in prompt.lower():
-            strengths.append("Includes examples for clarification")
+            strengths.append(STRENGTHS['examples'])
         
         if len(prompt.split('\n\n')) > 1:
-            strengths.append("Uses paragraphs for better organization")
+            strengths.append(STRENGTHS['paragraphs'])
         
         if not strengths:
-            strengths.append("Shows clear intent to communicate a request")
+            strengths.append(STRENGTHS['intent'])
         
         return strengths
     
@@ -303,30 +511,30 @@ class PromptOptimizer:
         weaknesses = []
         
         if analysis.clarity_score < 6.0:
-            weaknesses.append("Could be clearer and less ambiguous")
+            weaknesses.append(WEAKNESSES['clarity'])
         
         if analysis.specificity_score < 6.0:
-            weaknesses.append("Lacks specific requirements and constraints")
+            weaknesses.append(WEAKNESSES['specificity'])
         
         if analysis.structure_score < 6.0:
-            weaknesses.append("Could benefit from better organization")
+            weaknesses.append(WEAKNESSES['structure'])
         
         if analysis.context_score < 6.0:
-            weaknesses.append("Needs more background information and context")
+            weaknesses.append(WEAKNESSES['context'])
         
         if analysis.creativity_score < 6.0:
-            weaknesses.append("Could better encourage creative responses")
+            weaknesses.append(WEAKNESSES['creativity'])
         
         # Check for specific issues
         if len(prompt.split()) < 10:
-            weaknesses.append("Too brief - could provide more detail")
+            weaknesses.append(WEAKNESSES['too_brief'])
         
         if len(prompt.split()) > 200:
-            weaknesses.append("Quite lengthy - consider breaking into sections")
+            weaknesses.append(WEAKNESSES['too_long'])
         
         ambiguous_pronouns = ['it', 'this', 'that', 'they', 'them']
         if any(f' {pronoun} ' in prompt.lower() for pronoun in ambiguous_pronouns):
-            weaknesses.append("Contains ambiguous pronouns")
+            weaknesses.append(WEAKNESSES['pronouns'])
         
         return weaknesses
     
@@ -336,46 +544,22 @@ class PromptOptimizer:
         
         # Category-specific suggestions based on scores
         if analysis.clarity_score < 7.0:
-            suggestions.extend([
-                "Use specific nouns instead of pronouns when possible",
-                "Keep sentences concise and focused",
-                "Define any technical terms or jargon"
-            ])
+            suggestions.extend(SUGGESTIONS['clarity'])
         
         if analysis.specificity_score < 7.0:
-            suggestions.extend([
-                "Specify the desired format for the response",
-                "Include length or scope requirements",
-                "Provide examples of what you're looking for"
-            ])
+            suggestions.extend(SUGGESTIONS['specificity'])
         
         if analysis.structure_score < 7.0:
-            suggestions.extend([
-                "Use bullet points or numbered lists for multiple requirements",
-                "Organize complex prompts into clear sections",
-                "Use headers to separate different types of instructions"
-            ])
+            suggestions.extend(SUGGESTIONS['structure'])
         
         if analysis.context_score < 7.0:
-            suggestions.extend([
-                "Provide background information about the task",
-                "Define the role you want the AI to assume",
-                "Specify the target audience for the response"
-            ])
+            suggestions.extend(SUGGESTIONS['context'])
         
         if analysis.creativity_score < 7.0:
-            suggestions.extend([
-                "Ask for multiple approaches or alternatives",
-                "Use open-ended questions to encourage exploration",
-                "Avoid overly restrictive constraints unless necessary"
-            ])
+            suggestions.extend(SUGGESTIONS['creativity'])
         
         # Add general best practices
-        suggestions.extend([
-            "Test your prompts with different phrasings to see what works best",
-            "Consider the AI's perspective when crafting instructions",
-            "Be explicit about what you want rather than assuming the AI will infer it"
-        ])
+        suggestions.extend(SUGGESTIONS['general'])
         
         # Remove duplicates and limit to most relevant suggestions
         suggestions = list(dict.fromkeys(suggestions))[:8]
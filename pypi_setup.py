@@ -35,7 +35,12 @@ setup(
         "Changelog": "https://github.com/username/ai-prompt-analyser/blob/main/CHANGELOG.md",
     },
     packages=find_packages(),
-    py_modules=["main", "prompt_analyzer", "prompt_optimizer", "utils"],
+    py_modules=["main", "prompt_analyzer", "prompt_optimizer", "utils", "long_prompt",
+                "engine", "corpus_stats", "deadline", "prefilter", "history",
+                "edit_script", "shared_results", "template_batch",
+                "prefix_cache", "server", "memory_profile",
+                "report_writers", "rule_profile",
+                "stream_sink", "feature_index"],
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: Developers",
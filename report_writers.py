@@ -0,0 +1,311 @@
+"""
+Report Writers Module
+
+Streaming JSON, CSV and text report writers, and a fan-out that feeds
+several of them from one pass over the results. Each result is turned
+into a ReportRecord once: scores, feedback and readability figures are
+computed for the JSON entry and every writer formats from that entry.
+Each writer can run on its own background thread behind a bounded
+queue. A slow disk then delays only its own report, and analysis keeps
+going until that queue fills.
+"""
+
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from queue import Queue
+from typing import Any, Dict, List, Optional, Sequence
+from utils import result_to_dict
+
+
+REPORT_FORMATS = ('json', 'csv', 'txt')
+# Records buffered per writer before the producer waits for it
+QUEUE_SIZE = 256
+
+CSV_FIELDNAMES = [
+    'original_prompt', 'optimized_prompt', 'overall_score',
+    'clarity_score', 'specificity_score', 'structure_score',
+    'context_score', 'creativity_score', 'strengths',
+    'weaknesses', 'suggestions', 'flesch_reading_ease',
+    'flesch_kincaid_grade', 'optimized_edits'
+]
+
+_DONE = object()
+
+
+def report_format(output_path: str, format_type: str = "auto") -> str:
+    """Resolve 'auto' to a format from the file extension (text by default)"""
+    if format_type != "auto":
+        return format_type if format_type in REPORT_FORMATS else "txt"
+    extension = os.path.splitext(output_path)[1].lower().lstrip('.')
+    return extension if extension in ('json', 'csv') else "txt"
+
+
+@dataclass(frozen=True)
+class ReportRecord:
+    """A result and its JSON entry, shared by every writer"""
+    result: Any
+    entry: Dict[str, Any]
+
+    @classmethod
+    def from_result(cls, result) -> 'ReportRecord':
+        return cls(result, result_to_dict(result))
+
+
+class ReportWriter(ABC):
+    """
+    Writes one report file record by record
+
+    The file is opened on construction, so a bad path fails before any
+    analysis is done.
+    """
+
+    newline: Optional[str] = None
+
+    def __init__(self, output_path: str, total: int):
+        """
+        Args:
+            output_path: Path of the report
+            total: Number of records that will be written
+        """
+        self.output_path = output_path
+        self.total = total
+        self.count = 0
+        self._file = open(output_path, 'w', newline=self.newline, encoding='utf-8')
+
+    def write(self, record: ReportRecord):
+        self.count += 1
+        self._write(record)
+
+    def close(self):
+        """Finish the report and close the file"""
+        try:
+            self._finish()
+        finally:
+            self._file.close()
+
+    @abstractmethod
+    def _write(self, record: ReportRecord):
+        """Format one record into the file"""
+
+    def _finish(self):
+        pass
+
+
+class JsonReportWriter(ReportWriter):
+    """JSON report, written entry by entry in the layout of ``json.dump(indent=2)``"""
+
+    def __init__(self, output_path: str, total: int):
+        from datetime import datetime
+        super().__init__(output_path, total)
+        self._file.write('{\n  "generated_at": %s,\n  "results": ['
+                         % json.dumps(datetime.now().isoformat()))
+
+    def _write(self, record: ReportRecord):
+        text = json.dumps(record.entry, indent=2, ensure_ascii=False)
+        # JSON strings escape their newlines, so every line can be indented
+        self._file.write(',\n' if self.count > 1 else '\n')
+        self._file.write('\n'.join('    ' + line for line in text.split('\n')))
+
+    def _finish(self):
+        self._file.write('\n  ]\n}' if self.count else ']\n}')
+
+
+class CsvReportWriter(ReportWriter):
+    """CSV report, one row per result"""
+
+    newline = ''
+
+    def __init__(self, output_path: str, total: int):
+        import csv
+        super().__init__(output_path, total)
+        self._writer = csv.DictWriter(self._file, fieldnames=CSV_FIELDNAMES)
+        self._writer.writeheader()
+
+    def _write(self, record: ReportRecord):
+        entry = record.entry
+        scores = entry["scores"]
+        feedback = entry["feedback"]
+        readability = entry.get("readability")
+        optimized_edits = entry.get("optimized_edits")
+        self._writer.writerow({
+            'original_prompt': entry["original_prompt"],
+            'optimized_prompt': entry.get("optimized_prompt", ''),
+            'overall_score': scores["overall"],
+            'clarity_score': scores["clarity"],
+            'specificity_score': scores["specificity"],
+            'structure_score': scores["structure"],
+            'context_score': scores["context"],
+            'creativity_score': scores["creativity"],
+            'strengths': '; '.join(feedback["strengths"]),
+            'weaknesses': '; '.join(feedback["weaknesses"]),
+            'suggestions': '; '.join(feedback["suggestions"]),
+            'flesch_reading_ease': readability["flesch_reading_ease"] if readability else '',
+            'flesch_kincaid_grade': readability["flesch_kincaid_grade"] if readability else '',
+            'optimized_edits': '' if optimized_edits is None else json.dumps(optimized_edits,
+                                                                              ensure_ascii=False)
+        })
+
+
+class TextReportWriter(ReportWriter):
+    """Formatted text report"""
+
+    def __init__(self, output_path: str, total: int):
+        from datetime import datetime
+        super().__init__(output_path, total)
+        self._file.write("AI PROMPT ANALYSIS REPORT\n")
+        self._file.write("=" * 50 + "\n")
+        self._file.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        self._file.write(f"Total Prompts Analyzed: {total}\n\n")
+
+    def _write(self, record: ReportRecord):
+        entry = record.entry
+        scores = entry["scores"]
+        feedback = entry["feedback"]
+        f = self._file
+        f.write(f"ANALYSIS {self.count}\n")
+        f.write("-" * 20 + "\n\n")
+
+        f.write("ORIGINAL PROMPT:\n")
+        f.write(f"{entry['original_prompt']}\n\n")
+
+        # Compact entries hold an edit script; the result expands it
+        f.write("OPTIMIZED PROMPT:\n")
+        f.write(f"{record.result.optimized_prompt}\n\n")
+
+        f.write("SCORES:\n")
+        f.write(f"Overall: {scores['overall']:.1f}/10\n")
+        f.write(f"Clarity: {scores['clarity']:.1f}/10\n")
+        f.write(f"Specificity: {scores['specificity']:.1f}/10\n")
+        f.write(f"Structure: {scores['structure']:.1f}/10\n")
+        f.write(f"Context: {scores['context']:.1f}/10\n")
+        f.write(f"Creativity: {scores['creativity']:.1f}/10\n\n")
+
+        readability = entry.get("readability")
+        if readability is not None:
+            f.write("READABILITY:\n")
+            f.write(f"Flesch Reading Ease: {readability['flesch_reading_ease']:.1f}\n")
+            f.write(f"Flesch-Kincaid Grade: {readability['flesch_kincaid_grade']:.1f}\n")
+            f.write(f"Sentences: {readability['sentence_count']}, "
+                    f"Avg Words/Sentence: {readability['avg_words_per_sentence']:.1f}\n\n")
+
+        for heading, kind in (("STRENGTHS", "strengths"), ("WEAKNESSES", "weaknesses"),
+                              ("SUGGESTIONS", "suggestions")):
+            f.write(f"{heading}:\n")
+            for message in feedback[kind]:
+                f.write(f"• {message}\n")
+            f.write("\n")
+
+        if self.count < self.total:
+            f.write("=" * 50 + "\n\n")
+
+
+WRITERS = {'json': JsonReportWriter, 'csv': CsvReportWriter, 'txt': TextReportWriter}
+
+
+class ReportFanout:
+    """
+    Feeds every result to several report writers in one pass
+
+    Use as a context manager. Leaving the block with an exception
+    discards the unfinished reports. An error in a writer stops only that
+    writer, and ``close`` raises it once the others have finished.
+    """
+
+    def __init__(self, output_paths: Sequence[str], total: int, threads: bool = True,
+                 format_type: str = "auto"):
+        """
+        Args:
+            output_paths: Report paths; each one's extension selects its format
+            total: Number of results that will be written
+            threads: Run each writer on a background thread
+            format_type: Format for every path instead of 'auto'
+        """
+        self.output_paths = list(output_paths)
+        self._writers: List[ReportWriter] = []
+        try:
+            for path in self.output_paths:
+                self._writers.append(WRITERS[report_format(path, format_type)](path, total))
+        except Exception:
+            self._discard()
+            raise
+        self._errors: List[Optional[BaseException]] = [None] * len(self._writers)
+        self._queues: List[Queue] = []
+        self._threads: List[threading.Thread] = []
+        if threads:
+            for index, writer in enumerate(self._writers):
+                queue = Queue(maxsize=QUEUE_SIZE)
+                thread = threading.Thread(target=self._drain, args=(index, queue),
+                                          name=f"report-writer-{index}", daemon=True)
+                thread.start()
+                self._queues.append(queue)
+                self._threads.append(thread)
+
+    def write(self, result):
+        """Convert a result once and pass it to every writer"""
+        record = ReportRecord.from_result(result)
+        if self._queues:
+            for queue in self._queues:
+                queue.put(record)
+        else:
+            for index, writer in enumerate(self._writers):
+                self._write(index, writer.write, record)
+
+    def write_all(self, results):
+        for result in results:
+            self.write(result)
+
+    def close(self):
+        """Wait for the writers to finish their reports"""
+        self._join()
+        for index, writer in enumerate(self._writers):
+            self._write(index, lambda _: writer.close(), None)
+        errors = [error for error in self._errors if error is not None]
+        if errors:
+            raise errors[0]
+
+    def __enter__(self) -> 'ReportFanout':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._join()
+            self._discard()
+
+    def _drain(self, index: int, queue: Queue):
+        writer = self._writers[index]
+        while True:
+            record = queue.get()
+            if record is _DONE:
+                return
+            # After an error keep consuming, so the producer never blocks
+            if self._errors[index] is None:
+                self._write(index, writer.write, record)
+
+    def _write(self, index: int, write, record):
+        try:
+            write(record)
+        except Exception as e:
+            if self._errors[index] is None:
+                self._errors[index] = e
+
+    def _join(self):
+        for queue in self._queues:
+            queue.put(_DONE)
+        for thread in self._threads:
+            thread.join()
+        self._queues = []
+        self._threads = []
+
+    def _discard(self):
+        """Close and remove the reports opened so far"""
+        for writer in self._writers:
+            try:
+                writer._file.close()
+                os.remove(writer.output_path)
+            except OSError:
+                pass
@@ -0,0 +1,178 @@
+"""
+Rule Profile Module
+
+Attributes analysis cost and match counts to individual rules across a
+corpus: every indicator substring the analyzer looks up, the regex and
+counting passes of feature extraction, and the optimizer's strategies.
+Each rule is timed on its own over the whole corpus, so per-call timer
+overhead does not drown out cheap rules, and rules that never match are
+reported as dead.
+"""
+
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from prompt_analyzer import (
+    BULLET_PATTERN, NUMBER_PATTERN, NUMBERED_PATTERN, PromptAnalyzer, has_section_header
+)
+from prompt_optimizer import PromptOptimizer
+from utils import compute_readability
+
+
+INDICATOR = 'indicator'
+FEATURE = 'feature'
+STRATEGY = 'strategy'
+
+# Strategies run when their category scores below this (see _apply_greedy)
+STRATEGY_THRESHOLD = 7.0
+
+# Feature passes of PromptAnalyzer.extract_features, with their match test
+FEATURE_RULES: Dict[str, Callable[[str], Any]] = {
+    'lowercase': str.lower,
+    'question_count': lambda text: text.count('?'),
+    'NUMBER_PATTERN': NUMBER_PATTERN.findall,
+    'BULLET_PATTERN': BULLET_PATTERN.search,
+    'NUMBERED_PATTERN': NUMBERED_PATTERN.search,
+    'has_section_header': has_section_header,
+    'compute_readability': compute_readability
+}
+
+
+@dataclass
+class RuleCost:
+    """Time spent in one rule over a corpus and how often it matched"""
+    rule: str
+    kind: str
+    seconds: float
+    calls: int
+    matches: int
+    owners: List[str] = field(default_factory=list)
+
+
+@dataclass
+class RuleProfile:
+    """Costs of every rule over a corpus"""
+    prompts: int
+    rules: List[RuleCost]
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(rule.seconds for rule in self.rules)
+
+    def ranked(self) -> List[RuleCost]:
+        """Rules from most to least expensive"""
+        return sorted(self.rules, key=lambda rule: -rule.seconds)
+
+    def dead(self) -> List[RuleCost]:
+        """Rules that never matched (or, for strategies, never changed a prompt)"""
+        return [rule for rule in self.rules if not rule.matches]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'prompts': self.prompts,
+            'total_seconds': self.total_seconds,
+            'rules': [asdict(rule) for rule in self.ranked()]
+        }
+
+    def save(self, output_path: str):
+        """Save the profile as JSON"""
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+
+
+def indicator_owners(analyzer: PromptAnalyzer) -> Dict[str, List[str]]:
+    """
+    Map each indicator substring to the keyword lists that contain it
+
+    Lists are found among the analyzer's attributes: tuples of strings,
+    and tables of them (e.g. ``clarity_indicators.positive``).
+    """
+    owners: Dict[str, List[str]] = {pattern: [] for pattern in analyzer.patterns}
+    for name, value in vars(analyzer).items():
+        if name == 'patterns':
+            continue
+        tables = value.items() if isinstance(value, MappingProxyType) else [(None, value)]
+        for key, words in tables:
+            if not isinstance(words, tuple) or not all(isinstance(word, str) for word in words):
+                continue
+            for word in words:
+                if word in owners:
+                    owners[word].append(name if key is None else f"{name}.{key}")
+    return owners
+
+
+def profile_rules(analyzer: PromptAnalyzer, optimizer: PromptOptimizer,
+                  prompts: Sequence[str], repeat: int = 3) -> RuleProfile:
+    """
+    Time and count every analyzer and optimizer rule over a corpus
+
+    Args:
+        analyzer: Analyzer whose indicators and feature passes to profile
+        optimizer: Optimizer whose strategies to profile
+        prompts: The corpus
+        repeat: Timing runs per rule; the fastest is kept
+
+    Returns:
+        RuleProfile with one RuleCost per rule
+    """
+    lowered = [prompt.lower() for prompt in prompts]
+    rules = []
+
+    # Loop overhead is the same for every substring rule; only the lookup counts
+    loop = _time_substring(None, lowered, repeat)
+    for pattern, owners in indicator_owners(analyzer).items():
+        matches = sum(1 for text in lowered if pattern in text)
+        seconds = max(0.0, _time_substring(pattern, lowered, repeat) - loop)
+        rules.append(RuleCost(pattern, INDICATOR, seconds, len(lowered), matches, owners))
+
+    baseline = _time_calls(lambda text: None, prompts, repeat)
+    for name, rule in FEATURE_RULES.items():
+        matches = sum(1 for prompt in prompts if rule(prompt))
+        seconds = max(0.0, _time_calls(rule, prompts, repeat) - baseline)
+        rules.append(RuleCost(name, FEATURE, seconds, len(prompts), matches))
+
+    # Each strategy sees the original prompt and its category score, as
+    # the first greedy step would
+    scores = [analyzer.score(prompt) for prompt in prompts]
+    for category, strategy in optimizer.optimization_strategies.items():
+        calls = [(prompt, score[category]) for prompt, score in zip(prompts, scores)
+                 if score[category] < STRATEGY_THRESHOLD]
+        matches = sum(1 for prompt, score in calls if strategy(prompt, score)[0] != prompt)
+        seconds = min(_time_strategy(strategy, calls) for _ in range(repeat)) if calls else 0.0
+        rules.append(RuleCost(f"_optimize_{category}", STRATEGY, seconds, len(calls), matches))
+
+    return RuleProfile(prompts=len(prompts), rules=rules)
+
+
+def _time_substring(pattern: Optional[str], texts: Sequence[str], repeat: int) -> float:
+    """Fastest of ``repeat`` lookups of a substring in every text (None: the bare loop)"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        if pattern is None:
+            for text in texts:
+                pass
+        else:
+            for text in texts:
+                pattern in text
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _time_calls(rule: Callable[[str], Any], texts: Sequence[str], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for text in texts:
+            rule(text)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _time_strategy(strategy: Callable, calls: Sequence) -> float:
+    started = time.perf_counter()
+    for prompt, score in calls:
+        strategy(prompt, score)
+    return time.perf_counter() - started
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Analysis Server
+
+Serves prompt analysis over HTTP from one warm process. Each request may
+carry a config overlay (see apply_overlay in engine) on top of the
+server's configuration, so teams with different scoring weights,
+thresholds or optimizer settings share a process. Every effective
+configuration is compiled once and kept in a bounded EngineCache keyed
+by its hash; requests with the same overlay reuse that engine. With a
+sink, every result is also written to rotating compressed JSONL files
+(see stream_sink). Prompts that fail validation are rejected with 422
+before any analysis and can be logged to a separate rejects file. A
+ConfigWatcher sharing the engine pool reloads the base configuration
+when its file changes; requests in flight finish on the config they
+started with. With a deadline, from the request or the server's default,
+analysis degrades as far as needed to answer in time (see deadline).
+
+Endpoints:
+    POST /analyze  {"prompt": "...", "config": {...}, "scores_only": false,
+                    "compact": false, "search": "greedy", "variants": 3,
+                    "deadline_ms": 50}
+    GET  /stats    engine pool size, hits, misses and evictions, config
+                   reloads, degradation levels, rejections by reason and
+                   sink counts
+"""
+
+import argparse
+import json
+import math
+import os
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from deadline import DeadlinePolicy
+from engine import AnalysisEngine, ConfigWatcher, EngineCache, apply_overlay
+from main import analyze_and_optimize_prompt
+from prefilter import PromptScreen
+from stream_sink import COMPRESSIONS, DEFAULT_MAX_BYTES, DEFAULT_MAX_SECONDS, RotatingJsonlSink
+from utils import DEFAULT_MAX_PROMPT_LENGTH, load_config, result_to_dict
+
+
+DEFAULT_PORT = 8080
+DEFAULT_ENGINE_POOL_SIZE = 256
+DEFAULT_RELOAD_INTERVAL = 1.0
+MAX_BODY_BYTES = 1024 * 1024
+
+
+class RequestError(Exception):
+    """A request the server cannot process, with its HTTP status"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class AnalysisServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server sharing one engine pool across requests
+
+    Engines are immutable, so concurrent requests use them without
+    locking; only the pool itself is locked while looking one up.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], config: Dict[str, Any],
+                 pool_size: int = DEFAULT_ENGINE_POOL_SIZE,
+                 sink: Optional[RotatingJsonlSink] = None,
+                 screen: Optional[PromptScreen] = None,
+                 deadline_ms: Optional[float] = None):
+        super().__init__(address, AnalysisRequestHandler)
+        self.config = config
+        self.engines = EngineCache(max_size=pool_size)
+        self.sink = sink
+        self.screen = screen
+        # Default latency budget for requests without their own
+        self.deadline_ms = deadline_ms
+        # One cost model for all requests, learning from every timing
+        self.policy = DeadlinePolicy()
+        self.watcher: Optional[ConfigWatcher] = None
+        self._counters = Counter({'requests': 0, 'errors': 0, 'reloads': 0})
+        self._lock = threading.Lock()
+        # Compile the base engine up front so the first request is warm
+        self.engines.get(config)
+
+    def watch(self, config_path: str, interval: float = DEFAULT_RELOAD_INTERVAL) -> ConfigWatcher:
+        """
+        Reload the base configuration whenever its file changes
+
+        The watcher compiles into the server's engine pool, so switching
+        back to an earlier config reuses its engine.
+
+        Args:
+            config_path: Config file to poll
+            interval: Seconds between polls
+
+        Returns:
+            The started ConfigWatcher (stop it before closing the server)
+        """
+        self.watcher = ConfigWatcher(config_path, cache=self.engines, interval=interval,
+                                     on_reload=self._reload)
+        self.config = self.watcher.engine.config
+        self.watcher.start()
+        return self.watcher
+
+    def analyze(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Analyze one request body
+
+        Args:
+            request: Decoded JSON request (see the module docstring)
+
+        Returns:
+            Dictionary with the engine's config hash and the result
+
+        Raises:
+            RequestError: If the request is malformed
+        """
+        prompt = request.get('prompt')
+        if not isinstance(prompt, str) or not prompt.strip():
+            raise RequestError(400, "'prompt' must be a non-empty string")
+        reason = self.screen.check(prompt) if self.screen else ''
+        if reason:
+            raise RequestError(422, reason)
+        try:
+            engine = self.engines.get(apply_overlay(self.config, request.get('config')))
+        except ValueError as e:
+            raise RequestError(400, str(e))
+
+        search = request.get('search', 'greedy')
+        variants = request.get('variants', 3)
+        if search not in ('greedy', 'beam'):
+            raise RequestError(400, "'search' must be 'greedy' or 'beam'")
+        if not isinstance(variants, int) or isinstance(variants, bool) or variants < 1:
+            raise RequestError(400, "'variants' must be a positive integer")
+        deadline_ms = request.get('deadline_ms', self.deadline_ms)
+        if deadline_ms is not None and (
+                not isinstance(deadline_ms, (int, float)) or isinstance(deadline_ms, bool)
+                or not math.isfinite(deadline_ms) or deadline_ms <= 0):
+            raise RequestError(400, "'deadline_ms' must be a positive number")
+
+        search_options = None
+        if search == 'beam':
+            settings = engine.config.get('optimization_settings', {})
+            search_options = {
+                'beam_width': settings.get('beam_width', 3),
+                'top_k': variants,
+                'time_budget': settings.get('search_time_budget', 1.0)
+            }
+
+        deadline_options = None
+        if deadline_ms is not None:
+            deadline_options = {'budget': deadline_ms / 1000, 'policy': self.policy}
+
+        result = analyze_and_optimize_prompt(engine.analyzer, engine.optimizer, prompt,
+                                             search_options, deadline_options=deadline_options,
+                                             scores_only=bool(request.get('scores_only')),
+                                             compact=bool(request.get('compact')))
+        entry = result_to_dict(result)
+        if self.sink:
+            self.sink.write(entry)
+        return {'engine': engine.config_hash, 'result': entry}
+
+    def stats(self) -> Dict[str, int]:
+        """Return request counts and the engine pool's size and counters"""
+        with self._lock:
+            stats = dict(self._counters)
+        stats.update(self.engines.counters())
+        stats['engines'] = len(self.engines)
+        stats['max_engines'] = self.engines.max_size
+        stats['degraded'] = self.policy.counters()
+        if self.screen:
+            stats['rejected'] = self.screen.reasons()
+        if self.sink:
+            stats['sink_records'] = self.sink.records
+            stats['sink_files'] = len(self.sink.files)
+        return stats
+
+    def count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _reload(self, engine: AnalysisEngine):
+        # A single assignment: each request reads the base config once
+        self.config = engine.config
+        self.count('reloads')
+
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    """JSON request handler for AnalysisServer"""
+
+    server: AnalysisServer
+
+    def do_GET(self):
+        if self.path == '/stats':
+            self._send(200, self.server.stats())
+        else:
+            self._send(404, {'error': f"Unknown path '{self.path}'"})
+
+    def do_POST(self):
+        if self.path != '/analyze':
+            self._send(404, {'error': f"Unknown path '{self.path}'"})
+            return
+        self.server.count('requests')
+        try:
+            self._send(200, self.server.analyze(self._read_json()))
+        except RequestError as e:
+            self.server.count('errors')
+            self._send(e.status, {'error': str(e)})
+        except Exception as e:
+            # Answer the client instead of dropping the connection
+            self.server.count('errors')
+            self._send(500, {'error': f"Analysis failed: {e}"})
+
+    def log_message(self, format: str, *args):
+        # Keep per-request access logs out of the server's output
+        pass
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY_BYTES:
+            raise RequestError(413, f"Request body exceeds {MAX_BODY_BYTES} bytes")
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError as e:
+            raise RequestError(400, f"Invalid JSON: {e}")
+        if not isinstance(body, dict):
+            raise RequestError(400, "Request body must be a JSON object")
+        return body
+
+    def _send(self, status: int, payload: Dict[str, Any]):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Serve prompt analysis over HTTP")
+    parser.add_argument('--host', default='127.0.0.1', help='Address to bind (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help=f'Port to listen on (default: {DEFAULT_PORT})')
+    parser.add_argument('--config', default=os.environ.get('AI_PROMPT_CONFIG', 'config.json'),
+                        help='Base configuration file (default: $AI_PROMPT_CONFIG or config.json)')
+    parser.add_argument('--reload-interval', type=float, default=DEFAULT_RELOAD_INTERVAL,
+                        help='Seconds between checks of --config for changes, 0 to never reload '
+                             f'(default: {DEFAULT_RELOAD_INTERVAL:g})')
+    parser.add_argument('--engine-pool', type=int, default=DEFAULT_ENGINE_POOL_SIZE,
+                        help='Compiled engines to keep for distinct overlays '
+                             f'(default: {DEFAULT_ENGINE_POOL_SIZE})')
+    parser.add_argument('--deadline-ms', type=float, metavar='MS',
+                        help='Default latency budget for requests without "deadline_ms"; '
+                             'analysis degrades as needed to meet it')
+    parser.add_argument('--sink', metavar='DIR',
+                        help='Also write every result to rotating compressed JSONL files in DIR')
+    parser.add_argument('--sink-compression', choices=list(COMPRESSIONS), default='gzip',
+                        help='Compression for --sink files (default: gzip)')
+    parser.add_argument('--rotate-mb', type=float, default=DEFAULT_MAX_BYTES / (1024 * 1024),
+                        help='Start a new --sink file after this many megabytes of JSONL (default: 64)')
+    parser.add_argument('--rotate-minutes', type=float, default=DEFAULT_MAX_SECONDS / 60,
+                        help='Start a new --sink file after this many minutes (default: 60)')
+    parser.add_argument('--max-length', type=int, default=DEFAULT_MAX_PROMPT_LENGTH,
+                        help=f'Reject longer prompts with 422 (default: {DEFAULT_MAX_PROMPT_LENGTH})')
+    parser.add_argument('--rejects', metavar='PATH',
+                        help='Write rejected prompts and their reasons as JSON lines to PATH')
+    parser.add_argument('--no-validate', action='store_true',
+                        help='Analyze every prompt, including test and oversized inputs')
+    args = parser.parse_args(argv)
+    if args.rotate_mb <= 0 or args.rotate_minutes <= 0:
+        parser.error("--rotate-mb and --rotate-minutes must be positive")
+    if args.deadline_ms is not None and args.deadline_ms <= 0:
+        parser.error("--deadline-ms must be positive")
+    if args.reload_interval < 0:
+        parser.error("--reload-interval must not be negative")
+    if args.rejects and args.no_validate:
+        parser.error("--rejects requires validation (drop --no-validate)")
+
+    sink = None
+    if args.sink:
+        sink = RotatingJsonlSink(args.sink, compression=args.sink_compression,
+                                 max_bytes=int(args.rotate_mb * 1024 * 1024),
+                                 max_seconds=args.rotate_minutes * 60)
+    screen = None if args.no_validate else PromptScreen(args.max_length, args.rejects)
+    server = AnalysisServer((args.host, args.port), load_config(args.config), args.engine_pool,
+                            sink, screen, args.deadline_ms)
+    if args.reload_interval:
+        server.watch(args.config, args.reload_interval)
+    host, port = server.server_address[:2]
+    print(f"Serving prompt analysis on http://{host}:{port} (engine pool: {args.engine_pool})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down.")
+    finally:
+        if server.watcher:
+            server.watcher.stop()
+        server.server_close()
+        if sink:
+            sink.close()
+        if screen:
+            screen.close()
+
+
+if __name__ == '__main__':
+    main()
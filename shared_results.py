@@ -0,0 +1,157 @@
+"""
+Shared Results Module
+
+Transfer of analysis results from worker processes through shared
+memory. Workers write each prompt's scores, readability counts and
+feedback codes into a fixed-size record of a SharedScoreArray, indexed
+by prompt number. Only a small residue that does not fit a fixed-size
+record (sentence lengths, feedback outside the codebook) travels back
+over the pipe, next to the optimized text or its edit script.
+"""
+
+import struct
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Sequence, Tuple
+from corpus_stats import FEEDBACK_FIELDS, SCORE_CATEGORIES
+from prompt_optimizer import STRENGTHS, SUGGESTIONS, WEAKNESSES
+from utils import ReadabilityStats
+
+
+# Feedback codes are 1-based positions in these tuples; 0 ends a list
+FEEDBACK_MESSAGES = {
+    'strengths': tuple(STRENGTHS.values()),
+    'weaknesses': tuple(WEAKNESSES.values()),
+    'suggestions': tuple(message for group in SUGGESTIONS.values() for message in group)
+}
+FEEDBACK_CODES = {
+    kind: {message: code for code, message in enumerate(messages, 1)}
+    for kind, messages in FEEDBACK_MESSAGES.items()
+}
+MAX_FEEDBACK_CODES = 12
+# Marks a list that could not be encoded and is sent in the residue
+OVERFLOW = 255
+
+# Scores, readability presence and counts (words, characters, syllables,
+# paragraphs, opens_paragraph), then the feedback codes of each kind
+RECORD = struct.Struct(
+    f"<{len(SCORE_CATEGORIES)}d?4Q?{MAX_FEEDBACK_CODES * len(FEEDBACK_FIELDS)}B"
+)
+
+Residue = Tuple[Optional[Tuple[int, ...]], Optional[Dict[str, List[str]]]]
+
+
+class SharedScoreArray:
+    """
+    Fixed-size result records in a shared memory block
+
+    The parent creates the array with one record per prompt and passes
+    its ``name`` to the workers, which attach to it. The creator must
+    call ``unlink`` once the records have been read.
+    """
+
+    def __init__(self, size: int = 0, name: Optional[str] = None):
+        """
+        Args:
+            size: Number of records to allocate when creating the block
+            name: Name of an existing block to attach to instead
+        """
+        if name is None:
+            self._memory = shared_memory.SharedMemory(create=True,
+                                                      size=max(size, 1) * RECORD.size)
+        else:
+            self._memory = shared_memory.SharedMemory(name=name)
+        self.size = self._memory.size // RECORD.size
+
+    @property
+    def name(self) -> str:
+        return self._memory.name
+
+    def write(self, index: int, scores: Dict[str, float], feedback: Dict[str, Sequence[str]],
+              readability: Optional[ReadabilityStats] = None) -> Residue:
+        """
+        Store one prompt's scores, readability counts and feedback
+
+        Args:
+            index: Prompt number
+            scores: Score per category, including 'overall'
+            feedback: Feedback messages by kind (see FEEDBACK_FIELDS)
+            readability: Readability statistics, if any
+
+        Returns:
+            Residue to pass to ``read`` along with the index
+        """
+        codes = []
+        overflow = {}
+        for kind in FEEDBACK_FIELDS:
+            messages = feedback.get(kind, ())
+            encoded = [FEEDBACK_CODES[kind].get(message) for message in messages]
+            if len(encoded) > MAX_FEEDBACK_CODES or None in encoded:
+                overflow[kind] = list(messages)
+                encoded = [OVERFLOW]
+            codes.extend(encoded + [0] * (MAX_FEEDBACK_CODES - len(encoded)))
+
+        if readability is None:
+            counts = (False, 0, 0, 0, 0, False)
+        else:
+            counts = (True, readability.word_count, readability.character_count,
+                      readability.syllable_count, readability.paragraph_count,
+                      readability.opens_paragraph)
+
+        RECORD.pack_into(self._memory.buf, index * RECORD.size,
+                         *(scores[category] for category in SCORE_CATEGORIES), *counts, *codes)
+        sentence_lengths = readability.sentence_lengths if readability is not None else None
+        return sentence_lengths, overflow or None
+
+    def read(self, index: int, residue: Residue) -> Tuple[Dict[str, float], Dict[str, List[str]],
+                                                          Optional[ReadabilityStats]]:
+        """
+        Rebuild one prompt's scores, feedback and readability
+
+        Args:
+            index: Prompt number
+            residue: What ``write`` returned for the prompt
+
+        Returns:
+            Tuple of (scores, feedback, readability)
+        """
+        sentence_lengths, overflow = residue
+        values = RECORD.unpack_from(self._memory.buf, index * RECORD.size)
+        count = len(SCORE_CATEGORIES)
+        scores = dict(zip(SCORE_CATEGORIES, values[:count]))
+
+        readability = None
+        has_readability, words, characters, syllables, paragraphs, opens = values[count:count + 6]
+        if has_readability:
+            readability = ReadabilityStats(
+                word_count=words,
+                character_count=characters,
+                sentence_lengths=sentence_lengths,
+                syllable_count=syllables,
+                paragraph_count=paragraphs,
+                opens_paragraph=opens
+            )
+
+        feedback = {}
+        codes = values[count + 6:]
+        for position, kind in enumerate(FEEDBACK_FIELDS):
+            kind_codes = codes[position * MAX_FEEDBACK_CODES:(position + 1) * MAX_FEEDBACK_CODES]
+            if kind_codes[0] == OVERFLOW:
+                feedback[kind] = list(overflow[kind])
+                continue
+            messages = FEEDBACK_MESSAGES[kind]
+            feedback[kind] = [messages[code - 1] for code in kind_codes if code]
+        return scores, feedback, readability
+
+    def close(self):
+        """Detach from the shared memory block"""
+        self._memory.close()
+
+    def unlink(self):
+        """Free the shared memory block; only its creator should call this"""
+        self._memory.unlink()
+
+    def __enter__(self) -> 'SharedScoreArray':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,260 @@
+"""
+Stream Sink Module
+
+Rolling, compressed JSONL output for continuous analysis streams (the
+``--stream`` pipe mode and the server). Records are queued by the
+analysis threads; a background thread serializes and compresses them
+with gzip or lzma and starts a new file once the current one reaches a
+size or age limit. Size is counted before compression, since the
+compressors hold back output until a file is closed. Files are written
+under a ``.part`` name and renamed when finished, so readers only ever
+see complete files. Each file gets a small JSON index with its record
+count, time span and score ranges, so downstream jobs can skip files
+without decompressing them.
+"""
+
+import gzip
+import json
+import lzma
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+
+COMPRESSIONS = {'gzip': '.gz', 'lzma': '.xz'}
+DEFAULT_PREFIX = "analysis"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_SECONDS = 3600.0
+# Records buffered before the producer waits for the writer
+QUEUE_SIZE = 1024
+
+PART_SUFFIX = ".part"
+INDEX_SUFFIX = ".index.json"
+
+_STOP = object()
+
+
+class RotatingJsonlSink:
+    """
+    Writes JSON records to rotating compressed JSONL files
+
+    ``write`` only enqueues. A file is finished once the JSONL written to
+    it reaches ``max_bytes`` or it has been open for ``max_seconds``, even
+    if no further records arrive. Call ``close`` (or use the sink as a
+    context manager) to finish the current file. A writer error stops
+    the sink, and ``flush`` or ``close`` raises it.
+    """
+
+    def __init__(self, directory: str, prefix: str = DEFAULT_PREFIX, compression: str = 'gzip',
+                 max_bytes: int = DEFAULT_MAX_BYTES, max_seconds: float = DEFAULT_MAX_SECONDS):
+        """
+        Args:
+            directory: Directory for the files and their indexes
+            prefix: Start of every file name
+            compression: 'gzip' or 'lzma'
+            max_bytes: Uncompressed size at which a file is finished
+            max_seconds: Age at which a file is finished
+        """
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression '{compression}' "
+                             f"(expected one of: {', '.join(COMPRESSIONS)})")
+        if max_bytes <= 0 or max_seconds <= 0:
+            raise ValueError("Rotation size and age must be positive")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.prefix = prefix
+        self.compression = compression
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.records = 0
+        self.files: List[str] = []
+        self._file: Optional[_SinkFile] = None
+        self._sequence = 0
+        self._error: Optional[Exception] = None
+        self._queue: "queue.Queue" = queue.Queue(maxsize=QUEUE_SIZE)
+        self._thread = threading.Thread(target=self._run, name="stream-sink", daemon=True)
+        self._thread.start()
+
+    def write(self, record: Dict[str, Any]):
+        """Queue a JSON-serializable record, such as ``result_to_dict(result)``"""
+        self._queue.put(record)
+
+    def flush(self):
+        """Block until every queued record has been written"""
+        self._queue.join()
+        if self._error:
+            raise self._error
+
+    def close(self):
+        """Write any queued records, finish the current file and stop the writer"""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        if self._error:
+            raise self._error
+
+    def __enter__(self) -> 'RotatingJsonlSink':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _run(self):
+        while True:
+            timeout = None
+            if self._file is not None:
+                timeout = max(self._file.expires - time.monotonic(), 0)
+            try:
+                record = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                # The file aged out while the stream was idle
+                self._guard(self._finish)
+                continue
+            try:
+                if record is _STOP:
+                    self._guard(self._finish)
+                    return
+                # After an error keep consuming, so the producer never blocks
+                if self._error is None:
+                    self._guard(self._append, record)
+            finally:
+                self._queue.task_done()
+
+    def _guard(self, step, *args):
+        try:
+            step(*args)
+        except Exception as e:
+            self._error = e
+            if self._file is not None:
+                self._file.discard()
+                self._file = None
+
+    def _append(self, record: Dict[str, Any]):
+        if self._file is None:
+            self._file = self._open()
+        self._file.write(record)
+        self.records += 1
+        if self._file.size >= self.max_bytes or time.monotonic() >= self._file.expires:
+            self._finish()
+
+    def _open(self) -> '_SinkFile':
+        stamp = datetime.now().strftime('%Y%m%dT%H%M%S')
+        extension = COMPRESSIONS[self.compression]
+        while True:
+            self._sequence += 1
+            path = os.path.join(self.directory,
+                                f"{self.prefix}-{stamp}-{self._sequence:06d}.jsonl{extension}")
+            if not os.path.exists(path) and not os.path.exists(path + PART_SUFFIX):
+                return _SinkFile(path, self.compression, self.max_seconds)
+
+    def _finish(self):
+        if self._file is not None:
+            self._file.finish()
+            self.files.append(self._file.path)
+            self._file = None
+
+
+class _SinkFile:
+    """One compressed JSONL file being written, with its running index"""
+
+    def __init__(self, path: str, compression: str, max_seconds: float):
+        self.path = path
+        self.compression = compression
+        self.expires = time.monotonic() + max_seconds
+        self.started_at = datetime.now().isoformat()
+        self.records = 0
+        self.size = 0
+        self.scores: Dict[str, Dict[str, float]] = {}
+        self._raw = open(path + PART_SUFFIX, 'wb')
+        if compression == 'lzma':
+            self._stream = lzma.LZMAFile(self._raw, 'wb')
+        else:
+            self._stream = gzip.GzipFile(filename=os.path.basename(path)[:-3], mode='wb',
+                                         fileobj=self._raw)
+
+    def write(self, record: Dict[str, Any]):
+        line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+        self._stream.write(line)
+        self.records += 1
+        self.size += len(line)
+        for category, score in (record.get('scores') or {}).items():
+            if isinstance(score, (int, float)):
+                bounds = self.scores.get(category)
+                if bounds is None:
+                    self.scores[category] = {'min': score, 'max': score}
+                else:
+                    bounds['min'] = min(bounds['min'], score)
+                    bounds['max'] = max(bounds['max'], score)
+
+    def finish(self):
+        """Close the file, then publish its index and the file itself"""
+        self._stream.close()
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        compressed_size = self._raw.tell()
+        self._raw.close()
+        index = {
+            'file': os.path.basename(self.path),
+            'compression': self.compression,
+            'records': self.records,
+            'bytes': compressed_size,
+            'uncompressed_bytes': self.size,
+            'started_at': self.started_at,
+            'finished_at': datetime.now().isoformat(),
+            'scores': self.scores
+        }
+        # The index goes first, so every finished file already has one
+        _replace_json(self.path + INDEX_SUFFIX, index)
+        os.replace(self.path + PART_SUFFIX, self.path)
+
+    def discard(self):
+        try:
+            self._raw.close()
+            os.remove(self.path + PART_SUFFIX)
+        except OSError:
+            pass
+
+
+def _replace_json(path: str, data: Dict[str, Any]):
+    """Write JSON to a temporary file and move it into place"""
+    temporary = path + PART_SUFFIX
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    os.replace(temporary, path)
+
+
+def select_files(directory: str, category: str = 'overall', low: Optional[float] = None,
+                 high: Optional[float] = None) -> List[str]:
+    """
+    Finished files whose index says they may hold scores in [low, high]
+
+    Only the indexes are read. Files without a score for the category
+    are kept when no bounds are given.
+    """
+    selected = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(INDEX_SUFFIX):
+            continue
+        with open(os.path.join(directory, name), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        bounds = index['scores'].get(category)
+        if bounds is None:
+            if low is not None or high is not None:
+                continue
+        elif (low is not None and bounds['max'] < low) or (high is not None and bounds['min'] > high):
+            continue
+        path = os.path.join(directory, index['file'])
+        if os.path.exists(path):
+            selected.append(path)
+    return selected
+
+
+def read_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream the records of a finished file"""
+    opener = lzma.open if path.endswith(COMPRESSIONS['lzma']) else gzip.open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            yield json.loads(line)
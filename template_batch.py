@@ -0,0 +1,125 @@
+"""
+Template Batch Module
+
+Analysis of batches whose prompts are filled-in copies of a few shared
+templates. Prompts are split at segment boundaries (see
+SEGMENT_BOUNDARY_PATTERN in prompt_analyzer); segments that recur across
+the batch make up the template skeletons and are scanned once, while the
+segments holding slot values are scanned for every prompt. Features
+merge exactly at segment boundaries, so the scores are identical to
+analyzing each prompt on its own.
+"""
+
+import threading
+from collections import Counter
+from functools import reduce
+from typing import Dict, Iterable, List
+from prompt_analyzer import (
+    AnalysisMetrics, PromptAnalyzer, PromptFeatures, SEGMENT_BOUNDARY_PATTERN
+)
+
+
+DEFAULT_MIN_OCCURRENCES = 2
+
+
+def split_segments(prompt: str) -> List[str]:
+    """
+    Split a prompt after every segment boundary
+
+    Args:
+        prompt: The prompt text to split
+
+    Returns:
+        Segments whose concatenation is the prompt
+    """
+    segments = []
+    start = 0
+    for match in SEGMENT_BOUNDARY_PATTERN.finditer(prompt):
+        segments.append(prompt[start:match.end()])
+        start = match.end()
+    if start < len(prompt) or not segments:
+        segments.append(prompt[start:])
+    return segments
+
+
+class TemplateBatch:
+    """
+    Feature extraction that shares the template skeleton of a batch
+
+    Any prompt can be analyzed, including ones outside the batch; only
+    segments that occurred at least ``min_occurrences`` times in the
+    batch are reused. Each skeleton segment is scanned once; consecutive
+    skeleton segments are also cached merged, so a template's fixed text
+    usually costs one lookup per prompt.
+    """
+
+    def __init__(self, analyzer: PromptAnalyzer, prompts: Iterable[str],
+                 min_occurrences: int = DEFAULT_MIN_OCCURRENCES):
+        self.analyzer = analyzer
+        counts = Counter(segment for prompt in prompts for segment in split_segments(prompt))
+        self.skeleton = frozenset(segment for segment, count in counts.items()
+                                  if count >= min_occurrences)
+        self._segments: Dict[str, PromptFeatures] = {}
+        self._runs: Dict[str, PromptFeatures] = {}
+        self._counters = Counter({'reused_chars': 0, 'scanned_chars': 0})
+        self._lock = threading.Lock()
+
+    def analyze(self, prompt: str) -> AnalysisMetrics:
+        """Analyze a prompt, same as ``analyzer.analyze(prompt)``"""
+        return self.analyzer.build_metrics(self.extract_features(prompt))
+
+    def extract_features(self, prompt: str) -> PromptFeatures:
+        """
+        Extract a prompt's features, reusing the skeleton's
+
+        Args:
+            prompt: The prompt text to scan
+
+        Returns:
+            PromptFeatures equal to ``analyzer.extract_features(prompt)``
+        """
+        parts = []
+        reused = scanned = 0
+        run: List[str] = []
+        in_skeleton = None
+        for segment in split_segments(prompt):
+            shared = segment in self.skeleton
+            if run and shared != in_skeleton:
+                parts.append(self._run_features(run, in_skeleton))
+                run = []
+            run.append(segment)
+            in_skeleton = shared
+            if shared:
+                reused += len(segment)
+            else:
+                scanned += len(segment)
+        parts.append(self._run_features(run, in_skeleton))
+
+        with self._lock:
+            self._counters['reused_chars'] += reused
+            self._counters['scanned_chars'] += scanned
+        return reduce(PromptFeatures.merge, parts)
+
+    def counters(self) -> Dict[str, int]:
+        """Return how many characters were reused from the skeleton and scanned"""
+        with self._lock:
+            return dict(self._counters)
+
+    def _run_features(self, segments: List[str], shared: bool) -> PromptFeatures:
+        """Features of consecutive segments, cached when they are skeleton text"""
+        text = ''.join(segments)
+        if not shared:
+            return self.analyzer.extract_features(text)
+        features = self._runs.get(text)
+        if features is None:
+            # Concurrent misses compute the same value; either copy is fine
+            features = self._runs.setdefault(text, reduce(PromptFeatures.merge, (
+                self._segment_features(segment) for segment in segments)))
+        return features
+
+    def _segment_features(self, segment: str) -> PromptFeatures:
+        """Features of one skeleton segment, scanned on first use"""
+        features = self._segments.get(segment)
+        if features is None:
+            features = self._segments.setdefault(segment, self.analyzer.extract_features(segment))
+        return features
@@ -3,9 +3,45 @@
 Test script for the AI Prompt Analyzer and Optimizer
 """
 
-from prompt_analyzer import PromptAnalyzer
+import io
+import math
+import os
+import sqlite3
+import sys
+import json
+import tempfile
+import time
+import threading
+import urllib.error
+import urllib.request
+from collections import Counter
+from contextlib import redirect_stdout
+from dataclasses import replace
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from prompt_analyzer import EMPTY_READABILITY, HEADER_PATTERN, PromptAnalyzer, has_section_header
 from prompt_optimizer import PromptOptimizer
-from utils import create_sample_prompts, validate_prompt
+from main import (analyze_and_optimize_prompt, analyze_in_processes, estimate_from_file,
+                  gate_prompts, profile_rules_from_file, stream_prompts, summarize_file)
+from long_prompt import analyze_long_prompt
+from engine import ConfigWatcher, EngineCache, apply_overlay
+from deadline import DeadlinePolicy
+from prefilter import PromptScreen, ScoreGate
+from history import MAX_EDIT_SCRIPT_LENGTH, HistoryStore, connect, query_feedback, query_trend
+from edit_script import apply_edits, encode_edits
+from shared_results import SharedScoreArray
+from template_batch import TemplateBatch
+from prefix_cache import PrefixCache
+from memory_profile import MemoryProfiler
+from rule_profile import FEATURE, INDICATOR, profile_rules
+from feature_index import FeatureIndex, build_index, decode_postings, encode_postings
+from benchmark_startup import deferred_imports
+from benchmark_complexity import TIME_EXPONENT_BOUND, check_complexity, doubling_sizes
+from server import AnalysisServer
+from report_writers import ReportWriter
+from stream_sink import INDEX_SUFFIX, RotatingJsonlSink, read_records, select_files
+from corpus_stats import CorpusSummary, KLLSketch, ReservoirSampler, SampleEstimator, TopKSelector
+from utils import create_sample_prompts, load_config, validate_prompt, compute_readability, load_analysis_report, save_analysis_report, save_analysis_reports
 
 
 def test_analyzer():
@@ -43,6 +79,758 @@ def test_optimizer():
     print(f"Weaknesses: {optimization.weaknesses}")
 
 
+def test_scores_only():
+    """Test the scores-only path and lazily generated feedback"""
+    print("\nTesting Scores-Only Analysis...")
+    analyzer = PromptAnalyzer()
+    optimizer = PromptOptimizer()
+    prompt = "Write a story about a robot."
+    
+    metrics = analyzer.analyze(prompt)
+    assert callable(metrics.__dict__['_detailed_feedback'])
+    assert metrics.detailed_feedback['clarity'] == analyzer._generate_detailed_feedback(
+        analyzer.score(prompt))['clarity']
+    assert isinstance(metrics.__dict__['_detailed_feedback'], dict)
+    
+    full = analyze_and_optimize_prompt(analyzer, optimizer, prompt)
+    fast = analyze_and_optimize_prompt(analyzer, optimizer, prompt, scores_only=True)
+    print(f"Overall: {fast.overall_score:.2f}, Strengths: {fast.strengths}")
+    assert fast.overall_score == full.overall_score == analyzer.score(prompt)['overall']
+    assert not fast.strengths and fast.optimized_prompt == prompt
+
+
+def test_compact_edits():
+    """Test edit-script results and report round-trips"""
+    print("\nTesting Compact Edit Scripts...")
+    analyzer = PromptAnalyzer()
+    optimizer = PromptOptimizer()
+    
+    prompts = create_sample_prompts()
+    full = [analyze_and_optimize_prompt(analyzer, optimizer, prompt) for prompt in prompts]
+    compact = [analyze_and_optimize_prompt(analyzer, optimizer, prompt, compact=True)
+               for prompt in prompts]
+    
+    # Nothing is expanded until somebody reads optimized_prompt
+    assert all(callable(result.__dict__['_optimized_prompt']) for result in compact)
+    edits = compact[0].optimized_edits
+    print(f"Edit script: {json.dumps(edits)}")
+    assert ["role"] in edits[0]
+    assert apply_edits(prompts[0], encode_edits(prompts[0], full[0].optimized_prompt)) == full[0].optimized_prompt
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        for extension in ("json", "csv"):
+            path = os.path.join(tmp, f"report.{extension}")
+            save_analysis_report(compact, path)
+            entries = load_analysis_report(path)
+            assert [entry["optimized_prompt"] for entry in entries] == [r.optimized_prompt for r in full]
+            assert all("optimized_edits" in entry for entry in entries)
+
+    assert [r.optimized_prompt for r in compact] == [r.optimized_prompt for r in full]
+
+
+def test_edit_script_long_prompt():
+    """Test that edit scripts of long prompts are encoded quickly"""
+    print("\nTesting Edit Scripts of Long Prompts...")
+    analyzer = PromptAnalyzer()
+    optimizer = PromptOptimizer()
+    
+    sentences = ["Write it about the robot.", "Maybe include something they like,",
+                 "and explain this clearly to them.", "Use an example\n"]
+    prompt = ' '.join(sentences[i % len(sentences)] + f" Part {i}." for i in range(600))[:20000]
+    optimized = optimizer.optimize(prompt, analyzer.analyze(prompt)).optimized_prompt
+    started = time.perf_counter()
+    edits = encode_edits(prompt, optimized)
+    elapsed = time.perf_counter() - started
+    print(f"{len(prompt)} characters: {len(edits)} edits in {elapsed * 1000:.1f} ms")
+    assert apply_edits(prompt, edits) == optimized
+    assert elapsed < 0.5
+    # Pronoun rewrites in every sentence still cost less than the text itself
+    assert len(json.dumps(edits, ensure_ascii=False)) < len(json.dumps(optimized, ensure_ascii=False))
+
+
+def test_report_fanout():
+    """Test that one fan-out pass writes the same reports as separate saves"""
+    print("\nTesting Report Fan-out...")
+    analyzer = PromptAnalyzer()
+    optimizer = PromptOptimizer()
+    results = [analyze_and_optimize_prompt(analyzer, optimizer, prompt, compact=True)
+               for prompt in create_sample_prompts() * 2]
+    
+    def read(path):
+        with open(path, encoding='utf-8') as f:
+            return [line for line in f if 'enerated' not in line]
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [os.path.join(tmp, f"fanout.{ext}") for ext in ('json', 'csv', 'txt')]
+        save_analysis_reports(results, paths)
+        for path in paths:
+            single = path.replace("fanout", "single")
+            save_analysis_report(results, single)
+            assert read(path) == read(single)
+        assert ([entry["optimized_prompt"] for entry in load_analysis_report(paths[1])]
+                == [result.optimized_prompt for result in results])
+        print(f"{len(results)} results written to {len(paths)} formats in one pass")
+        
+        # A failing destination leaves no partial reports behind
+        try:
+            save_analysis_reports(results, [os.path.join(tmp, "partial.json"),
+                                            os.path.join(tmp, "missing", "report.csv")])
+            raise AssertionError("missing directory should fail")
+        except FileNotFoundError:
+            pass
+        assert not os.path.exists(os.path.join(tmp, "partial.json"))
+        
+        # A writer without _write fails when built, before opening its file
+        class Incomplete(ReportWriter):
+            pass
+        
+        try:
+            Incomplete(os.path.join(tmp, "incomplete.txt"), len(results))
+            raise AssertionError("incomplete writer should not be built")
+        except TypeError:
+            pass
+        assert not os.path.exists(os.path.join(tmp, "incomplete.txt"))
+
+
+def test_stream_sink():
+    """Test rotating compressed JSONL output with per-file indexes"""
+    print("\nTesting Stream Sink...")
+    analyzer = PromptAnalyzer()
+    optimizer = PromptOptimizer()
+    prompts = create_sample_prompts() * 3
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        for compression in ('gzip', 'lzma'):
+            directory = os.path.join(tmp, compression)
+            stream_prompts(analyzer, optimizer, lines=iter('\n\n'.join(prompts).splitlines(True)),
+                           sink_options={'directory': directory, 'compression': compression,
+                                         'max_bytes': 4096})
+            files = select_files(directory)
+            records = [record for path in files for record in read_records(path)]
+            print(f"{compression}: {len(records)} records in {len(files)} files")
+            assert len(files) > 1
+            assert [record['original_prompt'] for record in records] == prompts
+            assert not [name for name in os.listdir(directory) if name.endswith('.part')]
+            
+            # Indexes alone decide which files can hold a score range
+            with open(files[0] + INDEX_SUFFIX, encoding='utf-8') as f:
+                index = json.load(f)
+            overall = [record['scores']['overall'] for record in read_records(files[0])]
+            assert index['records'] == len(overall)
+            assert index['scores']['overall'] == {'min': min(overall), 'max': max(overall)}
+            assert select_files(directory, low=10.0) == []
+        
+        # An idle stream still finishes its file once the file ages out
+        with RotatingJsonlSink(os.path.join(tmp, "idle"), max_seconds=0.05) as sink:
+            sink.write({'scores': {'overall': 5.0}})
+            sink.flush()
+            time.sleep(0.3)
+            assert len(sink.files) == 1
+        assert len(sink.files) == 1
+
+
+def test_beam_search():
+    """Test the beam-search optimizer"""
+    print("\nTesting Beam Search Optimizer...")
+    analyzer = PromptAnalyzer()
+    optimizer = PromptOptimizer()
+    
+    test_prompt = "Help me with my project. It should be good."
+    greedy = optimizer.optimize(test_prompt, analyzer.analyze(test_prompt))
+    greedy_score = analyzer.analyze(greedy.optimized_prompt).overall_score
+    variants = optimizer.search(test_prompt, analyzer, beam_width=2, top_k=3)
+    
+    for variant in variants:
+        print(f"{variant.overall_score:.2f}: {variant.strategies}")
+    
+    assert 1 <= len(variants) <= 3
+    assert variants[0].overall_score >= greedy_score
+    assert len({v.optimized_prompt for v in variants}) == len(variants)
+
+
+def test_long_prompt():
+    """Test chunked analysis of long prompts"""
+    print("\nTesting Long Prompt Analysis...")
+    analyzer = PromptAnalyzer()
+    
+    sections = create_sample_prompts() + ["Steps:\n1. First, list it.\n- Then summarize."]
+    long_prompt = "\n\n".join(sections * 40)
+    result = analyze_long_prompt(long_prompt, analyzer, chunk_size=2000)
+    
+    print(f"Length: {len(long_prompt)}, Sections: {len(result.sections)}, "
+          f"Overall: {result.metrics.overall_score:.2f}")
+    
+    assert len(result.sections) > 1
+    assert result.metrics == analyzer.analyze(long_prompt)
+    assert result.sections[-1].end == len(long_prompt)
+
+
+def test_template_batch():
+    """Test that template-aware analysis scores exactly like plain analysis"""
+    print("\nTesting Template Batch...")
+    analyzer = PromptAnalyzer()
+    samples = create_sample_prompts()
+    template = "\n".join(samples[:3]) + "\nWrite it for {audience}.\n" + "\n".join(samples[3:])
+    prompts = [template.format(audience=audience)
+               for audience in ('children', 'a 5 person team.\nBe brief', 'it', 'experts?')]
+    prompts.append("An unrelated prompt.\nWith two segments")
+    
+    batch = TemplateBatch(analyzer, prompts)
+    for prompt in prompts:
+        assert batch.extract_features(prompt) == analyzer.extract_features(prompt)
+        assert batch.analyze(prompt).overall_score == analyzer.analyze(prompt).overall_score
+    
+    counters = batch.counters()
+    print(f"Reused {counters['reused_chars']} characters, scanned {counters['scanned_chars']}")
+    assert counters['reused_chars'] > counters['scanned_chars']
+
+
+def test_prefix_cache():
+    """Test that prefix-cached analysis scores exactly like plain analysis"""
+    print("\nTesting Prefix Cache...")
+    analyzer = PromptAnalyzer()
+    samples = create_sample_prompts()
+    preamble = "\n".join(samples[1:5]) + "\n"
+    # Questions that extend the preamble, one with a keyword right after it
+    prompts = [preamble + question for question in
+               ("Explain it.", "example: summarize?", "Step 1: list 3 risks.\nThen stop", "")]
+    prompts.append(samples[0])
+    
+    cache = PrefixCache(analyzer, max_entries=16)
+    for prompt in prompts * 2:
+        assert cache.extract_features(prompt) == analyzer.extract_features(prompt)
+    
+    counters = cache.counters()
+    print(f"Reused {counters['reused_chars']} characters, scanned {counters['scanned_chars']}")
+    assert counters['reused_chars'] > counters['scanned_chars']
+    assert len(cache) <= 16
+
+
+def test_memory_profile():
+    """Test per-stage memory tracking and result footprints"""
+    print("\nTesting Memory Profile...")
+    analyzer = PromptAnalyzer()
+    optimizer = PromptOptimizer()
+    
+    profiler = MemoryProfiler()
+    try:
+        prompts = create_sample_prompts() * 10
+        profiler.checkpoint('read')
+        results = [analyze_and_optimize_prompt(analyzer, optimizer, prompt) for prompt in prompts]
+        profiler.checkpoint('analyze')
+        profiler.measure_results(results)
+    finally:
+        profiler.stop()
+    
+    profile = json.loads(json.dumps(profiler.to_dict()))
+    print(f"Stages: {[(stage['stage'], stage['retained_bytes']) for stage in profile['stages']]}, "
+          f"per prompt: {profile['bytes_per_prompt']['results']:.0f} bytes")
+    assert [stage['stage'] for stage in profile['stages']] == ['read', 'analyze']
+    assert profile['stages'][1]['retained_bytes'] > 0
+    assert profile['result_types']['AnalysisResult']['count'] == len(results)
+    # Feedback messages are shared constants, so they are counted once
+    feedback_lists = sum(len(getattr(result, kind)) for result in results
+                         for kind in ('strengths', 'weaknesses', 'suggestions'))
+    assert profile['result_fields']['feedback'] < feedback_lists * 50
+
+
+def test_rule_profile():
+    """Test per-rule cost and match attribution"""
+    print("\nTesting Rule Profile...")
+    analyzer = PromptAnalyzer()
+    optimizer = PromptOptimizer()
+    
+    prompts = create_sample_prompts()
+    profile = profile_rules(analyzer, optimizer, prompts, repeat=1)
+    by_name = {(rule.kind, rule.rule): rule for rule in profile.rules}
+    ranked = profile.ranked()
+    print(f"Rules: {len(profile.rules)}, most expensive: {ranked[0].rule}, dead: {len(profile.dead())}")
+    
+    # Every indicator is profiled and traced back to its keyword lists
+    for pattern in analyzer.patterns:
+        rule = by_name[(INDICATOR, pattern)]
+        assert rule.owners
+        assert rule.matches == sum(1 for prompt in prompts if pattern in prompt.lower())
+    assert 'clarity_indicators.positive' in by_name[(INDICATOR, 'clearly')].owners
+    assert by_name[(FEATURE, 'question_count')].matches == sum(1 for prompt in prompts if '?' in prompt)
+    assert all(a.seconds >= b.seconds for a, b in zip(ranked, ranked[1:]))
+    assert all(rule.matches == 0 for rule in profile.dead())
+    assert json.loads(json.dumps(profile.to_dict()))['prompts'] == len(prompts)
+
+
+def test_feature_index():
+    """Test boolean queries over the inverted feature index"""
+    print("\nTesting Feature Index...")
+    analyzer = PromptAnalyzer()
+    optimizer = PromptOptimizer()
+    prompts = create_sample_prompts() + ["You are a data engineer. Return the rows as JSON.",
+                                         "Describe it so that they can use it in JSON."]
+    results = [analyze_and_optimize_prompt(analyzer, optimizer, prompt) for prompt in prompts]
+    
+    numbers = [1, 2, 130, 131, 70000]
+    assert decode_postings(encode_postings(numbers)) == numbers
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "prompts.idx")
+        build_index(analyzer, results, path)
+        index = FeatureIndex(path)
+        
+        def expected(test):
+            return [number for number, result in enumerate(results, 1) if test(result)]
+        
+        def mentions(result, keyword):
+            return keyword in result.original_prompt.lower()
+        
+        role = lambda result: any(mentions(result, keyword) for keyword in analyzer.role_keywords)
+        pronouns = "Contains ambiguous pronouns"
+        queries = {
+            'indicator:json AND NOT list:role_keywords':
+                lambda result: mentions(result, 'json') and not role(result),
+            'weakness:pronouns': lambda result: pronouns in result.weaknesses,
+            '(indicator:"you are" OR weakness:pronouns) indicator:json':
+                lambda result: (mentions(result, 'you are') or pronouns in result.weaknesses)
+                and mentions(result, 'json')
+        }
+        for query, test in queries.items():
+            matches = index.query(query)
+            print(f"{query}: {matches}")
+            assert matches == expected(test) and matches
+        
+        assert index.query('suggestion:general.1 OR NOT suggestion:general.1') == list(range(1, len(results) + 1))
+        for malformed in ('json', 'weakness:pronouns AND', '(list:role_keywords'):
+            try:
+                index.query(malformed)
+                raise AssertionError(f"'{malformed}' should be rejected")
+            except ValueError:
+                pass
+
+
+def test_thread_safety():
+    """Stress test a shared analyzer and optimizer across threads"""
+    gil_enabled = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print(f"\nTesting Thread Safety (GIL {'enabled' if gil_enabled else 'disabled'})...")
+    analyzer = PromptAnalyzer()
+    optimizer = PromptOptimizer()
+    
+    prompts = create_sample_prompts() * 20
+    
+    def run(prompt):
+        analysis = analyzer.analyze(prompt)
+        return analysis, optimizer.optimize(prompt, analysis)
+    
+    expected = [run(prompt) for prompt in prompts]
+    
+    # Switch threads as often as possible to surface races under the GIL too
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            actual = list(executor.map(run, prompts))
+    finally:
+        sys.setswitchinterval(interval)
+    
+    assert actual == expected
+    
+    try:
+        analyzer.clarity_indicators = {}
+        raise AssertionError("analyzer should be immutable")
+    except AttributeError:
+        pass
+    print(f"{len(prompts)} prompts analyzed concurrently with identical results")
+
+
+def test_shared_results():
+    """Test result transfer from worker processes through shared memory"""
+    print("\nTesting Shared Memory Results...")
+    analyzer = PromptAnalyzer()
+    optimizer = PromptOptimizer()
+    prompts = create_sample_prompts() * 3
+    
+    expected = [analyze_and_optimize_prompt(analyzer, optimizer, prompt) for prompt in prompts]
+    actual = analyze_in_processes(analyzer, optimizer, prompts, 2, {})
+    assert [vars(result) for result in actual] == [vars(result) for result in expected]
+    print(f"{len(prompts)} prompts analyzed on 2 processes with identical results")
+    
+    compact = analyze_in_processes(analyzer, optimizer, prompts, 2, {'compact': True})
+    assert [result.optimized_prompt for result in compact] == [result.optimized_prompt for result in expected]
+    
+    # Feedback outside the codebook travels in the residue instead
+    scores = {category: 5.0 for category in ('overall', 'clarity', 'specificity',
+                                             'structure', 'context', 'creativity')}
+    feedback = {'strengths': ['Custom strength'], 'weaknesses': [], 'suggestions': expected[0].suggestions}
+    with SharedScoreArray(2) as array:
+        try:
+            residue = array.write(1, scores, feedback, expected[0].readability)
+            assert residue[1] == {'strengths': ['Custom strength']}
+            assert array.read(1, residue) == (scores, feedback, expected[0].readability)
+        finally:
+            array.unlink()
+
+
+def test_config_reload():
+    """Test hot-reloading the configuration"""
+    print("\nTesting Config Reload...")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = os.path.join(tmp, "config.json")
+        
+        def write_config(creativity_weight, mtime):
+            with open(config_path, 'w', encoding='utf-8') as f:
+                json.dump({"scoring_weights": {"creativity": creativity_weight}}, f)
+            os.utime(config_path, (mtime, mtime))
+        
+        write_config(1.0, 1000)
+        watcher = ConfigWatcher(config_path, cache=EngineCache(max_size=2))
+        original = watcher.engine
+        
+        write_config(0.0, 2000)
+        assert watcher.check()
+        reweighted = watcher.engine
+        assert reweighted is not original
+        assert reweighted.analyzer.scoring_weights['creativity'] == 0.0
+        
+        # Switching back reuses the cached engine
+        write_config(1.0, 3000)
+        assert watcher.check()
+        assert watcher.engine is original
+        assert not watcher.check()
+        
+        # A half-written file keeps the current engine and is retried
+        with open(config_path, 'w', encoding='utf-8') as f:
+            f.write('{"scoring_weights": {"creativity": ')
+        os.utime(config_path, (4000, 4000))
+        try:
+            watcher.check()
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("invalid config was loaded")
+        assert watcher.engine is original
+        # The same bad file is reported once, not on every poll
+        assert not watcher.check()
+        write_config(0.0, 4000)
+        assert watcher.check()
+        assert watcher.engine is reweighted
+        
+        prompt = "Write a story about a robot."
+        print(f"Default: {original.analyzer.analyze(prompt).overall_score:.2f}, "
+              f"Reweighted: {reweighted.analyzer.analyze(prompt).overall_score:.2f}")
+
+
+def test_server_overlays():
+    """Test per-request config overlays served from a shared engine pool"""
+    print("\nTesting Server Config Overlays...")
+    server = AnalysisServer(('127.0.0.1', 0), load_config("missing.json"), pool_size=2,
+                            screen=PromptScreen())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    
+    def post(body):
+        request = urllib.request.Request(url + "/analyze", data=json.dumps(body).encode('utf-8'),
+                                         headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, json.load(response)
+        except urllib.error.HTTPError as e:
+            return e.code, json.load(e)
+    
+    try:
+        prompt = "Write a story about a robot."
+        overlay = {"scoring_weights": {"creativity": 0.0}}
+        status, base = post({"prompt": prompt})
+        assert status == 200
+        for _ in range(3):
+            status, reweighted = post({"prompt": prompt, "config": overlay})
+            assert status == 200
+        expected = analyze_and_optimize_prompt(PromptAnalyzer(scoring_weights={"creativity": 0.0}),
+                                               PromptOptimizer(), prompt)
+        print(f"Default: {base['result']['scores']['overall']:.2f}, "
+              f"Overlay: {reweighted['result']['scores']['overall']:.2f}")
+        assert reweighted['engine'] != base['engine']
+        assert reweighted['result']['scores']['overall'] == expected.overall_score
+        
+        assert post({"prompt": prompt, "config": {"history_path": "x.db"}})[0] == 400
+        for settings in ({"beam_width": 1.5}, {"beam_width": 0}, {"search_time_budget": -1},
+                         {"max_optimizations_per_category": True}, {"beam_with": 2}):
+            status, error = post({"prompt": prompt, "search": "beam",
+                                  "config": {"optimization_settings": settings}})
+            assert status == 400 and 'optimization_settings' in error['error']
+        assert post({"prompt": ""})[0] == 400
+        assert post({"prompt": "hello"}) == (422, {'error': validate_prompt("hello")[1]})
+        
+        with urllib.request.urlopen(url + "/stats") as response:
+            stats = json.load(response)
+        print(f"Stats: {stats}")
+        assert stats['misses'] == 2 and stats['hits'] == 3 and stats['engines'] == 2
+        assert stats['errors'] == 8
+        assert sum(stats['rejected'].values()) == 1
+        
+        # A changed config file becomes the base for later requests
+        with tempfile.TemporaryDirectory() as tmp:
+            config_path = os.path.join(tmp, "config.json")
+            config = load_config("missing.json")
+            with open(config_path, 'w', encoding='utf-8') as f:
+                json.dump(config, f)
+            watcher = server.watch(config_path, interval=60)
+            try:
+                assert post({"prompt": prompt})[1]['engine'] == base['engine']
+                with open(config_path, 'w', encoding='utf-8') as f:
+                    json.dump(apply_overlay(config, overlay), f)
+                os.utime(config_path, (2000, 2000))
+                assert watcher.check()
+                status, reloaded = post({"prompt": prompt})
+                assert status == 200 and reloaded['engine'] == reweighted['engine']
+                assert server.stats()['reloads'] == 1
+            finally:
+                watcher.stop()
+        
+        # An expired deadline degrades the answer instead of delaying it
+        status, degraded = post({"prompt": prompt, "deadline_ms": 1e-9})
+        assert status == 200 and degraded['result']['degraded'] == 'approximate'
+        assert post({"prompt": prompt, "deadline_ms": 60000})[1]['result'].get('degraded') is None
+        assert post({"prompt": prompt, "deadline_ms": "soon"})[0] == 400
+        assert server.stats()['degraded']['approximate'] == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_deadline_degradation():
+    """Test graceful degradation under a latency budget"""
+    print("\nTesting Deadline Degradation...")
+    analyzer = PromptAnalyzer()
+    optimizer = PromptOptimizer()
+    prompt = "Write a story about a robot."
+    
+    generous = {'budget': 10.0, 'policy': DeadlinePolicy()}
+    result = analyze_and_optimize_prompt(analyzer, optimizer, prompt, deadline_options=generous)
+    assert result.degraded is None
+    assert result == analyze_and_optimize_prompt(analyzer, optimizer, prompt)
+    
+    expired = {'budget': 0.0, 'policy': DeadlinePolicy()}
+    long_prompt = "\n\n".join(create_sample_prompts() * 50)
+    approximate = analyze_and_optimize_prompt(analyzer, optimizer, long_prompt,
+                                              deadline_options=expired)
+    assert approximate.degraded == 'approximate'
+    assert not approximate.strengths and approximate.optimized_prompt == long_prompt
+    
+    counters = expired['policy'].counters()
+    print(f"Generous: {generous['policy'].counters()}, Expired: {counters}")
+    assert counters['approximate'] == 1 and counters['full'] == 0
+
+
+def test_score_gate():
+    """Test that prefilter gating agrees with full analysis"""
+    print("\nTesting Score Gate...")
+    analyzer = PromptAnalyzer()
+    
+    prompts = create_sample_prompts() + [
+        "Help me with my project.",
+        "As an expert, list 5 steps:\n1. Plan\n2. Build\nFor example, a JSON table.",
+        " ".join(["This sentence keeps going without any end"] * 10)
+    ]
+    for category in ('overall', 'clarity', 'structure'):
+        for threshold in (4.0, 4.6, 5.0, 6.0):
+            gate = ScoreGate(analyzer, threshold, category)
+            for prompt in prompts:
+                score = analyzer.score_features(analyzer.extract_features(prompt))[category]
+                lower, upper = analyzer.score_bounds(prompt)
+                assert lower[category] <= score <= upper[category]
+                assert gate.passes(prompt) == (score >= threshold)
+    
+    # Skipping the readability pass changes nothing else
+    for prompt in prompts:
+        features = analyzer.extract_features(prompt)
+        assert analyzer.extract_features(prompt, readability=False) == \
+            replace(features, readability=EMPTY_READABILITY)
+    
+    counters = gate.counters()
+    print(f"Decided by tier: {counters}")
+    assert counters['prefilter'] > 0
+
+
+def test_top_k_selection():
+    """Test streaming top-k selection against a full sort"""
+    print("\nTesting Top-K Selection...")
+    analyzer = PromptAnalyzer()
+    
+    analyses = [analyzer.analyze(prompt) for prompt in create_sample_prompts() * 3]
+    selector = TopKSelector(4, 'specificity')
+    for index, analysis in enumerate(analyses, 1):
+        selector.add(index, analysis)
+    
+    ranked = sorted(enumerate(analyses, 1), key=lambda item: (item[1].specificity_score, item[0]))
+    expected_worst = [index for index, _ in ranked[:4]]
+    expected_best = [index for index, _ in sorted(ranked, key=lambda item: (-item[1].specificity_score, item[0]))[:4]]
+    
+    print(f"Worst: {[index for index, _, _ in selector.worst()]}, Best: {[index for index, _, _ in selector.best()]}")
+    assert [index for index, _, _ in selector.worst()] == expected_worst
+    assert [index for index, _, _ in selector.best()] == expected_best
+
+
+def test_corpus_summary():
+    """Test merging and serializing corpus summaries"""
+    print("\nTesting Corpus Summary...")
+    analyzer = PromptAnalyzer()
+    optimizer = PromptOptimizer()
+    
+    results = [analyze_and_optimize_prompt(analyzer, optimizer, prompt)
+               for prompt in create_sample_prompts() * 4]
+    
+    whole = CorpusSummary()
+    shards = [CorpusSummary(), CorpusSummary()]
+    for i, result in enumerate(results):
+        whole.add(result)
+        shards[i % 2].add(result)
+    
+    # Round-trip one shard through JSON before rolling up
+    restored = CorpusSummary.from_dict(json.loads(json.dumps(shards[1].to_dict())))
+    merged = shards[0].merge(restored)
+    
+    scores = [result.overall_score for result in results]
+    mean = sum(scores) / len(scores)
+    print(f"Count: {merged.count}, Mean: {merged.stats['overall'].mean:.2f}, "
+          f"Median: {merged.quantiles('overall')['p50']:.2f}")
+    assert merged.count == whole.count == len(results)
+    assert abs(merged.stats['overall'].mean - mean) < 1e-9
+    assert abs(merged.stats['overall'].variance - whole.stats['overall'].variance) < 1e-9
+    assert merged.feedback == whole.feedback
+    
+    sketch = KLLSketch(k=50, seed=1)
+    for value in range(10000):
+        sketch.update(value)
+    assert abs(sketch.quantile(0.5) - 5000) < 500
+    assert sum(len(items) for items in sketch.compactors) < 200
+
+
+def test_sample_estimation():
+    """Test reservoir sampling and confidence intervals"""
+    print("\nTesting Sample Estimation...")
+    
+    class Scored:
+        def __init__(self, value):
+            self.overall_score = value
+    
+    population = [Scored(i % 11) for i in range(5000)]
+    sampler = ReservoirSampler(500, seed=7)
+    for item in population:
+        sampler.add(item)
+    sample = sampler.sample()
+    assert sampler.seen == len(population) and len(sample) == 500
+    
+    estimator = SampleEstimator(population=len(population), categories=('overall',))
+    for item in sample:
+        estimator.add(item)
+        if estimator.converged(0.5):
+            break
+    estimate = estimator.estimates()['overall']
+    value, low, high = estimate.quantiles['p50']
+    print(f"Sampled {estimator.count}: {estimate.mean:.2f} +/- {estimate.margin:.2f}, "
+          f"median {value} [{low}, {high}]")
+    assert estimator.count < 500
+    assert estimate.margin <= 0.5
+    assert abs(estimate.mean - 5.0) <= 3 * estimate.margin
+    assert low <= value <= high
+    
+    # Nothing sampled: no intervals, and the CLI stops with an error
+    empty = SampleEstimator(categories=('overall',)).estimates()['overall']
+    assert all(math.isnan(bound) for bound in empty.quantiles['p50'])
+    with tempfile.TemporaryDirectory() as tmp:
+        prompts_path = os.path.join(tmp, "rejected.txt")
+        with open(prompts_path, 'w', encoding='utf-8') as f:
+            f.write("test\n\nHi\n")
+        try:
+            estimate_from_file(PromptAnalyzer(), PromptOptimizer(), file_path=prompts_path,
+                               screen=PromptScreen())
+        except SystemExit as e:
+            assert e.code == 1
+        else:
+            raise AssertionError("estimate_from_file accepted a file without valid prompts")
+
+
+def test_history_store():
+    """Test batched history writes and trend queries"""
+    print("\nTesting History Store...")
+    analyzer = PromptAnalyzer()
+    optimizer = PromptOptimizer()
+    
+    results = [analyze_and_optimize_prompt(analyzer, optimizer, prompt)
+               for prompt in create_sample_prompts()]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "history.db")
+        with HistoryStore(path, batch_size=4) as history:
+            for day, result in enumerate(results):
+                history.record(result, created_at=1700000000 + day * 86400)
+        
+        connection = connect(path)
+        trend = query_trend(connection, 'day')
+        top_weakness = query_feedback(connection, 'weaknesses', limit=1)
+        edits = connection.execute("SELECT optimized_edits FROM analyses WHERE id = 1").fetchone()[0]
+        connection.close()
+        
+        # Readers never create a database at a wrong path
+        missing = os.path.join(tmp, "missing.db")
+        try:
+            connect(missing, read_only=True)
+            raise AssertionError("opened a missing database")
+        except sqlite3.OperationalError:
+            pass
+        assert not os.path.exists(missing)
+        
+        # Summary workers record their results as the serial path does
+        prompts_path = os.path.join(tmp, "prompts.txt")
+        with open(prompts_path, 'w', encoding='utf-8') as f:
+            f.write('\n\n'.join(create_sample_prompts()))
+        worker_path = os.path.join(tmp, "workers.db")
+        long_result = analyze_and_optimize_prompt(analyzer, optimizer,
+                                                  "Write a story. " * (MAX_EDIT_SCRIPT_LENGTH // 10))
+        with HistoryStore(worker_path) as worker_history:
+            summarize_file(analyzer, optimizer, file_path=prompts_path, workers=2,
+                           history=worker_history)
+            worker_history.record(long_result)
+        connection = connect(worker_path)
+        worker_rows = connection.execute("SELECT COUNT(*) FROM analyses").fetchone()[0] - 1
+        long_edits = json.loads(connection.execute(
+            "SELECT optimized_edits FROM analyses ORDER BY id DESC LIMIT 1").fetchone()[0])
+        connection.close()
+    
+    print(f"Days: {len(trend)}, Top weakness: {top_weakness}, Worker rows: {worker_rows}")
+    assert worker_rows == len(results)
+    # Buckets are local dates, like --since/--until
+    assert trend[0][0] == datetime.fromtimestamp(1700000000).strftime('%Y-%m-%d')
+    assert [row[1] for row in trend] == [1] * len(results)
+    assert abs(trend[0][2] - results[0].overall_score) < 1e-9
+    weakness_counts = Counter(weakness for result in results for weakness in set(result.weaknesses))
+    assert top_weakness[0][1] == weakness_counts.most_common(1)[0][1]
+    assert apply_edits(results[0].original_prompt, json.loads(edits)) == results[0].optimized_prompt
+    # Long prompts skip diffing and replace the whole prompt
+    assert len(long_edits) <= 1
+    assert apply_edits(long_result.original_prompt, long_edits) == long_result.optimized_prompt
+
+
+def test_lazy_imports():
+    """Test that a plain CLI run leaves mode-specific modules unimported"""
+    print("\nTesting Lazy Imports...")
+    leaked = deferred_imports()
+    print(f"Deferred modules imported by main: {leaked or 'none'}")
+    
+    assert leaked == []
+
+
+def test_complexity_bounds():
+    """Test that adversarial inputs scale linearly"""
+    print("\nTesting Complexity Bounds...")
+    for text in ("Title:\nbody", "Intro\nmore text:", "Intro. more:", "a\nTitle:", "Title:x\n", ""):
+        assert has_section_header(text) == (HEADER_PATTERN.search(text) is not None)
+    
+    rows = check_complexity(['blank_lines', 'title_lines'], ['extract_features'],
+                            doubling_sizes(2000, 16000))
+    for row in rows:
+        print(f"{row['family']}: time n^{row['time_exponent']:.2f}")
+        assert row['time_exponent'] <= TIME_EXPONENT_BOUND
+
+
 def test_validation():
     """Test prompt validation"""
     print("\nTesting Prompt Validation...")
@@ -60,8 +848,96 @@ def test_validation():
         print(f"{description}: {'Valid' if is_valid else f'Invalid - {error}'}")
 
 
+def test_prompt_screen():
+    """Test early rejection of invalid prompts with a rejects file"""
+    print("\nTesting Prompt Screen...")
+    analyzer = PromptAnalyzer()
+    optimizer = PromptOptimizer()
+    prompts = ["Write a story about a robot.", "test", " Hi ", "a" * 11000,
+               "Explain the water cycle for a ten-year-old."]
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        rejects_path = os.path.join(tmp, "rejects.jsonl")
+        screen = PromptScreen(rejects_path=rejects_path)
+        lines = iter('\n\n'.join(prompts).splitlines(True))
+        stream_prompts(analyzer, optimizer, lines=lines, sink_options={'directory': tmp},
+                       screen=screen)
+        screen.close()
+        with open(rejects_path, encoding='utf-8') as f:
+            rejects = [json.loads(line) for line in f]
+        records = [record for path in select_files(tmp) for record in read_records(path)]
+    
+    print(f"Accepted: {screen.accepted}, rejected: {screen.reasons()}")
+    assert [record['original_prompt'] for record in records] == [prompts[0], prompts[4]]
+    assert [(reject['number'], reject['prompt']) for reject in rejects] == [
+        (2, "test"), (3, "Hi"), (4, "a" * 11000)]
+    assert screen.reasons() == {validate_prompt(prompt)[1]: 1 for prompt in prompts[1:4]}
+    
+    # Gating and rule profiling see only the accepted prompts too
+    with tempfile.TemporaryDirectory() as tmp:
+        prompts_path = os.path.join(tmp, "prompts.txt")
+        with open(prompts_path, 'w', encoding='utf-8') as f:
+            f.write('\n\n'.join(prompts))
+        gate_screen = PromptScreen()
+        gate_output = io.StringIO()
+        with redirect_stdout(gate_output):
+            gate_prompts(ScoreGate(analyzer, 0.0), file_path=prompts_path, screen=gate_screen)
+        profile_screen = PromptScreen()
+        profile_path = os.path.join(tmp, "rules.json")
+        profile_rules_from_file(analyzer, optimizer, file_path=prompts_path,
+                                output_path=profile_path, screen=profile_screen)
+        with open(profile_path, encoding='utf-8') as f:
+            profiled = json.load(f)['prompts']
+    assert "2/2 prompts reach" in gate_output.getvalue()
+    assert gate_screen.rejected == profile_screen.rejected == 3
+    assert profiled == 2
+    # Chunked analysis takes long prompts, so the length limit can be lifted
+    assert PromptScreen(max_length=None).check("a" * 11000) == ''
+
+
+def test_readability():
+    """Test the single-pass readability statistics"""
+    print("\nTesting Readability Stats...")
+    
+    text = "Write a story. Use e.g. dialogue!\n\nKeep it short"
+    stats = compute_readability(text)
+    print(f"Words: {stats.word_count}, Sentences: {stats.sentence_count}, "
+          f"Paragraphs: {stats.paragraph_count}, Flesch: {stats.flesch_reading_ease:.1f}")
+    
+    assert stats.word_count == len(text.split())
+    assert stats.sentence_lengths == (3, 2, 1, 1, 3)
+    assert stats.paragraph_count == 2
+    assert compute_readability("").sentence_count == 0
+
+
 if __name__ == "__main__":
     test_analyzer()
     test_optimizer()
+    test_scores_only()
+    test_compact_edits()
+    test_edit_script_long_prompt()
+    test_report_fanout()
+    test_stream_sink()
+    test_beam_search()
+    test_long_prompt()
+    test_template_batch()
+    test_prefix_cache()
+    test_memory_profile()
+    test_rule_profile()
+    test_feature_index()
+    test_thread_safety()
+    test_shared_results()
+    test_config_reload()
+    test_server_overlays()
+    test_deadline_degradation()
+    test_score_gate()
+    test_top_k_selection()
+    test_corpus_summary()
+    test_sample_estimation()
+    test_history_store()
+    test_lazy_imports()
+    test_complexity_bounds()
     test_validation()
+    test_prompt_screen()
+    test_readability()
     print("\nAll tests completed!")
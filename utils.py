@@ -2,19 +2,44 @@
 Utility functions for the AI Prompt Analyzer and Optimizer
 """
 
+import os
+import re
 import json
-import csv
-from datetime import datetime
-from typing import List, Dict, Any
-from pathlib import Path
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 
+# Report formats (csv, datetime) are imported by the report functions
+# themselves, so plain CLI runs do not pay for them at startup
 
-def load_config(config_path: str = "config.json") -> Dict[str, Any]:
+
+_SENTENCE_TOKEN_RE = re.compile(r'[.!?]+|[^.!?]+')
+_VOWEL_GROUP_RE = re.compile(r'[aeiouy]+')
+_NON_ALPHA_RE = re.compile(r'[^a-z]')
+
+DEFAULT_MAX_PROMPT_LENGTH = 10000
+MIN_PROMPT_LENGTH = 3
+# Inputs that look like someone testing the tool rather than a prompt
+TEST_INPUTS = frozenset({'test', 'hello', 'hi', '123'})
+_LONGEST_TEST_INPUT = max(len(text) for text in TEST_INPUTS)
+
+SENTENCE_LENGTH_BUCKETS = [
+    ("1-10", 10),
+    ("11-20", 20),
+    ("21-30", 30),
+    ("31+", float('inf'))
+]
+
+
+def load_config(config_path: str = "config.json", strict: bool = False) -> Dict[str, Any]:
     """
     Load configuration from JSON file
     
     Args:
         config_path: Path to configuration file
+        strict: Raise on a missing or invalid file instead of falling
+            back to the default configuration
         
     Returns:
         Configuration dictionary
@@ -22,6 +47,7 @@ def load_config(config_path: str = "config.json") -> Dict[str, Any]:
     default_config = {
         "output_format": "text",
         "save_history": True,
+        "history_path": "history.db",
         "verbose": False,
         "scoring_weights": {
             "clarity": 1.0,
@@ -29,6 +55,17 @@ def load_config(config_path: str = "config.json") -> Dict[str, Any]:
             "structure": 1.0,
             "context": 1.0,
             "creativity": 1.0
+        },
+        "thresholds": {
+            "excellent": 8.0,
+            "good": 6.0,
+            "needs_improvement": 4.0
+        },
+        "optimization_settings": {
+            "max_optimizations_per_category": 3,
+            "preserve_original_intent": True,
+            "add_structure_headers": True,
+            "enhance_creativity": True
         }
     }
     
@@ -37,8 +74,12 @@ def load_config(config_path: str = "config.json") -> Dict[str, Any]:
             config = json.load(f)
         return {**default_config, **config}
     except FileNotFoundError:
+        if strict:
+            raise
         return default_config
     except json.JSONDecodeError:
+        if strict:
+            raise
         print(f"Warning: Invalid JSON in {config_path}, using default configuration")
         return default_config
 
@@ -52,148 +93,200 @@ def save_analysis_report(results, output_path: str, format_type: str = "auto"):
         output_path: Path to save the report
         format_type: Output format ('json', 'csv', 'txt', or 'auto')
     """
+    save_analysis_reports(results, [output_path], format_type)
+
+
+def save_analysis_reports(results, output_paths: List[str], format_type: str = "auto"):
+    """
+    Save analysis results to several files in one pass
+    
+    Args:
+        results: List of AnalysisResult objects
+        output_paths: Paths to save reports to; with 'auto' each path's
+            extension selects its format
+        format_type: Output format ('json', 'csv', 'txt', or 'auto')
+    """
+    # Imported here: report_writers builds on this module
+    from report_writers import ReportFanout
+    
+    with ReportFanout(output_paths, len(results), threads=len(output_paths) > 1,
+                      format_type=format_type) as fanout:
+        fanout.write_all(results)
+
+
+def load_analysis_report(input_path: str, format_type: str = "auto") -> List[Dict[str, Any]]:
+    """
+    Load a JSON or CSV report written by save_analysis_report
+    
+    Optimized prompts stored as edit scripts are expanded, so every
+    entry has an ``optimized_prompt``.
+    
+    Args:
+        input_path: Path of the report
+        format_type: Report format ('json', 'csv' or 'auto')
+        
+    Returns:
+        List of entries shaped like the JSON report's results
+    """
+    # Imported here: edit_script depends on the optimizer, which imports utils
+    import csv
+    from edit_script import apply_edits
+    
     if format_type == "auto":
-        format_type = Path(output_path).suffix.lower()
-        if format_type == ".json":
-            format_type = "json"
-        elif format_type == ".csv":
-            format_type = "csv"
-        else:
-            format_type = "txt"
+        format_type = os.path.splitext(input_path)[1].lower().lstrip('.')
     
     if format_type == "json":
-        _save_json_report(results, output_path)
+        with open(input_path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)["results"]
     elif format_type == "csv":
-        _save_csv_report(results, output_path)
+        with open(input_path, 'r', newline='', encoding='utf-8') as f:
+            entries = [_csv_row_to_entry(row) for row in csv.DictReader(f)]
     else:
-        _save_text_report(results, output_path)
+        raise ValueError(f"Cannot read '{format_type}' reports; use JSON or CSV")
+    
+    for entry in entries:
+        if entry.get("optimized_edits") is not None:
+            entry["optimized_prompt"] = apply_edits(entry["original_prompt"], entry["optimized_edits"])
+    return entries
 
 
-def _save_json_report(results, output_path: str):
-    """Save results as JSON"""
-    json_data = {
-        "generated_at": datetime.now().isoformat(),
-        "results": []
+def _csv_row_to_entry(row: Dict[str, str]) -> Dict[str, Any]:
+    """Convert a CSV report row to the JSON report's entry shape"""
+    entry = {
+        "original_prompt": row["original_prompt"],
+        "optimized_prompt": row["optimized_prompt"],
+        "scores": {
+            category: float(row[f"{category}_score"])
+            for category in ("overall", "clarity", "specificity", "structure", "context", "creativity")
+        },
+        "feedback": {
+            kind: row[kind].split('; ') if row[kind] else []
+            for kind in ("strengths", "weaknesses", "suggestions")
+        }
     }
-    
-    for result in results:
-        json_data["results"].append({
-            "original_prompt": result.original_prompt,
-            "optimized_prompt": result.optimized_prompt,
-            "scores": {
-                "overall": result.overall_score,
-                "clarity": result.clarity_score,
-                "specificity": result.specificity_score,
-                "structure": result.structure_score,
-                "context": result.context_score,
-                "creativity": result.creativity_score
-            },
-            "feedback": {
-                "strengths": result.strengths,
-                "weaknesses": result.weaknesses,
-                "suggestions": result.suggestions
+    if row.get("optimized_edits"):
+        entry["optimized_edits"] = json.loads(row["optimized_edits"])
+    return entry
+
+
+def result_to_dict(result) -> Dict[str, Any]:
+    """
+    Convert an analysis result to the JSON report's entry format
+
+    Args:
+        result: AnalysisResult to convert
+
+    Returns:
+        Dictionary of JSON-serializable values
+    """
+    entry = {"original_prompt": result.original_prompt}
+    optimized_edits = getattr(result, 'optimized_edits', None)
+    if optimized_edits is not None:
+        entry["optimized_edits"] = optimized_edits
+    else:
+        entry["optimized_prompt"] = result.optimized_prompt
+    entry.update({
+        "scores": {
+            "overall": result.overall_score,
+            "clarity": result.clarity_score,
+            "specificity": result.specificity_score,
+            "structure": result.structure_score,
+            "context": result.context_score,
+            "creativity": result.creativity_score
+        },
+        "feedback": {
+            "strengths": result.strengths,
+            "weaknesses": result.weaknesses,
+            "suggestions": result.suggestions
+        }
+    })
+    readability = getattr(result, 'readability', None)
+    if readability is not None:
+        entry["readability"] = readability.to_dict()
+    sections = getattr(result, 'sections', None)
+    if sections:
+        entry["sections"] = [
+            {
+                "start": section.start,
+                "end": section.end,
+                "start_line": section.start_line,
+                "scores": section.scores
             }
-        })
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(json_data, f, indent=2, ensure_ascii=False)
+            for section in sections
+        ]
+    degraded = getattr(result, 'degraded', None)
+    if degraded:
+        entry["degraded"] = degraded
+    variants = getattr(result, 'variants', None)
+    if variants:
+        entry["variants"] = [
+            {
+                "optimized_prompt": variant.optimized_prompt,
+                "overall_score": variant.overall_score,
+                "strategies": variant.strategies
+            }
+            for variant in variants
+        ]
+    return entry
 
 
-def _save_csv_report(results, output_path: str):
-    """Save results as CSV"""
-    fieldnames = [
-        'original_prompt', 'optimized_prompt', 'overall_score',
-        'clarity_score', 'specificity_score', 'structure_score',
-        'context_score', 'creativity_score', 'strengths',
-        'weaknesses', 'suggestions'
-    ]
-    
-    with open(output_path, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        
-        for result in results:
-            writer.writerow({
-                'original_prompt': result.original_prompt,
-                'optimized_prompt': result.optimized_prompt,
-                'overall_score': result.overall_score,
-                'clarity_score': result.clarity_score,
-                'specificity_score': result.specificity_score,
-                'structure_score': result.structure_score,
-                'context_score': result.context_score,
-                'creativity_score': result.creativity_score,
-                'strengths': '; '.join(result.strengths),
-                'weaknesses': '; '.join(result.weaknesses),
-                'suggestions': '; '.join(result.suggestions)
-            })
-
-
-def _save_text_report(results, output_path: str):
-    """Save results as formatted text"""
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write("AI PROMPT ANALYSIS REPORT\n")
-        f.write("=" * 50 + "\n")
-        f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"Total Prompts Analyzed: {len(results)}\n\n")
-        
-        for i, result in enumerate(results, 1):
-            f.write(f"ANALYSIS {i}\n")
-            f.write("-" * 20 + "\n\n")
-            
-            f.write("ORIGINAL PROMPT:\n")
-            f.write(f"{result.original_prompt}\n\n")
-            
-            f.write("OPTIMIZED PROMPT:\n")
-            f.write(f"{result.optimized_prompt}\n\n")
-            
-            f.write("SCORES:\n")
-            f.write(f"Overall: {result.overall_score:.1f}/10\n")
-            f.write(f"Clarity: {result.clarity_score:.1f}/10\n")
-            f.write(f"Specificity: {result.specificity_score:.1f}/10\n")
-            f.write(f"Structure: {result.structure_score:.1f}/10\n")
-            f.write(f"Context: {result.context_score:.1f}/10\n")
-            f.write(f"Creativity: {result.creativity_score:.1f}/10\n\n")
-            
-            f.write("STRENGTHS:\n")
-            for strength in result.strengths:
-                f.write(f"• {strength}\n")
-            f.write("\n")
-            
-            f.write("WEAKNESSES:\n")
-            for weakness in result.weaknesses:
-                f.write(f"• {weakness}\n")
-            f.write("\n")
-            
-            f.write("SUGGESTIONS:\n")
-            for suggestion in result.suggestions:
-                f.write(f"• {suggestion}\n")
-            f.write("\n")
-            
-            if i < len(results):
-                f.write("=" * 50 + "\n\n")
-
-
-def validate_prompt(prompt: str) -> tuple[bool, str]:
+def iter_prompts(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Stream prompts separated by blank lines
+
+    Yields the same prompts as splitting the whole text on double
+    newlines, without holding more than one prompt in memory.
+
+    Args:
+        lines: Lines of text, e.g. an open file
+
+    Yields:
+        Stripped, non-empty prompts
+    """
+    buffer = []
+    for line in lines:
+        if line in ('\n', ''):
+            prompt = ''.join(buffer).strip()
+            buffer = []
+            if prompt:
+                yield prompt
+        else:
+            buffer.append(line)
+    prompt = ''.join(buffer).strip()
+    if prompt:
+        yield prompt
+
+
+def validate_prompt(prompt: str,
+                    max_length: Optional[int] = DEFAULT_MAX_PROMPT_LENGTH) -> tuple[bool, str]:
     """
     Validate a prompt before analysis
     
+    Runs ahead of the analyzer on every prompt, so it copies nothing
+    for ordinary input: the prompt is stripped only when it has
+    surrounding whitespace, and lowercased only when it is as short as
+    a test input.
+    
     Args:
         prompt: The prompt to validate
+        max_length: Maximum accepted length in characters (None for no
+            limit, e.g. for chunked analysis of long prompts)
         
     Returns:
         Tuple of (is_valid, error_message)
     """
-    if not prompt or not prompt.strip():
+    if not prompt or prompt.isspace():
         return False, "Prompt cannot be empty"
     
-    if len(prompt.strip()) < 3:
-        return False, "Prompt is too short (minimum 3 characters)"
+    text = prompt.strip() if prompt[0].isspace() or prompt[-1].isspace() else prompt
+    if len(text) < MIN_PROMPT_LENGTH:
+        return False, f"Prompt is too short (minimum {MIN_PROMPT_LENGTH} characters)"
     
-    if len(prompt) > 10000:
-        return False, "Prompt is too long (maximum 10,000 characters)"
+    if max_length is not None and len(prompt) > max_length:
+        return False, f"Prompt is too long (maximum {max_length:,} characters)"
     
     # Check for potentially problematic content
-    if prompt.strip().lower() in ['test', 'hello', 'hi', '123']:
+    if len(text) <= _LONGEST_TEST_INPUT and text.lower() in TEST_INPUTS:
         return False, "Prompt appears to be a test input rather than a real prompt"
     
     return True, ""
@@ -228,30 +321,247 @@ def count_words(text: str) -> int:
 
 def count_sentences(text: str) -> int:
     """Count sentences in text"""
-    import re
-    sentences = re.split(r'[.!?]+', text)
-    return len([s for s in sentences if s.strip()])
+    return compute_readability(text).sentence_count
 
 
-def get_readability_stats(text: str) -> Dict[str, Any]:
-    """Get basic readability statistics"""
-    words = text.split()
-    sentences = count_sentences(text)
-    
-    if sentences == 0:
+@lru_cache(maxsize=65536)
+def count_syllables(word: str) -> int:
+    """
+    Estimate the number of syllables in a word
+
+    Uses a vowel-group heuristic (silent trailing 'e' removed, minimum of
+    one syllable). Results are memoized since prompts reuse a small
+    vocabulary.
+
+    Args:
+        word: A single whitespace-free token, punctuation allowed
+
+    Returns:
+        Estimated syllable count (0 for tokens without letters)
+    """
+    letters = _NON_ALPHA_RE.sub('', word.lower())
+    if not letters:
+        return 0
+    syllables = len(_VOWEL_GROUP_RE.findall(letters))
+    if letters.endswith('e') and not letters.endswith(('le', 'ee')) and syllables > 1:
+        syllables -= 1
+    return max(syllables, 1)
+
+
+@dataclass(frozen=True)
+class ReadabilityStats:
+    """Word, sentence, syllable and paragraph statistics for a text"""
+    word_count: int
+    character_count: int
+    sentence_lengths: Tuple[int, ...]
+    syllable_count: int
+    paragraph_count: int
+    opens_paragraph: bool = False
+
+    def merge(self, other: 'ReadabilityStats') -> 'ReadabilityStats':
+        """
+        Combine statistics of two adjacent pieces of text
+
+        Exact when ``self`` ends with a sentence terminator followed by a
+        newline, which is how long prompts are segmented.
+        """
+        paragraph_count = self.paragraph_count + other.paragraph_count
+        if self.paragraph_count and other.paragraph_count and not other.opens_paragraph:
+            paragraph_count -= 1
+        return ReadabilityStats(
+            word_count=self.word_count + other.word_count,
+            character_count=self.character_count + other.character_count,
+            sentence_lengths=self.sentence_lengths + other.sentence_lengths,
+            syllable_count=self.syllable_count + other.syllable_count,
+            paragraph_count=paragraph_count,
+            opens_paragraph=self.opens_paragraph or (
+                not self.paragraph_count and other.opens_paragraph
+            )
+        )
+
+    @property
+    def sentence_count(self) -> int:
+        return len(self.sentence_lengths)
+
+    @property
+    def sentence_word_count(self) -> int:
+        """Words counted within sentences (terminators split tokens like 'e.g.')"""
+        return sum(self.sentence_lengths)
+
+    @property
+    def avg_words_per_sentence(self) -> float:
+        return self.sentence_word_count / max(self.sentence_count, 1)
+
+    @property
+    def avg_characters_per_word(self) -> float:
+        return self.character_count / max(self.word_count, 1)
+
+    @property
+    def avg_syllables_per_word(self) -> float:
+        return self.syllable_count / max(self.sentence_word_count, 1)
+
+    @property
+    def flesch_reading_ease(self) -> float:
+        if not self.sentence_lengths:
+            return 0.0
+        return (206.835 - 1.015 * self.avg_words_per_sentence
+                - 84.6 * self.avg_syllables_per_word)
+
+    @property
+    def flesch_kincaid_grade(self) -> float:
+        if not self.sentence_lengths:
+            return 0.0
+        return (0.39 * self.avg_words_per_sentence
+                + 11.8 * self.avg_syllables_per_word - 15.59)
+
+    @property
+    def sentence_length_distribution(self) -> Dict[str, int]:
+        """Histogram of sentence lengths in words"""
+        distribution = {label: 0 for label, _ in SENTENCE_LENGTH_BUCKETS}
+        for length in self.sentence_lengths:
+            for label, upper in SENTENCE_LENGTH_BUCKETS:
+                if length <= upper:
+                    distribution[label] += 1
+                    break
+        return distribution
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-friendly dictionary"""
         return {
-            "word_count": len(words),
-            "sentence_count": 0,
-            "avg_words_per_sentence": 0,
-            "avg_characters_per_word": sum(len(word) for word in words) / max(len(words), 1)
+            "word_count": self.word_count,
+            "sentence_count": self.sentence_count,
+            "paragraph_count": self.paragraph_count,
+            "syllable_count": self.syllable_count,
+            "avg_words_per_sentence": self.avg_words_per_sentence,
+            "avg_characters_per_word": self.avg_characters_per_word,
+            "flesch_reading_ease": self.flesch_reading_ease,
+            "flesch_kincaid_grade": self.flesch_kincaid_grade,
+            "longest_sentence": max(self.sentence_lengths, default=0),
+            "sentence_length_distribution": self.sentence_length_distribution
         }
-    
-    return {
-        "word_count": len(words),
-        "sentence_count": sentences,
-        "avg_words_per_sentence": len(words) / sentences,
-        "avg_characters_per_word": sum(len(word) for word in words) / max(len(words), 1)
-    }
+
+
+def compute_readability(text: str) -> ReadabilityStats:
+    """
+    Compute readability statistics in a single pass over the text
+
+    The text is walked as alternating runs of sentence terminators and
+    sentence fragments. Definitions match the rest of the codebase:
+    words are whitespace-separated tokens, sentences are the non-empty
+    pieces of ``re.split(r'[.!?]+', text)`` and paragraphs are the
+    non-empty pieces of ``text.split('\\n\\n')``.
+
+    Args:
+        text: Text to analyze
+
+    Returns:
+        ReadabilityStats for the text
+    """
+    word_count = 0
+    character_count = 0
+    syllable_count = 0
+    paragraph_count = 0
+    sentence_lengths = []
+    in_word = False
+    pending_break = False
+
+    for match in _SENTENCE_TOKEN_RE.finditer(text):
+        token = match.group()
+        if token[0] in '.!?':
+            # Terminators glue onto the neighbouring whitespace-separated word
+            if not in_word:
+                word_count += 1
+                in_word = True
+            character_count += len(token)
+            if pending_break or not paragraph_count:
+                paragraph_count += 1
+                pending_break = False
+            continue
+
+        words = token.split()
+        if '\n\n' in token:
+            pieces = [(piece, piece.split()) for piece in token.split('\n\n')]
+        else:
+            pieces = [(token, words)]
+        for index, (piece, piece_words) in enumerate(pieces):
+            if index:
+                pending_break = True
+                in_word = False
+            if not piece_words:
+                if piece:
+                    in_word = False
+                continue
+            if pending_break or not paragraph_count:
+                paragraph_count += 1
+                pending_break = False
+            glued = in_word and not piece[0].isspace()
+            word_count += len(piece_words) - (1 if glued else 0)
+            character_count += sum(map(len, piece_words))
+            in_word = not piece[-1].isspace()
+
+        if words:
+            sentence_lengths.append(len(words))
+            syllable_count += sum(map(count_syllables, words))
+
+    # Leading whitespace that, after a preceding newline, breaks a paragraph
+    leading = text[:len(text) - len(text.lstrip())]
+    opens_paragraph = '\n\n' in leading or leading.startswith('\n')
+
+    return ReadabilityStats(
+        word_count=word_count,
+        character_count=character_count,
+        sentence_lengths=tuple(sentence_lengths),
+        syllable_count=syllable_count,
+        paragraph_count=paragraph_count,
+        opens_paragraph=opens_paragraph
+    )
+
+
+def get_readability_stats(text: str) -> Dict[str, Any]:
+    """Get basic readability statistics"""
+    return compute_readability(text).to_dict()
+
+
+def freeze(value: Any) -> Any:
+    """Recursively convert dicts to read-only mappings and lists to tuples"""
+    if isinstance(value, (dict, MappingProxyType)):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class Immutable:
+    """
+    Mixin for engine objects that are shared between threads
+
+    Subclasses build their tables in ``__init__`` and finish by calling
+    ``_freeze(*init_args)``. Afterwards every table is read-only and
+    attribute assignment raises AttributeError, so one instance can be
+    used concurrently without locks. Pickling re-runs the constructor
+    with the recorded arguments.
+    """
+
+    _frozen = False
+
+    def _freeze(self, *init_args):
+        for name, value in list(vars(self).items()):
+            object.__setattr__(self, name, freeze(value))
+        object.__setattr__(self, '_init_args', init_args)
+        object.__setattr__(self, '_frozen', True)
+
+    def __setattr__(self, name: str, value: Any):
+        if self._frozen:
+            raise AttributeError(f"{type(self).__name__} is immutable")
+        object.__setattr__(self, name, value)
+
+    def __delattr__(self, name: str):
+        if self._frozen:
+            raise AttributeError(f"{type(self).__name__} is immutable")
+        object.__delattr__(self, name)
+
+    def __reduce__(self):
+        return (type(self), self._init_args)
 
 
 def create_sample_prompts() -> List[str]: